@@ -0,0 +1,97 @@
+"""
+bench_atoms
+~~~~~~~~~~~
+
+Compare memory use and construction time of the slotted Atom and Bond classes against equivalent classes with a
+per-instance ``__dict__``, for a workload of 5000 compounds with 60 atoms and 62 bonds each. Build times are the best
+of several runs that alternate between the two variants, with the garbage collector disabled.
+
+Run from the repository root with ``python -m benchmarks.bench_atoms``.
+"""
+
+import timeit
+import tracemalloc
+
+from pubchempy2.pubchempy import Atom, Bond
+
+COMPOUNDS = 5000
+ATOMS = 60
+BONDS = 62
+REPEAT = 5
+
+
+# Standalone copies of the attributes of Atom and Bond as they were before the switch to __slots__. Subclassing the
+# slotted classes would store the attributes in the inherited slots and leave the instance __dict__ unused.
+
+
+class DictAtom(object):
+    """Atom with a per-instance __dict__, as before the switch to __slots__."""
+
+    def __init__(self, aid, number, x=None, y=None, z=None, charge=0):
+        self.aid = aid
+        self.number = number
+        self.x = x
+        self.y = y
+        self.z = z
+        self.charge = charge
+
+
+class DictBond(object):
+    """Bond with a per-instance __dict__, as before the switch to __slots__."""
+
+    def __init__(self, aid1, aid2, order=1, style=None):
+        self.aid1 = aid1
+        self.aid2 = aid2
+        self.order = order
+        self.style = style
+
+
+def build(atom_cls, bond_cls):
+    compounds = []
+    for _ in range(COMPOUNDS):
+        atoms = [atom_cls(aid, 6, 0.1 * aid, 0.2 * aid, 0.3 * aid) for aid in range(1, ATOMS + 1)]
+        bonds = [bond_cls(aid, aid % ATOMS + 1, 1) for aid in range(1, BONDS + 1)]
+        compounds.append((atoms, bonds))
+    return compounds
+
+
+def measure_time(variants, repeat=REPEAT):
+    """Return the best build time of each variant, alternating between variants so they share the same conditions.
+
+    The garbage collector is disabled while timing, as :mod:`timeit` does.
+    """
+    times = {name: [] for name in variants}
+    for _ in range(repeat):
+        for name, (atom_cls, bond_cls) in variants.items():
+            times[name].extend(timeit.repeat(lambda: build(atom_cls, bond_cls), repeat=1, number=1))
+    return {name: min(t) for name, t in times.items()}
+
+
+def measure_memory(atom_cls, bond_cls):
+    tracemalloc.start()
+    compounds = build(atom_cls, bond_cls)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del compounds
+    return size
+
+
+def main():
+    count = COMPOUNDS * (ATOMS + BONDS)
+    print("%s compounds, %s objects, best of %s runs" % (COMPOUNDS, count, REPEAT))
+    variants = {"__dict__": (DictAtom, DictBond), "__slots__": (Atom, Bond)}
+    times = measure_time(variants)
+    sizes = {name: measure_memory(*classes) for name, classes in variants.items()}
+    for name in variants:
+        print(
+            "%-10s %7.3f s  %8.1f MiB  %5.0f bytes/object"
+            % (name, times[name], sizes[name] / 2**20, sizes[name] / count)
+        )
+    print(
+        "slots use %.0f%% less memory and build %.0f%% faster"
+        % (100 * (1 - sizes["__slots__"] / sizes["__dict__"]), 100 * (1 - times["__slots__"] / times["__dict__"]))
+    )
+
+
+if __name__ == "__main__":
+    main()
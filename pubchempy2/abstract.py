@@ -1,13 +1,22 @@
+import asyncio
 from abc import ABC, abstractclassmethod
-from typing import Annotated, ClassVar
+from typing import TYPE_CHECKING, Annotated, ClassVar, Iterator, Optional
 
 import requests
 from pydantic import BaseModel, Field, HttpUrl
-from tenacity import retry, retry_if_exception, stop_after_attempt, wait_fixed
 
-from .errors import SeverBusyError, handle_http_error
+from .batch import chunk_identifiers, map_chunks, merge_results
+from .client import Client, get_client
+from .errors import handle_http_error
+from .jsonlib import loads
 from .literals import output_types
 
+if TYPE_CHECKING:
+    import httpx
+
+    from .aio import AsyncClient
+    from .sdf import SdfCompound
+
 
 class SearchParams(BaseModel):
     uri: HttpUrl
@@ -16,6 +25,7 @@ class SearchParams(BaseModel):
 
 class AbstractSearch(BaseModel, ABC):
     prolog: ClassVar[str] = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
+    chunkable_namespaces: ClassVar[tuple[str, ...]] = ()
     domain: str
     namespace: str
     identifiers: Annotated[list[str | int], Field(min_length=1)]
@@ -34,12 +44,63 @@ class AbstractSearch(BaseModel, ABC):
     def _construct_search_request(self) -> SearchParams:
         pass
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(5), retry=retry_if_exception(SeverBusyError))
-    def search(self) -> requests.Response:
+    def search(self, client: Optional[Client] = None) -> requests.Response:
         search_request = self._construct_search_request()
-        response = requests.post(url=search_request.uri, data=search_request.body)
+        response = (client or get_client()).post(url=search_request.uri, data=search_request.body)
 
         if not response.ok:
             handle_http_error(response)
 
         return response
+
+    async def asearch(self, client: Optional["AsyncClient"] = None) -> "httpx.Response":
+        from .aio import get_async_client
+
+        search_request = self._construct_search_request()
+        response = await (client or get_async_client()).post(url=search_request.uri, data=search_request.body)
+
+        if not response.is_success:
+            handle_http_error(response)
+
+        return response
+
+    def chunks(self, max_count: Optional[int] = None, max_bytes: Optional[int] = None) -> list["AbstractSearch"]:
+        """Split the search into searches with few enough identifiers to be sent in a single request each."""
+        if self.namespace not in self.chunkable_namespaces:
+            return [self]
+        chunks = chunk_identifiers(self.identifiers, self.operation, max_count, max_bytes)
+        return [self.model_copy(update={"identifiers": chunk}) for chunk in chunks]
+
+    def search_json(self, client: Optional[Client] = None) -> dict:
+        """Search and return the decoded JSON response.
+
+        Long identifier lists are split into requests that are sent concurrently, and their results are merged in order.
+        """
+        if self.output != "JSON":
+            raise ValueError("output must be JSON")
+        return merge_results(map_chunks(lambda search: loads(search.search(client).content), self.chunks()))
+
+    def search_sdf(self, client: Optional[Client] = None) -> Iterator["SdfCompound"]:
+        """Search and yield a :class:`~pubchempy2.sdf.SdfCompound` for each SDF record as soon as it has arrived.
+
+        Responses are parsed incrementally, and long identifier lists are split into requests sent one after another.
+        """
+        from .pubchempy import STREAM_CHUNK_SIZE
+        from .sdf import iter_sdf
+
+        if self.output != "SDF":
+            raise ValueError("output must be SDF")
+        for search in self.chunks():
+            search_request = search._construct_search_request()
+            response = (client or get_client()).post(url=search_request.uri, data=search_request.body, stream=True)
+            with response:
+                if not response.ok:
+                    handle_http_error(response)
+                yield from iter_sdf(response.iter_lines(STREAM_CHUNK_SIZE))
+
+    async def asearch_json(self, client: Optional["AsyncClient"] = None) -> dict:
+        """Awaitable version of :meth:`search_json`."""
+        if self.output != "JSON":
+            raise ValueError("output must be JSON")
+        responses = await asyncio.gather(*[search.asearch(client) for search in self.chunks()])
+        return merge_results(loads(response.content) for response in responses)
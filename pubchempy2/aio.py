@@ -0,0 +1,253 @@
+"""
+Asyncio interface for the PubChem PUG REST service.
+
+Requires the optional ``httpx`` dependency.
+"""
+
+import asyncio
+import functools
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, Mapping, Optional
+
+from .batch import merge_results
+from .cache import CachedResponse, ResponseCache, cache_key
+from .client import DEFAULT_TIMEOUT
+from .jsonlib import loads
+from .listkey import ListKeyPoller, default_poller, is_waiting
+from .pubchempy import (
+    Compound,
+    NotFoundError,
+    PubChemHTTPError,
+    TimeoutError,
+    _build_request,
+    _chunk_identifier,
+    _is_async_search,
+    _property_operation,
+    log,
+)
+from .retry import RetryPolicy, default_retry_policy
+from .throttle import RateLimiter, default_rate_limiter
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class AsyncClient:
+    """Pooled keep-alive asyncio HTTP client for the PubChem PUG REST service.
+
+    :param max_connections: Maximum number of concurrent connections.
+    :param max_keepalive_connections: Maximum number of idle connections kept alive.
+    :param timeout: Default timeout in seconds for every request.
+    :param transport: (optional) Custom ``httpx`` async transport.
+    :param headers: Extra headers sent with every request.
+    :param rate_limiter: Limiter spacing out requests, shared with all other clients by default. ``None`` disables
+                         rate limiting.
+    :param retry_policy: Policy for retrying failed requests, shared with all other clients by default. ``None``
+                         disables retries.
+    :param cache: (optional) Persistent cache that successful responses are stored in and answered from.
+    :param coalesce: Let concurrent identical requests (same URL and POST body) share a single request in flight.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        rate_limiter: Optional[RateLimiter] = default_rate_limiter,
+        retry_policy: Optional[RetryPolicy] = default_retry_policy,
+        cache: Optional[ResponseCache] = None,
+        coalesce: bool = True,
+    ):
+        import httpx
+
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.cache = cache
+        self.coalesce = coalesce
+        self._inflight: dict[str, asyncio.Task] = {}
+
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        self.session = httpx.AsyncClient(limits=limits, timeout=timeout, transport=transport, headers=headers)
+
+    async def post(self, url: str, data: Optional[Mapping[str, Any]] = None, **kwargs) -> "httpx.Response":
+        """Send a POST request through the shared connection pool.
+
+        The response cache is checked first, and concurrent identical requests share a single request in flight.
+        """
+        key = cache_key(url, data)
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return _build_response(url, cached)
+        if not self.coalesce:
+            return await self._fetch_and_store(key, url, data, **kwargs)
+
+        task = self._inflight.get(key)
+        if task is None:
+            # The request runs in its own task, so cancelling the caller that started it doesn't cancel the others
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch_and_store(key, url, data, **kwargs))
+            task.add_done_callback(functools.partial(self._settled, key))
+        return await asyncio.shield(task)
+
+    def _settled(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Nobody may be waiting for the result, so don't let an exception be reported as never retrieved
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch_and_store(
+        self, key: str, url: str, data: Optional[Mapping[str, Any]], **kwargs
+    ) -> "httpx.Response":
+        response = await self._fetch(url, data, **kwargs)
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set, key, url, response.status_code, response.headers, response.content)
+        return response
+
+    async def _fetch(self, url: str, data: Optional[Mapping[str, Any]], **kwargs) -> "httpx.Response":
+        """Send a request, retrying it according to the retry policy."""
+        if self.retry_policy is None:
+            return await self._send(url, data, **kwargs)
+        return await self.retry_policy.acall(self._send, url, data, **kwargs)
+
+    async def _send(self, url: str, data: Optional[Mapping[str, Any]], **kwargs) -> "httpx.Response":
+        if self.rate_limiter is not None:
+            await self.rate_limiter.aacquire()
+        response = await self.session.post(url=str(url), data=data, **kwargs)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(response.headers)
+        return response
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        await self.session.aclose()
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+
+def _build_response(url: str, cached: CachedResponse) -> "httpx.Response":
+    """Rebuild a response from the cache."""
+    import httpx
+
+    return httpx.Response(
+        cached.status_code, headers=cached.headers, content=cached.content, request=httpx.Request("POST", str(url))
+    )
+
+
+# Connections are bound to the event loop they were opened in, so there is one default client per loop
+_default_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> AsyncClient:
+    """Return the default :class:`AsyncClient` for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    if loop not in _default_clients:
+        _default_clients[loop] = AsyncClient()
+    return _default_clients[loop]
+
+
+def set_async_client(client: Optional[AsyncClient]) -> None:
+    """Replace the default :class:`AsyncClient` for the running event loop. Pass ``None`` to reset it."""
+    loop = asyncio.get_running_loop()
+    if client is None:
+        _default_clients.pop(loop, None)
+    else:
+        _default_clients[loop] = client
+
+
+async def request(
+    identifier, namespace="cid", domain="compound", operation=None, output="JSON", searchtype=None, **kwargs
+):
+    """Awaitable version of :func:`~pubchempy2.pubchempy.request`."""
+    import httpx
+
+    apiurl, postdata = _build_request(identifier, namespace, domain, operation, output, searchtype, **kwargs)
+    try:
+        log.debug("Request URL: %s", apiurl)
+        log.debug("Request data: %s", postdata)
+        response = await get_async_client().post(url=apiurl, data=postdata)
+        response.raise_for_status()
+        return response
+    except httpx.HTTPStatusError as e:
+        raise PubChemHTTPError(e)
+
+
+async def get(identifier, namespace="cid", domain="compound", operation=None, output="JSON", searchtype=None, **kwargs):
+    """Awaitable version of :func:`~pubchempy2.pubchempy.get`. ListKeys are polled without blocking the event loop."""
+    if _is_async_search(namespace, searchtype):
+        response = await request(identifier, namespace, domain, None, "JSON", searchtype, **kwargs)
+        status = loads(response.content)
+        if "Waiting" in status and "ListKey" in status["Waiting"]:
+            response = await poll_listkey(status["Waiting"]["ListKey"], domain, operation, output, **kwargs)
+    else:
+        response = await request(identifier, namespace, domain, operation, output, searchtype, **kwargs)
+    return response
+
+
+async def poll_listkey(
+    listkey, domain="compound", operation=None, output="JSON", poller: ListKeyPoller = default_poller, **kwargs
+):
+    """Poll a ListKey until its search is finished and return the response for the operation and output format.
+
+    Poll intervals and the overall timeout are taken from ``poller``. Cancel the awaiting task to stop polling.
+    """
+    deadline = time.monotonic() + poller.timeout
+    for interval in poller.intervals():
+        if time.monotonic() + interval > deadline:
+            raise TimeoutError("ListKey %s not finished after %s s" % (listkey, poller.timeout))
+        await asyncio.sleep(interval)
+        response = await request(listkey, "listkey", domain, operation, output, **kwargs)
+        if not is_waiting(response):
+            return response
+
+
+async def get_json(identifier, namespace="cid", domain="compound", operation=None, searchtype=None, **kwargs):
+    """Awaitable version of :func:`~pubchempy2.pubchempy.get_json`."""
+    chunks = _chunk_identifier(identifier, namespace, operation, searchtype)
+    if len(chunks) > 1:
+        results = await asyncio.gather(
+            *[get_json(chunk, namespace, domain, operation, searchtype, **kwargs) for chunk in chunks]
+        )
+        return merge_results(results)
+    try:
+        return loads((await get(identifier, namespace, domain, operation, "JSON", searchtype, **kwargs)).content)
+    except NotFoundError as e:
+        log.info(e)
+        return None
+
+
+async def get_compounds(identifier, namespace="cid", searchtype=None, **kwargs):
+    """Awaitable version of :func:`~pubchempy2.pubchempy.get_compounds`."""
+    results = await get_json(identifier, namespace, searchtype=searchtype, **kwargs)
+    return [Compound(r) for r in results["PC_Compounds"]] if results else []
+
+
+async def get_properties(properties, identifier, namespace="cid", searchtype=None, **kwargs):
+    """Awaitable version of :func:`~pubchempy2.pubchempy.get_properties`."""
+    operation = _property_operation(properties)
+    results = await get_json(identifier, namespace, "compound", operation, searchtype=searchtype, **kwargs)
+    return results["PropertyTable"]["Properties"] if results else []
+
+
+async def get_synonyms(identifier, namespace="cid", domain="compound", searchtype=None, **kwargs):
+    """Awaitable version of :func:`~pubchempy2.pubchempy.get_synonyms`."""
+    results = await get_json(identifier, namespace, domain, "synonyms", searchtype=searchtype, **kwargs)
+    return results["InformationList"]["Information"] if results else []
+
+
+async def get_cids(identifier, namespace="name", domain="compound", searchtype=None, **kwargs):
+    """Awaitable version of :func:`~pubchempy2.pubchempy.get_cids`."""
+    results = await get_json(identifier, namespace, domain, "cids", searchtype=searchtype, **kwargs)
+    if not results:
+        return []
+    elif "IdentifierList" in results:
+        return results["IdentifierList"]["CID"]
+    elif "InformationList" in results:
+        return results["InformationList"]["Information"]
@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+#: Namespaces that accept a comma-separated list of identifiers in the POST body
+CHUNKABLE_NAMESPACES = ("cid", "sid", "aid")
+
+#: Maximum number of identifiers sent in a single request, by operation
+CHUNK_SIZES = {
+    "record": 100,
+    "description": 100,
+    "conformers": 100,
+    "synonyms": 500,
+    "property": 1000,
+    "cids": 1000,
+    "sids": 1000,
+    "aids": 1000,
+}
+DEFAULT_CHUNK_SIZE = 500
+
+#: Maximum size in bytes of the comma-separated identifiers sent in a single request
+MAX_CHUNK_BYTES = 16 * 1024
+
+#: Number of chunks requested concurrently
+MAX_WORKERS = 4
+
+
+def chunk_size(operation: Optional[str]) -> int:
+    """Return the maximum number of identifiers sent in a single request for an operation such as ``property/...``."""
+    return CHUNK_SIZES.get((operation or "record").split("/")[0], DEFAULT_CHUNK_SIZE)
+
+
+def chunk_identifiers(
+    identifiers: Sequence[Any],
+    operation: Optional[str] = None,
+    max_count: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> list[list[Any]]:
+    """Split identifiers into chunks limited both by number of identifiers and by size of the joined POST body."""
+    max_count = max_count or chunk_size(operation)
+    max_bytes = max_bytes or MAX_CHUNK_BYTES
+    chunks, chunk, size = [], [], 0
+    for identifier in identifiers:
+        length = len(str(identifier).encode()) + 1
+        if chunk and (len(chunk) >= max_count or size + length > max_bytes):
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(identifier)
+        size += length
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def merge_results(results: Iterable[Optional[dict]]) -> Optional[dict]:
+    """Merge JSON results of chunked requests in order.
+
+    Lists are concatenated, both at the top level (``PC_Compounds``, ``PC_Substances``, ``PC_AssayContainer``) and one
+    level down (``PropertyTable``, ``IdentifierList``, ``InformationList``). Other values are taken from the first
+    result. Missing results (e.g. chunks where nothing was found) are skipped.
+    """
+    merged = None
+    for result in results:
+        if not result:
+            continue
+        if merged is None:
+            merged = {k: dict(v) if isinstance(v, dict) else v for k, v in result.items()}
+            continue
+        for key, value in result.items():
+            if key not in merged:
+                merged[key] = value
+            elif isinstance(value, list):
+                merged[key] = merged[key] + value
+            elif isinstance(value, dict):
+                for subkey, subvalue in value.items():
+                    if isinstance(subvalue, list) and isinstance(merged[key].get(subkey), list):
+                        merged[key][subkey] = merged[key][subkey] + subvalue
+                    else:
+                        merged[key].setdefault(subkey, subvalue)
+    return merged
+
+
+def map_chunks(fetch: Callable[[list[Any]], Any], chunks: Sequence[list[Any]], max_workers: int = MAX_WORKERS) -> list:
+    """Call ``fetch`` for every chunk concurrently and return the results in the order of the chunks."""
+    if len(chunks) == 1:
+        return [fetch(chunks[0])]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        return list(executor.map(fetch, chunks))
@@ -0,0 +1,112 @@
+import os
+from typing import Any, Callable, Mapping, Optional, Sequence
+
+from .batch import CHUNKABLE_NAMESPACES, MAX_WORKERS, chunk_identifiers
+from .pubchempy import download_many
+
+#: Output formats that hold any number of records in a single file, by file extension
+MULTI_RECORD_FORMATS = {
+    "SDF": "sdf",
+    "CSV": "csv",
+    "JSON": "json",
+    "XML": "xml",
+    "ASNT": "asnt",
+    "ASNB": "asnb",
+    "TXT": "txt",
+}
+
+#: Output formats that hold a single record per file, by file extension
+SINGLE_RECORD_FORMATS = {"PNG": "png"}
+
+
+def _extension(outformat: str) -> str:
+    try:
+        return (MULTI_RECORD_FORMATS | SINGLE_RECORD_FORMATS)[outformat]
+    except KeyError:
+        raise ValueError("Unsupported output format: %s" % outformat)
+
+
+def plan_bulk_download(
+    identifiers: Sequence[Any],
+    formats: Sequence[str],
+    directory: str | os.PathLike,
+    namespace: str = "cid",
+    domain: str = "compound",
+    operation: Optional[str | Mapping[str, str]] = None,
+    max_count: Optional[int] = None,
+    overwrite: bool = False,
+) -> list[dict[str, Any]]:
+    """Return the manifest of :func:`~pubchempy2.pubchempy.download` calls needed for a bulk download.
+
+    See :func:`bulk_download` for the parameters. Files that already exist are left out unless ``overwrite`` is set.
+    """
+    identifiers = list(identifiers)
+    manifest = []
+    for outformat in formats:
+        extension = _extension(outformat)
+        format_operation = operation.get(outformat) if isinstance(operation, Mapping) else operation
+        if outformat in MULTI_RECORD_FORMATS and namespace in CHUNKABLE_NAMESPACES:
+            chunks = chunk_identifiers(identifiers, format_operation, max_count)
+            names = ["%s_%s-%s" % (namespace, chunk[0], chunk[-1]) for chunk in chunks]
+        else:
+            chunks = identifiers
+            names = [str(identifier).replace(os.sep, "_") for identifier in identifiers]
+        for chunk, name in zip(chunks, names):
+            path = os.path.join(directory, "%s.%s" % (name, extension))
+            if not overwrite and os.path.exists(path):
+                continue
+            manifest.append(
+                {
+                    "outformat": outformat,
+                    "path": path,
+                    "identifier": chunk,
+                    "namespace": namespace,
+                    "domain": domain,
+                    "operation": format_operation,
+                    "overwrite": overwrite,
+                }
+            )
+    return manifest
+
+
+def bulk_download(
+    identifiers: Sequence[Any],
+    formats: Sequence[str],
+    directory: str | os.PathLike,
+    namespace: str = "cid",
+    domain: str = "compound",
+    operation: Optional[str | Mapping[str, str]] = None,
+    max_count: Optional[int] = None,
+    max_workers: int = MAX_WORKERS,
+    overwrite: bool = False,
+    progress: Optional[Callable[[str, int, Optional[int]], None]] = None,
+) -> list[str]:
+    """Download records for many identifiers in several formats into a directory.
+
+    Formats that hold many records per file (SDF, CSV, JSON, XML, ASNT, ASNB, TXT) are requested for chunks of
+    identifiers and saved as ``<namespace>_<first>-<last>.<ext>``. Formats that hold a single record (PNG) are
+    requested for each identifier and saved as ``<identifier>.<ext>``. All requests run concurrently under the shared
+    rate limit of the client, and files that already exist are skipped, so an interrupted bulk download can simply be
+    run again.
+
+    Usage::
+
+        bulk_download(cids, ["SDF", "PNG"], "exports")
+        bulk_download(cids, ["CSV"], "exports", operation="property/MolecularWeight,InChIKey")
+
+    :param identifiers: The identifiers to download records for.
+    :param formats: The output formats to download.
+    :param directory: Directory the files are saved in. It is created if needed.
+    :param namespace: (optional) The identifier type.
+    :param domain: (optional) The PubChem domain.
+    :param operation: (optional) The operation, or a mapping of output format to operation.
+    :param max_count: (optional) Maximum number of identifiers in a multi-record file.
+    :param max_workers: Maximum number of downloads in progress at once.
+    :param overwrite: Download files that already exist again.
+    :param progress: (optional) Callable called as ``progress(path, downloaded, total)`` after every chunk written.
+    :returns: The paths of the files that were downloaded.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = plan_bulk_download(identifiers, formats, directory, namespace, domain, operation, max_count, overwrite)
+    download_many(manifest, max_workers=max_workers, progress=progress)
+    return [entry["path"] for entry in manifest]
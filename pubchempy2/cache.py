@@ -0,0 +1,271 @@
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Mapping, NamedTuple, Optional
+from urllib.parse import urlencode, urlparse
+
+#: Default time to live in seconds of cached responses, by operation
+DEFAULT_TTLS = {
+    "record": 30 * 24 * 3600,
+    "property": 30 * 24 * 3600,
+    "conformers": 30 * 24 * 3600,
+    "description": 7 * 24 * 3600,
+    "synonyms": 7 * 24 * 3600,
+    "classification": 7 * 24 * 3600,
+    "xrefs": 7 * 24 * 3600,
+    "cids": 24 * 3600,
+    "sids": 24 * 3600,
+    "aids": 24 * 3600,
+    "targets": 24 * 3600,
+    "summary": 3600,
+    "concise": 3600,
+    "doseresponse": 3600,
+    "assaysummary": 3600,
+}
+DEFAULT_TTL = 24 * 3600
+
+#: Output formats that end a PUG REST request URL
+OUTPUT_FORMATS = frozenset({"JSON", "JSONP", "XML", "SDF", "ASNT", "ASNB", "CSV", "PNG", "TXT"})
+
+#: Namespaces that look up a record by its identifier, so that a request without an operation is a record fetch
+RECORD_NAMESPACES = frozenset({"cid", "sid", "aid"})
+
+
+class CachedResponse(NamedTuple):
+    status_code: int
+    headers: dict[str, str]
+    content: bytes
+
+
+def cache_key(url: str, data: Optional[Mapping[str, Any]] = None) -> str:
+    """Return the cache key for a request: a hash of its URL and its POST body with fields in sorted order."""
+    body = urlencode(sorted((str(k), str(v)) for k, v in (data or {}).items()))
+    return hashlib.sha256(f"{url}\n{body}".encode()).hexdigest()
+
+
+class ResponseCache:
+    """Persistent SQLite-backed cache of successful responses from the PubChem PUG REST service.
+
+    Entries are compressed, expire after a time to live that depends on the operation, and the least recently used
+    entries are evicted once the total size of the cache exceeds ``max_size``. The database is opened in WAL mode, so
+    several threads and processes can share the same cache file.
+
+    Responses to ListKey requests, responses returning a ListKey and searches that are still running are never cached.
+
+    :param path: Path of the SQLite database file.
+    :param ttls: Time to live in seconds for each operation, merged with :data:`DEFAULT_TTLS`. A TTL of 0 disables
+                 caching for the operation.
+    :param default_ttl: Time to live in seconds for operations not listed in ``ttls``.
+    :param max_size: Maximum total size in bytes of the compressed responses.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        ttls: Optional[Mapping[str, float]] = None,
+        default_ttl: float = DEFAULT_TTL,
+        max_size: int = 1024**3,
+    ):
+        self.path = os.path.expanduser(path)
+        self.ttls = DEFAULT_TTLS | dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, content BLOB, size INTEGER, "
+                "expires REAL, accessed REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)")
+            # The total size is kept up to date by triggers, so it is shared by every process using the file
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+            conn.execute("INSERT OR IGNORE INTO stats VALUES ('size', (SELECT COALESCE(SUM(size), 0) FROM responses))")
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN "
+                "UPDATE stats SET value = value + new.size WHERE name = 'size'; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses BEGIN "
+                "UPDATE stats SET value = value - old.size + new.size WHERE name = 'size'; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN "
+                "UPDATE stats SET value = value - old.size WHERE name = 'size'; END"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection of the current thread, as SQLite connections can't be shared between threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ttl(self, url: str) -> float:
+        """Return the time to live of a response, based on the operation found in the request URL.
+
+        Requests for a cid, sid or aid with no operation, like ``compound/cid/2244/JSON``, fetch the full record.
+        """
+        path = urlparse(str(url)).path.split("/")
+        segments = path[:-1]
+        if "listkey" in segments:
+            return 0
+        for segment in reversed(segments):
+            if segment in self.ttls:
+                return self.ttls[segment]
+        if path[-1] in OUTPUT_FORMATS:
+            for domain in ("compound", "substance", "assay"):
+                if domain in segments:
+                    rest = segments[segments.index(domain) + 1 :]
+                    if rest and rest[0] in RECORD_NAMESPACES and len(rest) <= 2:
+                        return self.ttls.get("record", self.default_ttl)
+                    break
+        return self.default_ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the cached response for a key, or ``None`` if it is missing or expired."""
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT status, headers, content FROM responses WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        status, headers, content = row
+        return CachedResponse(status, json.loads(headers), zlib.decompress(content))
+
+    def set(self, key: str, url: str, status_code: int, headers: Mapping[str, str], content: bytes) -> bool:
+        """Cache a response if it is cacheable. Return whether it was stored."""
+        ttl = self.ttl(url)
+        head = content[:100]
+        if status_code != 200 or ttl <= 0 or b'"Waiting"' in head or b'"ListKey"' in head:
+            return False
+        now = time.time()
+        compressed = zlib.compress(content)
+        headers = {k: v for k, v in headers.items() if k.lower() not in ("content-encoding", "content-length")}
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "url = excluded.url, status = excluded.status, headers = excluded.headers, "
+                "content = excluded.content, size = excluded.size, expires = excluded.expires, "
+                "accessed = excluded.accessed",
+                (key, str(url), status_code, json.dumps(headers), compressed, len(compressed), now + ttl, now),
+            )
+        self.evict()
+        return True
+
+    def evict(self) -> None:
+        """Remove expired entries, then least recently used entries until the cache fits in ``max_size``."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+            total = self.size()
+            if total <= self.max_size:
+                return
+            excess = total - self.max_size
+            evicted = []
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                if excess <= 0:
+                    break
+                evicted.append((key,))
+                excess -= size
+            conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def size(self) -> int:
+        """Return the total size in bytes of the compressed responses."""
+        return self._connection().execute("SELECT value FROM stats WHERE name = 'size'").fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+_missing = object()
+
+
+class MemoryCache:
+    """Bounded in-process cache with least recently used eviction and a time to live, safe to share between threads.
+
+    Values are deep-copied when they are cached and when they are returned, so that callers mutating a record, a list
+    or a :class:`~pubchempy2.pubchempy.Compound` they got from the cache don't change what later callers see.
+
+    :param maxsize: Maximum number of entries.
+    :param ttl: Time to live of entries in seconds.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value cached for a key, or ``default`` if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(entry[1])
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Cache a value, evicting the least recently used entries if the cache is full."""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Optional[Hashable], fn: Callable[[], Any]) -> Any:
+        """Return the value cached for a key, calling ``fn`` to compute and cache it if needed.
+
+        A key of ``None`` bypasses the cache.
+        """
+        if key is None:
+            return fn()
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = fn()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove all entries and reset the hit and miss counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Number of hits, misses and entries."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+#: Process-wide cache of records and lazily fetched properties, keyed by (domain, id, operation)
+memory_cache = MemoryCache()
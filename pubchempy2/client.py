@@ -0,0 +1,174 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Mapping, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from .cache import CachedResponse, ResponseCache, cache_key
+from .retry import RetryPolicy, default_retry_policy
+from .throttle import RateLimiter, default_rate_limiter
+
+DEFAULT_TIMEOUT = 10
+
+
+class Client:
+    """Pooled keep-alive HTTP client used for every request to the PubChem PUG REST service.
+
+    A single underlying :class:`~requests.Session` is reused, so connections (and their TLS sessions) are kept alive
+    between requests instead of being re-established for every call.
+
+    :param pool_connections: Number of per-host connection pools to keep.
+    :param pool_maxsize: Maximum number of connections kept open to a single host.
+    :param pool_block: Block when ``pool_maxsize`` connections to a host are in use, instead of opening extra
+                       connections that are discarded afterwards. Use it to enforce a hard per-host limit.
+    :param timeout: Default timeout in seconds for every request.
+    :param adapters: Mapping of URL prefix to transport adapter, mounted on top of the default pooled adapter.
+    :param headers: Extra headers sent with every request.
+    :param rate_limiter: Limiter spacing out requests, shared with all other clients by default. ``None`` disables
+                         rate limiting.
+    :param retry_policy: Policy for retrying failed requests, shared with all other clients by default. ``None``
+                         disables retries.
+    :param cache: (optional) Persistent cache that successful responses are stored in and answered from.
+    :param coalesce: Let concurrent identical requests (same URL and POST body) share a single request in flight.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        adapters: Optional[Mapping[str, BaseAdapter]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        rate_limiter: Optional[RateLimiter] = default_rate_limiter,
+        retry_policy: Optional[RetryPolicy] = default_retry_policy,
+        cache: Optional[ResponseCache] = None,
+        coalesce: bool = True,
+    ):
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.cache = cache
+        self.coalesce = coalesce
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+        for prefix, custom_adapter in (adapters or {}).items():
+            self.mount(prefix, custom_adapter)
+
+    def mount(self, prefix: str, adapter: BaseAdapter) -> None:
+        """Register a transport adapter for all URLs starting with ``prefix``."""
+        self.session.mount(prefix, adapter)
+
+    def post(
+        self, url: str, data: Optional[Mapping[str, Any]] = None, retry: bool = True, **kwargs
+    ) -> requests.Response:
+        """Send a POST request through the shared connection pool.
+
+        The response cache is checked first, and concurrent identical requests share a single request in flight.
+
+        :param retry: Apply the retry policy. Callers that retry a larger operation with the policy themselves, such as
+                      a download that is resumed, pass ``False`` so that retries aren't counted twice.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if not retry:
+            return self._send(url, data, **kwargs)
+        if kwargs.get("stream"):
+            return self._fetch(url, data, **kwargs)
+        key = cache_key(url, data)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return _build_response(url, cached)
+        if not self.coalesce:
+            return self._fetch_and_store(key, url, data, **kwargs)
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            response = self._fetch_and_store(key, url, data, **kwargs)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _fetch_and_store(self, key: str, url: str, data: Optional[Mapping[str, Any]], **kwargs) -> requests.Response:
+        response = self._fetch(url, data, **kwargs)
+        if self.cache is not None:
+            self.cache.set(key, url, response.status_code, response.headers, response.content)
+        return response
+
+    def _fetch(self, url: str, data: Optional[Mapping[str, Any]], **kwargs) -> requests.Response:
+        """Send a request, retrying it according to the retry policy."""
+        if self.retry_policy is None:
+            return self._send(url, data, **kwargs)
+        return self.retry_policy.call(self._send, url, data, **kwargs)
+
+    def _send(self, url: str, data: Optional[Mapping[str, Any]], **kwargs) -> requests.Response:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        response = self.session.post(url=str(url), data=data, **kwargs)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(response.headers)
+        return response
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def _build_response(url: str, cached: CachedResponse) -> requests.Response:
+    """Rebuild a response from the cache."""
+    response = requests.Response()
+    response.url = str(url)
+    response.status_code = cached.status_code
+    response.reason = "OK"
+    response.headers.update(cached.headers)
+    response._content = cached.content
+    return response
+
+
+_default_client: Optional[Client] = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> Client:
+    """Return the process-wide default :class:`Client`, creating it on first use."""
+    global _default_client
+
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = Client()
+    return _default_client
+
+
+def set_client(client: Optional[Client]) -> None:
+    """Replace the process-wide default :class:`Client`. Pass ``None`` to reset it to a fresh default client."""
+    global _default_client
+
+    with _default_client_lock:
+        _default_client = client
@@ -0,0 +1,121 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .pubchempy import Compound, _property_operation, get_json
+
+
+class _Group:
+    """Calls waiting to be sent together in one request."""
+
+    def __init__(self, fetch: Callable[[list[int]], dict[int, Any]]):
+        self.fetch = fetch
+        self.pending: list[tuple[int, Future]] = []
+        self.timer: Optional[threading.Timer] = None
+
+
+class CidDispatcher:
+    """Opt-in dispatcher that combines single-CID calls from many threads into multi-CID requests.
+
+    Calls arriving within ``window`` seconds of each other are sent as one request of up to ``max_batch`` CIDs, and the
+    response is split back to the individual callers.
+
+    Usage::
+
+        dispatcher = CidDispatcher()
+        compound = dispatcher.from_cid(2244)
+        properties = dispatcher.get_properties(["MolecularWeight", "InChIKey"], 2244)
+
+    :param window: Seconds to wait for more calls before sending a request.
+    :param max_batch: Maximum number of CIDs in a single request. A request is sent as soon as it is full.
+    :param max_workers: Maximum number of combined requests in flight.
+    """
+
+    def __init__(self, window: float = 0.05, max_batch: int = 100, max_workers: int = 4):
+        self.window = window
+        self.max_batch = max_batch
+        self._groups: dict[Any, _Group] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pubchempy-dispatch")
+
+    def from_cid(self, cid: int) -> Optional[Compound]:
+        """Retrieve the :class:`~pubchempy2.pubchempy.Compound` for a CID, or ``None`` if it doesn't exist."""
+        return self.submit(("compound",), cid, self._fetch_compounds).result()
+
+    def get_properties(self, properties: list[str] | str, cid: int) -> Optional[dict[str, Any]]:
+        """Retrieve properties for a CID, as returned by :func:`~pubchempy2.pubchempy.get_properties` for one CID."""
+        operation = _property_operation(properties)
+        return self.submit(("property", operation), cid, lambda cids: self._fetch_properties(operation, cids)).result()
+
+    def submit(self, group_key: Any, cid: int, fetch: Callable[[list[int]], dict[int, Any]]) -> Future:
+        """Queue a CID to be fetched together with the other CIDs of its group.
+
+        :param group_key: Calls with the same key are combined into one request.
+        :param fetch: Callable fetching a list of CIDs and returning a mapping of CID to result.
+        """
+        future = Future()
+        with self._lock:
+            group = self._groups.setdefault(group_key, _Group(fetch))
+            group.pending.append((int(cid), future))
+            if len(group.pending) >= self.max_batch:
+                self._flush(group_key)
+            elif group.timer is None:
+                group.timer = threading.Timer(self.window, self._expire, args=(group_key, group))
+                group.timer.daemon = True
+                group.timer.start()
+        return future
+
+    def flush(self, group_key: Any) -> None:
+        """Send the pending calls of a group right away."""
+        with self._lock:
+            self._flush(group_key)
+
+    def _expire(self, group_key: Any, group: _Group) -> None:
+        # The timer may fire after its group was sent because it filled up, and a new group was started under the
+        # same key, so only send the group the timer was started for
+        with self._lock:
+            if self._groups.get(group_key) is group:
+                self._flush(group_key)
+
+    def _flush(self, group_key: Any) -> None:
+        group = self._groups.pop(group_key, None)
+        if group is None:
+            return
+        if group.timer is not None:
+            group.timer.cancel()
+        self._executor.submit(self._run, group.fetch, group.pending)
+
+    @staticmethod
+    def _run(fetch: Callable[[list[int]], dict[int, Any]], pending: list[tuple[int, Future]]) -> None:
+        try:
+            results = fetch(list(dict.fromkeys(cid for cid, _ in pending)))
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        for cid, future in pending:
+            future.set_result(results.get(cid))
+
+    @staticmethod
+    def _fetch_compounds(cids: list[int]) -> dict[int, Compound]:
+        results = get_json(cids, "cid", "compound")
+        compounds = [Compound(r) for r in results["PC_Compounds"]] if results else []
+        return {c.cid: c for c in compounds}
+
+    @staticmethod
+    def _fetch_properties(operation: str, cids: list[int]) -> dict[int, dict[str, Any]]:
+        results = get_json(cids, "cid", "compound", operation)
+        return {p["CID"]: p for p in results["PropertyTable"]["Properties"]} if results else {}
+
+    def close(self) -> None:
+        """Send all pending calls and wait for them to finish."""
+        with self._lock:
+            for group_key in list(self._groups):
+                self._flush(group_key)
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "CidDispatcher":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
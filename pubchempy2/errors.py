@@ -1,27 +1,33 @@
 import requests
 
 
-def handle_http_error(response: requests.Response):
-    code = response.status_code
-    msg = response.text
-
+def error_for_status(code: int) -> type["PubChemHTTPError"]:
+    """Return the error class corresponding to an HTTP status code returned by PubChem."""
     match code:
         case 400:
-            raise BadRequestError(msg)
+            return BadRequestError
         case 404:
-            raise NotFoundError(msg)
+            return NotFoundError
         case 405:
-            raise MethodNotAllowedError(msg)
+            return MethodNotAllowedError
         case 504:
-            raise TimeoutError(msg)
+            return TimeoutError
         case 503:
-            raise SeverBusyError(msg)
+            return SeverBusyError
         case 501:
-            raise UnimplementedError(msg)
+            return UnimplementedError
         case 500:
-            raise ServerError(msg)
+            return ServerError
         case _:
-            raise PubChemHTTPError()
+            return PubChemHTTPError
+
+
+def handle_http_error(response: requests.Response):
+    error = error_for_status(response.status_code)
+
+    if error is PubChemHTTPError:
+        raise PubChemHTTPError()
+    raise error(response.text)
 
 
 class PubChemPyError(Exception):
@@ -87,3 +93,10 @@ class SeverBusyError(PubChemHTTPError):
 
     def __init__(self, msg="Too many requests or server is busy, retry later"):
         super().__init__(msg)
+
+
+class NetworkError(PubChemPyError):
+    """The connection to the server failed or was reset before a response was received."""
+
+    def __init__(self, msg="The connection to the server failed"):
+        super().__init__(msg)
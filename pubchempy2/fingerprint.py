@@ -0,0 +1,147 @@
+import base64
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+#: Number of bits in the PubChem CACTVS substructure fingerprint
+CACTVS_BITS = 881
+
+
+class Fingerprint:
+    """Binary fingerprint, such as the 881-bit PubChem CACTVS substructure fingerprint.
+
+    Bits are stored packed in a single integer, so bitwise operations and popcounts run in C over whole machine words.
+    Bit 0 is the first bit of the fingerprint, as in :attr:`~pubchempy2.pubchempy.Compound.cactvs_fingerprint`.
+
+    Usage::
+
+        fp = Fingerprint.from_hex(compound.fingerprint)
+        fp.tanimoto(other)
+        common = fp & other
+
+    :param bits: The bits packed into an integer, bit 0 being the most significant.
+    :param nbits: Length of the fingerprint in bits.
+    """
+
+    __slots__ = ("bits", "nbits")
+
+    def __init__(self, bits: int, nbits: int = CACTVS_BITS):
+        if bits < 0 or bits >> nbits:
+            raise ValueError("bits don't fit in a %s-bit fingerprint" % nbits)
+        self.bits = bits
+        self.nbits = nbits
+
+    @classmethod
+    def from_bytes(cls, data: bytes, nbits: int = CACTVS_BITS) -> "Fingerprint":
+        """Create from packed bytes, most significant bit first, with any padding bits at the end."""
+        if len(data) * 8 < nbits:
+            raise ValueError("%s bits don't fit in %s bytes" % (nbits, len(data)))
+        return cls(int.from_bytes(data, "big") >> (len(data) * 8 - nbits), nbits)
+
+    @classmethod
+    def from_pubchem(cls, data: bytes) -> "Fingerprint":
+        """Create from PubChem's binary format: the length in bits as a 4-byte integer, followed by the packed bits."""
+        return cls.from_bytes(data[4:], int.from_bytes(data[:4], "big"))
+
+    @classmethod
+    def from_hex(cls, value: str) -> "Fingerprint":
+        """Create from the hex-encoded fingerprint of a compound record, see
+        :attr:`~pubchempy2.pubchempy.Compound.fingerprint`."""
+        return cls.from_pubchem(bytes.fromhex(value))
+
+    @classmethod
+    def from_base64(cls, value: str) -> "Fingerprint":
+        """Create from the base64-encoded ``Fingerprint2D`` property, or the ``PUBCHEM_CACTVS_SUBSKEYS`` SDF field."""
+        return cls.from_pubchem(base64.b64decode(value))
+
+    @classmethod
+    def from_bitstring(cls, value: str) -> "Fingerprint":
+        """Create from a string of ``0`` and ``1`` characters."""
+        return cls(int(value, 2), len(value))
+
+    def to_bytes(self) -> bytes:
+        """Return the packed bits, most significant bit first, padded with zero bits at the end."""
+        nbytes = (self.nbits + 7) // 8
+        return (self.bits << (nbytes * 8 - self.nbits)).to_bytes(nbytes, "big")
+
+    def to_bitstring(self) -> str:
+        """Return the bits as a string of ``0`` and ``1`` characters."""
+        return format(self.bits, "0%sb" % self.nbits)
+
+    def to_numpy(self) -> "np.ndarray":
+        """Return the packed bits as a NumPy uint8 array. Requires numpy."""
+        import numpy as np
+
+        return np.frombuffer(self.to_bytes(), dtype=np.uint8)
+
+    def popcount(self) -> int:
+        """Number of bits set."""
+        return self.bits.bit_count()
+
+    def on_bits(self) -> list[int]:
+        """Indices of the bits set."""
+        return [i for i, bit in enumerate(self.to_bitstring()) if bit == "1"]
+
+    def contains(self, other: "Fingerprint") -> bool:
+        """Whether every bit set in ``other`` is also set in this fingerprint.
+
+        A molecule can only contain a substructure if its fingerprint contains the fingerprint of the substructure.
+        """
+        self._check(other)
+        return other.bits & ~self.bits == 0
+
+    def tanimoto(self, other: "Fingerprint") -> float:
+        """Tanimoto (Jaccard) similarity, the number of bits set in both divided by the number set in either."""
+        self._check(other)
+        union = (self.bits | other.bits).bit_count()
+        return (self.bits & other.bits).bit_count() / union if union else 0.0
+
+    def tversky(self, other: "Fingerprint", alpha: float = 1.0, beta: float = 1.0) -> float:
+        """Tversky similarity, weighting bits only set in this fingerprint by ``alpha`` and bits only set in ``other``
+        by ``beta``. ``alpha = beta = 1`` gives the Tanimoto similarity, ``alpha = beta = 0.5`` the Dice similarity."""
+        self._check(other)
+        common = (self.bits & other.bits).bit_count()
+        only_self = (self.bits & ~other.bits).bit_count()
+        only_other = (other.bits & ~self.bits).bit_count()
+        denominator = common + alpha * only_self + beta * only_other
+        return common / denominator if denominator else 0.0
+
+    def _check(self, other: "Fingerprint") -> None:
+        if self.nbits != other.nbits:
+            raise ValueError("Fingerprints have different lengths: %s and %s bits" % (self.nbits, other.nbits))
+
+    def __and__(self, other: "Fingerprint") -> "Fingerprint":
+        self._check(other)
+        return Fingerprint(self.bits & other.bits, self.nbits)
+
+    def __or__(self, other: "Fingerprint") -> "Fingerprint":
+        self._check(other)
+        return Fingerprint(self.bits | other.bits, self.nbits)
+
+    def __xor__(self, other: "Fingerprint") -> "Fingerprint":
+        self._check(other)
+        return Fingerprint(self.bits ^ other.bits, self.nbits)
+
+    def __invert__(self) -> "Fingerprint":
+        return Fingerprint(~self.bits & ((1 << self.nbits) - 1), self.nbits)
+
+    def __getitem__(self, index: int) -> bool:
+        if not -self.nbits <= index < self.nbits:
+            raise IndexError("fingerprint bit index out of range")
+        return bool(self.bits >> (self.nbits - 1 - index % self.nbits) & 1)
+
+    def __iter__(self) -> Iterator[bool]:
+        return (self[i] for i in range(self.nbits))
+
+    def __len__(self) -> int:
+        return self.nbits
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Fingerprint) and self.bits == other.bits and self.nbits == other.nbits
+
+    def __hash__(self) -> int:
+        return hash((self.bits, self.nbits))
+
+    def __repr__(self) -> str:
+        return "Fingerprint(%s/%s bits set)" % (self.popcount(), self.nbits)
@@ -0,0 +1,173 @@
+"""Local memory-mapped fingerprint index, answering similarity queries offline.
+
+Requires the optional numpy dependency.
+"""
+
+import functools
+import math
+import os
+import struct
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+
+from .fingerprint import Fingerprint
+from .matrix import BLOCK_SIZE, FingerprintMatrix, _top_k, pack, popcount, tanimoto_scores
+
+_MAGIC = b"PCFPIDX1"
+#: Magic, bits per fingerprint, uint64 words per fingerprint, number of fingerprints
+_HEADER = struct.Struct("<8sIIQ")
+_HEADER_SIZE = 32
+
+
+class IndexHits(NamedTuple):
+    """CIDs found by a search of a :class:`FingerprintIndex` with their similarities, most similar first.
+
+    ``cids`` can be passed directly to :func:`~pubchempy2.pubchempy.get_compounds` or
+    :func:`~pubchempy2.pubchempy.get_properties`.
+    """
+
+    cids: list[int]
+    scores: list[float]
+
+
+class FingerprintIndex:
+    """Fingerprints and CIDs stored in a file that is memory-mapped, for offline Tanimoto similarity searches.
+
+    Fingerprints are stored sorted by popcount. As the Tanimoto similarity of fingerprints with ``a`` and ``b`` bits set
+    is at most ``min(a, b) / max(a, b)``, searches only read the rows whose popcount can reach the requested
+    similarity, and the operating system only pages in those parts of the file.
+
+    Usage::
+
+        FingerprintIndex.build("compounds.fpidx", get_compounds(cids))
+        index = FingerprintIndex("compounds.fpidx")
+        hits = index.search(query.binary_fingerprint, threshold=0.8)
+        compounds = get_compounds(hits.cids)
+
+    :param path: Path of an index file written by :meth:`build`.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as f:
+            magic, self.nbits, width, count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError("%s is not a fingerprint index" % self.path)
+        self.cids = self._map(np.int64, _HEADER_SIZE, (count,))
+        """CIDs of the fingerprints, in the order of the index."""
+        self.counts = self._map(np.int64, _HEADER_SIZE + 8 * count, (count,))
+        """Popcounts of the fingerprints, in increasing order."""
+        self.words = self._map(np.uint64, _HEADER_SIZE + 16 * count, (count, width))
+        """(N, W) array of the fingerprints packed into uint64 words."""
+
+    def _map(self, dtype: type, offset: int, shape: tuple[int, ...]) -> np.ndarray:
+        # mmap can't map an empty region
+        if not shape[0]:
+            return np.empty(shape, dtype)
+        return np.memmap(self.path, dtype, "r", offset, shape)
+
+    @classmethod
+    def build(cls, path: str | os.PathLike, source: FingerprintMatrix | Iterable) -> "FingerprintIndex":
+        """Write an index file and open it.
+
+        :param path: Path of the index file. It is written to a temporary file first and then renamed, so readers never
+                     see a partial index.
+        :param source: A :class:`~pubchempy2.matrix.FingerprintMatrix` whose ids are CIDs, or
+                       :class:`~pubchempy2.pubchempy.Compound` objects.
+        """
+        matrix = source if isinstance(source, FingerprintMatrix) else FingerprintMatrix.from_compounds(source)
+        order = np.argsort(matrix.counts, kind="stable")
+        tmp = "%s.tmp" % os.fspath(path)
+        with open(tmp, "wb") as f:
+            header = _HEADER.pack(_MAGIC, matrix.nbits, matrix.words.shape[1], len(matrix))
+            f.write(header.ljust(_HEADER_SIZE, b"\0"))
+            np.ascontiguousarray(matrix.ids[order], dtype=np.int64).tofile(f)
+            np.ascontiguousarray(matrix.counts[order], dtype=np.int64).tofile(f)
+            np.ascontiguousarray(matrix.words[order], dtype=np.uint64).tofile(f)
+        os.replace(tmp, path)
+        return cls(path)
+
+    def __len__(self) -> int:
+        return len(self.cids)
+
+    def _query(self, query) -> tuple[np.ndarray, int]:
+        # Accept a Compound or SdfCompound as well as a Fingerprint
+        query = getattr(query, "binary_fingerprint", query)
+        if not isinstance(query, Fingerprint) or query.nbits != self.nbits:
+            raise ValueError("query must be a %s-bit Fingerprint" % self.nbits)
+        return pack([query], self.nbits)[0], query.popcount()
+
+    def _scan(self, rows: slice, words: np.ndarray, count: int, threshold: float) -> tuple[np.ndarray, np.ndarray]:
+        """Return the positions and similarities of the rows in a range at least ``threshold`` similar to a query."""
+        found_positions, found_scores = [], []
+        for block_start in range(rows.start, rows.stop, BLOCK_SIZE):
+            block = slice(block_start, min(block_start + BLOCK_SIZE, rows.stop))
+            scores = tanimoto_scores(popcount(self.words[block] & words), self.counts[block], count)
+            hits = np.flatnonzero(scores >= threshold)
+            found_positions.append(hits + block.start)
+            found_scores.append(scores[hits])
+        if not found_positions:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        return np.concatenate(found_positions), np.concatenate(found_scores)
+
+    def _hits(self, positions: np.ndarray, scores: np.ndarray) -> IndexHits:
+        return IndexHits(self.cids[positions].tolist(), scores.tolist())
+
+    def search(self, query, threshold: float = 0.8, k: Optional[int] = None) -> IndexHits:
+        """Find the fingerprints at least ``threshold`` similar to a query, optionally only the ``k`` most similar.
+
+        :param query: A :class:`~pubchempy2.fingerprint.Fingerprint`, or a compound with a ``binary_fingerprint``.
+        :param threshold: Minimum Tanimoto similarity.
+        :param k: (optional) Maximum number of results.
+        """
+        words, count = self._query(query)
+        if k is not None:
+            return self._search_top_k(words, count, k, threshold)
+        # Only rows with a popcount between threshold * count and count / threshold can reach the threshold
+        low = math.ceil(threshold * count - 1e-9)
+        high = math.floor(count / threshold + 1e-9) if threshold > 0 else math.inf
+        start = int(np.searchsorted(self.counts, low, "left"))
+        stop = int(np.searchsorted(self.counts, high, "right"))
+        positions, scores = self._scan(slice(start, stop), words, count, threshold)
+        order = np.argsort(-scores, kind="stable")
+        return self._hits(positions[order], scores[order])
+
+    def containing(self, query) -> list[int]:
+        """Return the CIDs of the fingerprints that have every bit of a query fingerprint set.
+
+        Only rows with at least as many bits set as the query are read. See
+        :func:`~pubchempy2.screen.substructure_search` for a substructure search restricted to the CIDs of an index.
+
+        :param query: A :class:`~pubchempy2.fingerprint.Fingerprint`, or a compound with a ``binary_fingerprint``.
+        """
+        words, count = self._query(query)
+        start = int(np.searchsorted(self.counts, count, "left"))
+        found = []
+        for block_start in range(start, len(self), BLOCK_SIZE):
+            block = slice(block_start, min(block_start + BLOCK_SIZE, len(self)))
+            hits = np.flatnonzero(((self.words[block] & words) == words).all(axis=1))
+            found.extend(self.cids[block][hits].tolist())
+        return found
+
+    @functools.cached_property
+    def _groups(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Popcounts present in the index, with the ranges of rows that have them."""
+        starts = np.flatnonzero(np.diff(self.counts, prepend=-1))
+        return np.asarray(self.counts[starts]), starts, np.append(starts[1:], len(self))
+
+    def _search_top_k(self, words: np.ndarray, count: int, k: int, threshold: float) -> IndexHits:
+        """Visit the groups of rows with the same popcount from the highest possible similarity down, and stop once no
+        remaining group can beat the k-th best similarity found."""
+        values, starts, stops = self._groups
+        largest = np.maximum(values, count)
+        bounds = np.minimum(values, count) / np.where(largest > 0, largest, 1)
+        best_positions, best_scores = np.empty(0, dtype=np.int64), np.empty(0)
+        for group in np.argsort(-bounds, kind="stable"):
+            if bounds[group] < threshold or (len(best_scores) == k and bounds[group] <= best_scores[-1]):
+                break
+            positions, scores = self._scan(slice(int(starts[group]), int(stops[group])), words, count, threshold)
+            best_positions, best_scores = _top_k(
+                np.concatenate([best_positions, positions]), np.concatenate([best_scores, scores]), k
+            )
+        return self._hits(best_positions, best_scores)
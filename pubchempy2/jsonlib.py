@@ -0,0 +1,67 @@
+import json
+import logging
+from typing import Any, Callable, Optional
+
+log = logging.getLogger("pubchempy")
+
+#: Decoder backends in order of preference
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _load_orjson() -> Callable[[bytes | str], Any]:
+    import orjson
+
+    return orjson.loads
+
+
+def _load_msgspec() -> Callable[[bytes | str], Any]:
+    import msgspec
+
+    decode = msgspec.json.decode
+
+    def loads(data: bytes | str) -> Any:
+        try:
+            return decode(data)
+        except msgspec.DecodeError as e:
+            # Raise a ValueError like the other backends, which callers already handle
+            raise ValueError(str(e)) from e
+
+    return loads
+
+
+_loaders = {"orjson": _load_orjson, "msgspec": _load_msgspec, "json": lambda: json.loads}
+
+backend: Optional[str] = None
+"""Name of the backend in use."""
+
+_loads: Callable[[bytes | str], Any] = json.loads
+
+
+def set_backend(name: Optional[str] = None) -> str:
+    """Select the JSON decoder backend and return its name.
+
+    :param name: One of :data:`BACKENDS`. By default the fastest installed backend is used.
+    :raises ImportError: If the requested backend isn't installed.
+    """
+    global backend, _loads
+
+    if name is not None:
+        if name not in _loaders:
+            raise ValueError("Unknown JSON backend: %s" % name)
+        _loads, backend = _loaders[name](), name
+        return backend
+    for candidate in BACKENDS:
+        try:
+            _loads, backend = _loaders[candidate](), candidate
+        except ImportError:
+            continue
+        log.debug("Decoding JSON with %s", backend)
+        return backend
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON directly from the response bytes, with the selected backend."""
+    return _loads(data)
+
+
+set_backend()
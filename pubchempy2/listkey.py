@@ -0,0 +1,138 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Any, Iterator, Optional
+
+from .pubchempy import TimeoutError, request
+
+log = logging.getLogger("pubchempy")
+
+
+def is_waiting(response) -> bool:
+    """Whether a response says the search behind a ListKey is still running."""
+    return response.status_code == 202 or b'"Waiting"' in response.content[:200]
+
+
+class ListKeyJob(Future):
+    """Future for the result of an asynchronous search, identified by its ListKey.
+
+    The result is the response of the requested operation and output format for the ListKey. Cancel the job to stop
+    polling.
+    """
+
+    def __init__(self, listkey: str, domain: str, operation: Optional[str], output: str, kwargs: dict, deadline: float):
+        super().__init__()
+        self.listkey = listkey
+        self.domain = domain
+        self.operation = operation
+        self.output = output
+        self.kwargs = kwargs
+        self.deadline = deadline
+        self.polls = 0
+        """Number of poll requests sent so far."""
+
+    def _resolve(self, result: Any = None, exception: Optional[BaseException] = None) -> None:
+        try:
+            if exception is not None:
+                self.set_exception(exception)
+            else:
+                self.set_result(result)
+        except InvalidStateError:
+            # The job was cancelled while the poll was in flight
+            pass
+
+
+class ListKeyPoller:
+    """Polls any number of outstanding ListKeys from a single scheduler thread.
+
+    Each ListKey is polled with the operation and output format finally wanted, so the finished result needs no extra
+    round trip. Poll intervals start at ``initial_interval`` and grow by ``backoff`` up to ``max_interval``.
+
+    :param initial_interval: Seconds before the first poll.
+    :param max_interval: Maximum seconds between two polls.
+    :param backoff: Factor the interval grows by after every poll.
+    :param timeout: Seconds after which a ListKey that is still not finished fails with a TimeoutError.
+    :param max_workers: Maximum number of poll requests in flight.
+    """
+
+    def __init__(
+        self,
+        initial_interval: float = 0.5,
+        max_interval: float = 8.0,
+        backoff: float = 1.5,
+        timeout: float = 600.0,
+        max_workers: int = 8,
+    ):
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._queue: list[tuple[float, int, ListKeyJob, Iterator[float]]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def intervals(self) -> Iterator[float]:
+        """Yield the successive poll intervals."""
+        interval = self.initial_interval
+        while True:
+            yield interval
+            interval = min(self.max_interval, interval * self.backoff)
+
+    def submit(
+        self, listkey: str, domain: str = "compound", operation: Optional[str] = None, output: str = "JSON", **kwargs
+    ) -> ListKeyJob:
+        """Start polling a ListKey and return a :class:`ListKeyJob` for its result."""
+        job = ListKeyJob(listkey, domain, operation, output, kwargs, time.monotonic() + self.timeout)
+        self._schedule(job, self.intervals())
+        return job
+
+    def _schedule(self, job: ListKeyJob, intervals: Iterator[float]) -> None:
+        delay = next(intervals)
+        if time.monotonic() + delay > job.deadline:
+            job._resolve(exception=TimeoutError("ListKey %s not finished after %s s" % (job.listkey, self.timeout)))
+            return
+        with self._condition:
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._counter), job, intervals))
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="pubchempy-listkey")
+                self._thread = threading.Thread(target=self._run, name="pubchempy-listkey-scheduler", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue or self._queue[0][0] > time.monotonic():
+                    self._condition.wait(self._queue[0][0] - time.monotonic() if self._queue else None)
+                _, _, job, intervals = heapq.heappop(self._queue)
+            if not job.cancelled():
+                self._executor.submit(self._poll, job, intervals)
+
+    def _poll(self, job: ListKeyJob, intervals: Iterator[float]) -> None:
+        try:
+            response = request(job.listkey, "listkey", job.domain, job.operation, job.output, **job.kwargs)
+        except Exception as e:
+            job._resolve(exception=e)
+            return
+        job.polls += 1
+        if is_waiting(response):
+            log.debug("ListKey %s still running after %s polls", job.listkey, job.polls)
+            self._schedule(job, intervals)
+        else:
+            job._resolve(response)
+
+
+#: Poller used by :func:`~pubchempy2.pubchempy.get` for asynchronous searches
+default_poller = ListKeyPoller()
+
+
+def wait_all(jobs: list[ListKeyJob], timeout: Optional[float] = None) -> list[Any]:
+    """Wait for several ListKey jobs and return their results in order."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    return [job.result(None if deadline is None else max(0.0, deadline - time.monotonic())) for job in jobs]
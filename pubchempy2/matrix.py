@@ -0,0 +1,240 @@
+"""Vectorized similarity search over many fingerprints at once.
+
+Requires the optional numpy dependency.
+"""
+
+from typing import Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from .fingerprint import CACTVS_BITS, Fingerprint
+
+#: Number of fingerprints compared at once in one-vs-all searches
+BLOCK_SIZE = 65536
+
+#: Number of fingerprints on each side of the blocks compared at once in all-vs-all searches
+PAIR_BLOCK_SIZE = 256
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Count the bits set in packed fingerprints, summing over the last axis."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    # numpy < 2.0 has no popcount ufunc, fall back to a lookup table over the bytes
+    return _POPCOUNT_TABLE[np.ascontiguousarray(words).view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def pack(fingerprints: Iterable[Fingerprint], nbits: int = CACTVS_BITS) -> np.ndarray:
+    """Pack fingerprints into a (N, W) array of uint64 words, padding each fingerprint with zero bits."""
+    nbytes = (nbits + 63) // 64 * 8
+    data = bytearray()
+    for fingerprint in fingerprints:
+        if fingerprint.nbits != nbits:
+            raise ValueError("Fingerprints have different lengths: %s and %s bits" % (fingerprint.nbits, nbits))
+        data += fingerprint.to_bytes().ljust(nbytes, b"\0")
+    return np.frombuffer(bytes(data), dtype=np.uint64).reshape(-1, nbytes // 8)
+
+
+def tanimoto_scores(intersections: np.ndarray, counts_a: np.ndarray, counts_b: np.ndarray) -> np.ndarray:
+    """Tanimoto similarities from the numbers of bits set in both fingerprints and in each of them."""
+    unions = counts_a + counts_b - intersections
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(unions > 0, intersections / unions, 0.0)
+
+
+class FingerprintMatrix:
+    """Many fingerprints packed into a NumPy array, for vectorized one-vs-all and all-vs-all similarity searches.
+
+    Searches run over blocks of rows, so the memory used on top of the matrix itself stays bounded however many
+    fingerprints it holds. Results are row indices; ``matrix.ids[indices]`` gives the corresponding CIDs.
+
+    Usage::
+
+        matrix = FingerprintMatrix.from_compounds(get_compounds(cids))
+        indices, scores = matrix.top_k(query.binary_fingerprint, 10)
+        similar_cids = matrix.ids[indices]
+
+    :param words: (N, W) array of uint64 words, as returned by :func:`pack`.
+    :param ids: (optional) Identifiers of the rows, such as CIDs.
+    :param nbits: Length of the fingerprints in bits.
+    """
+
+    def __init__(self, words: np.ndarray, ids: Optional[Sequence[int]] = None, nbits: int = CACTVS_BITS):
+        self.words = words
+        self.nbits = nbits
+        self.counts = popcount(words)
+        """Number of bits set in each fingerprint."""
+        self.ids = np.arange(len(words)) if ids is None else np.asarray(ids)
+        if len(self.ids) != len(words):
+            raise ValueError("Got %s ids for %s fingerprints" % (len(self.ids), len(words)))
+
+    @classmethod
+    def from_fingerprints(
+        cls, fingerprints: Iterable[Fingerprint], ids: Optional[Sequence[int]] = None, nbits: int = CACTVS_BITS
+    ) -> "FingerprintMatrix":
+        """Build from :class:`~pubchempy2.fingerprint.Fingerprint` objects."""
+        return cls(pack(fingerprints, nbits), ids, nbits)
+
+    @classmethod
+    def from_compounds(cls, compounds: Iterable) -> "FingerprintMatrix":
+        """Build from :class:`~pubchempy2.pubchempy.Compound` objects, with their CIDs as ids."""
+        compounds = list(compounds)
+        return cls.from_fingerprints([c.binary_fingerprint for c in compounds], [c.cid for c in compounds])
+
+    @classmethod
+    def from_properties(cls, properties: Iterable[dict]) -> "FingerprintMatrix":
+        """Build from the results of :func:`~pubchempy2.pubchempy.get_properties` for the ``Fingerprint2D``
+        property, with their CIDs as ids."""
+        properties = list(properties)
+        fingerprints = [Fingerprint.from_base64(p["Fingerprint2D"]) for p in properties]
+        return cls.from_fingerprints(fingerprints, [p["CID"] for p in properties])
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def fingerprint(self, index: int) -> Fingerprint:
+        """Return the fingerprint of a row."""
+        return Fingerprint.from_bytes(self.words[index].tobytes(), self.nbits)
+
+    def _query(self, query: Fingerprint) -> np.ndarray:
+        return pack([query], self.nbits)[0]
+
+    def _blocks(self, block_size: int) -> Iterator[slice]:
+        for start in range(0, len(self), block_size):
+            yield slice(start, min(start + block_size, len(self)))
+
+    def tanimoto(self, query: Fingerprint, block_size: int = BLOCK_SIZE) -> np.ndarray:
+        """Tanimoto similarity of a fingerprint to every row."""
+        words, count = self._query(query), query.popcount()
+        scores = np.empty(len(self))
+        for block in self._blocks(block_size):
+            intersections = popcount(self.words[block] & words)
+            scores[block] = tanimoto_scores(intersections, self.counts[block], count)
+        return scores
+
+    def top_k(self, query: Fingerprint, k: int, block_size: int = BLOCK_SIZE) -> tuple[np.ndarray, np.ndarray]:
+        """Return the indices and similarities of the ``k`` rows most similar to a fingerprint, most similar first."""
+        best_indices, best_scores = np.empty(0, dtype=np.int64), np.empty(0)
+        words, count = self._query(query), query.popcount()
+        for block in self._blocks(block_size):
+            scores = tanimoto_scores(popcount(self.words[block] & words), self.counts[block], count)
+            indices = np.arange(block.start, block.stop)
+            best_indices, best_scores = _top_k(
+                np.concatenate([best_indices, indices]), np.concatenate([best_scores, scores]), k
+            )
+        return best_indices, best_scores
+
+    def threshold(
+        self, query: Fingerprint, threshold: float, block_size: int = BLOCK_SIZE
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the indices and similarities of all rows at least ``threshold`` similar to a fingerprint, most
+        similar first."""
+        words, count = self._query(query), query.popcount()
+        found_indices, found_scores = [], []
+        for block in self._blocks(block_size):
+            scores = tanimoto_scores(popcount(self.words[block] & words), self.counts[block], count)
+            hits = np.flatnonzero(scores >= threshold)
+            found_indices.append(hits + block.start)
+            found_scores.append(scores[hits])
+        indices, scores = np.concatenate(found_indices or [[]]).astype(np.int64), np.concatenate(found_scores or [[]])
+        order = np.argsort(-scores, kind="stable")
+        return indices[order], scores[order]
+
+    def containing(self, query: Fingerprint, block_size: int = BLOCK_SIZE) -> np.ndarray:
+        """Return the indices of the rows that have every bit of a fingerprint set, in order.
+
+        This is the fingerprint screen for substructure searches: a compound can only contain the query as a
+        substructure if its fingerprint contains the query fingerprint.
+        """
+        words, count = self._query(query), query.popcount()
+        found = []
+        for block in self._blocks(block_size):
+            # Rows with fewer bits set can't contain the query, skip comparing their words
+            candidates = np.flatnonzero(self.counts[block] >= count) + block.start
+            found.append(candidates[((self.words[candidates] & words) == words).all(axis=1)])
+        return np.concatenate(found).astype(np.int64) if found else np.empty(0, dtype=np.int64)
+
+    def _pair_blocks(
+        self, other: Optional["FingerprintMatrix"], block_size: int
+    ) -> Iterator[tuple[slice, slice, np.ndarray]]:
+        """Yield the Tanimoto similarities between blocks of rows of this matrix and of ``other``."""
+        other = self if other is None else other
+        if other.nbits != self.nbits:
+            raise ValueError("Fingerprints have different lengths: %s and %s bits" % (self.nbits, other.nbits))
+        for rows in self._blocks(block_size):
+            for columns in other._blocks(block_size):
+                intersections = popcount(self.words[rows, None, :] & other.words[None, columns, :])
+                yield rows, columns, tanimoto_scores(
+                    intersections, self.counts[rows, None], other.counts[None, columns]
+                )
+
+    def tanimoto_matrix(
+        self, other: Optional["FingerprintMatrix"] = None, block_size: int = PAIR_BLOCK_SIZE
+    ) -> np.ndarray:
+        """Tanimoto similarity between every row and every row of ``other``, or of this matrix itself.
+
+        The result has ``len(self) * len(other)`` entries, so use :meth:`nearest_neighbours` or
+        :meth:`threshold_pairs` for large matrices.
+        """
+        result = np.empty((len(self), len(self if other is None else other)), dtype=np.float32)
+        for rows, columns, scores in self._pair_blocks(other, block_size):
+            result[rows, columns] = scores
+        return result
+
+    def nearest_neighbours(
+        self, k: int, other: Optional["FingerprintMatrix"] = None, block_size: int = PAIR_BLOCK_SIZE
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the indices and similarities of the ``k`` most similar rows of ``other`` for every row.
+
+        Without ``other``, rows are compared to each other, leaving out each row itself. Results are (N, k) arrays,
+        most similar first. Rows with fewer than ``k`` candidates are padded with index -1 and similarity NaN.
+        """
+        indices = np.full((len(self), k), -1, dtype=np.int64)
+        scores = np.full((len(self), k), -np.inf)
+        for rows, columns, block_scores in self._pair_blocks(other, block_size):
+            if other is None:
+                same = np.arange(max(rows.start, columns.start), min(rows.stop, columns.stop))
+                block_scores[same - rows.start, same - columns.start] = -np.inf
+            column_indices = np.broadcast_to(np.arange(columns.start, columns.stop), block_scores.shape)
+            candidate_indices = np.concatenate([indices[rows], column_indices], axis=1)
+            candidate_scores = np.concatenate([scores[rows], block_scores], axis=1)
+            order = np.argsort(-candidate_scores, axis=1, kind="stable")[:, :k]
+            indices[rows] = np.take_along_axis(candidate_indices, order, axis=1)
+            scores[rows] = np.take_along_axis(candidate_scores, order, axis=1)
+        missing = np.isneginf(scores)
+        indices[missing] = -1
+        scores[missing] = np.nan
+        return indices, scores
+
+    def threshold_pairs(
+        self, threshold: float, other: Optional["FingerprintMatrix"] = None, block_size: int = PAIR_BLOCK_SIZE
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the row indices, column indices and similarities of all pairs at least ``threshold`` similar.
+
+        Without ``other``, each unordered pair of distinct rows of this matrix is returned once.
+        """
+        found_rows, found_columns, found_scores = [], [], []
+        for rows, columns, scores in self._pair_blocks(other, block_size):
+            if other is None and columns.stop <= rows.start:
+                continue
+            hits = scores >= threshold
+            if other is None:
+                hits &= np.arange(rows.start, rows.stop)[:, None] < np.arange(columns.start, columns.stop)[None, :]
+            row_hits, column_hits = np.nonzero(hits)
+            found_rows.append(row_hits + rows.start)
+            found_columns.append(column_hits + columns.start)
+            found_scores.append(scores[row_hits, column_hits])
+        if not found_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        return np.concatenate(found_rows), np.concatenate(found_columns), np.concatenate(found_scores)
+
+
+def _top_k(indices: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Keep the ``k`` highest scores, sorted from highest to lowest."""
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        indices, scores = indices[keep], scores[keep]
+    order = np.argsort(-scores, kind="stable")
+    return indices[order], scores[order]
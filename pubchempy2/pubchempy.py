@@ -5,16 +5,25 @@ Python interface for the PubChem PUG REST service.
 """
 
 import functools
+import hashlib
 import logging
 import os
-import time
 import warnings
-from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations, zip_longest
+from operator import attrgetter
 from urllib.parse import quote
 
-import requests
 from requests.exceptions import HTTPError
 
+from .batch import CHUNKABLE_NAMESPACES, chunk_identifiers, chunk_size, map_chunks, merge_results
+from .cache import cache_key, memory_cache
+from .client import get_client
+from .errors import NetworkError, PubChemPyError  # noqa: F401
+from .fingerprint import Fingerprint
+from .jsonlib import loads
+from .stream import iter_json_array
+
 API_BASE = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
 
 log = logging.getLogger("pubchempy")
@@ -209,12 +218,8 @@ ELEMENTS = {
 }
 
 
-def request(identifier, namespace="cid", domain="compound", operation=None, output="JSON", searchtype=None, **kwargs):
-    """
-    Construct API request from parameters and return the response.
-
-    Full specification at http://pubchem.ncbi.nlm.nih.gov/pug_rest/PUG_REST.html
-    """
+def _build_request(identifier, namespace, domain, operation, output, searchtype, **kwargs):
+    """Construct the API URL and POST data for a request from parameters."""
     if not identifier:
         raise ValueError("identifier/cid cannot be None")
     # If identifier is a list, join with commas into string
@@ -241,55 +246,101 @@ def request(identifier, namespace="cid", domain="compound", operation=None, outp
     apiurl = "/".join(comps)
     if kwargs:
         postdata |= kwargs
+    return apiurl, postdata
+
+
+def request(identifier, namespace="cid", domain="compound", operation=None, output="JSON", searchtype=None, **kwargs):
+    """
+    Construct API request from parameters and return the response.
+
+    Full specification at http://pubchem.ncbi.nlm.nih.gov/pug_rest/PUG_REST.html
+    """
+    apiurl, postdata = _build_request(identifier, namespace, domain, operation, output, searchtype, **kwargs)
     # Make request
     try:
         log.debug("Request URL: %s", apiurl)
         log.debug("Request data: %s", postdata)
-        response = requests.post(url=apiurl, data=postdata, timeout=10)
+        response = get_client().post(url=apiurl, data=postdata)
         response.raise_for_status()
         return response
     except HTTPError as e:
         raise PubChemHTTPError(e)
 
 
+def _request_stream(apiurl, postdata, headers=None):
+    """Send a request without reading the response body, which the caller reads incrementally and then closes."""
+    try:
+        log.debug("Request URL: %s", apiurl)
+        log.debug("Request data: %s", postdata)
+        response = get_client().post(url=apiurl, data=postdata, headers=headers, stream=True)
+        response.raise_for_status()
+        return response
+    except HTTPError as e:
+        raise PubChemHTTPError(e)
+
+
+def _is_async_search(namespace, searchtype):
+    """Whether the search may be answered asynchronously with a ListKey that has to be polled."""
+    return bool(searchtype and searchtype != "xref" and not searchtype.startswith("fast")) or namespace in ["formula"]
+
+
 def get(identifier, namespace="cid", domain="compound", operation=None, output="JSON", searchtype=None, **kwargs):
     """Request wrapper that automatically handles async requests."""
-    if (searchtype and searchtype != "xref") or namespace in ["formula"]:
+    if _is_async_search(namespace, searchtype):
         response = request(identifier, namespace, domain, None, "JSON", searchtype, **kwargs)
-        status = response.json()
+        status = loads(response.content)
         if "Waiting" in status and "ListKey" in status["Waiting"]:
-            identifier = status["Waiting"]["ListKey"]
-            namespace = "listkey"
-            while "Waiting" in status and "ListKey" in status["Waiting"]:
-                time.sleep(2)
-                response = request(identifier, namespace, domain, operation, "JSON", **kwargs)
-                status = response.json()
-            if not output == "JSON":
-                response = request(identifier, namespace, domain, operation, output, searchtype, **kwargs)
+            from .listkey import default_poller
+
+            listkey = status["Waiting"]["ListKey"]
+            response = default_poller.submit(listkey, domain, operation, output, **kwargs).result()
     else:
         response = request(identifier, namespace, domain, operation, output, searchtype, **kwargs)
     return response
 
 
 def get_json(identifier, namespace="cid", domain="compound", operation=None, searchtype=None, **kwargs):
-    """Request wrapper that automatically parses JSON response and supresses NotFoundError."""
+    """Request wrapper that automatically parses JSON response and supresses NotFoundError.
+
+    Long lists of CIDs, SIDs or AIDs are split into several requests that are sent concurrently, and their results are
+    merged in input order.
+    """
+    chunks = _chunk_identifier(identifier, namespace, operation, searchtype)
+    if len(chunks) > 1:
+        return merge_results(
+            map_chunks(lambda chunk: get_json(chunk, namespace, domain, operation, searchtype, **kwargs), chunks)
+        )
     try:
-        return get(identifier, namespace, domain, operation, "JSON", searchtype, **kwargs).json()
+        return loads(get(identifier, namespace, domain, operation, "JSON", searchtype, **kwargs).content)
     except NotFoundError as e:
         log.info(e)
         return None
 
 
+def _chunk_identifier(identifier, namespace, operation, searchtype):
+    """Split a list (or comma-separated string) of CIDs, SIDs or AIDs into chunks small enough for one request."""
+    if searchtype or namespace not in CHUNKABLE_NAMESPACES or isinstance(identifier, int):
+        return [identifier]
+    if isinstance(identifier, text_types):
+        if isinstance(identifier, bytes):
+            identifier = identifier.decode()
+        identifier = identifier.split(",")
+    return chunk_identifiers(list(identifier), operation) or [identifier]
+
+
 def get_sdf(identifier, namespace="cid", domain="compound", operation=None, searchtype=None, **kwargs):
-    """Request wrapper that automatically parses SDF response and supresses NotFoundError."""
+    """Request wrapper that returns the SDF response as text and supresses NotFoundError.
+
+    Use :func:`~pubchempy2.sdf.iter_sdf_compounds` to parse large SDF responses incrementally instead.
+    """
     try:
-        return get(identifier, namespace, domain, operation, "SDF", searchtype, **kwargs).json()
+        return get(identifier, namespace, domain, operation, "SDF", searchtype, **kwargs).text
     except NotFoundError as e:
         log.info(e)
         return None
 
 
-def get_compounds(identifier, namespace="cid", searchtype=None, as_dataframe=False, **kwargs):
+def get_compounds(identifier, namespace="cid", searchtype=None, as_dataframe=False, stream=False, **kwargs):
     """Retrieve the specified compound records from PubChem.
 
     :param identifier: The compound identifier to use as a search query.
@@ -297,7 +348,12 @@ def get_compounds(identifier, namespace="cid", searchtype=None, as_dataframe=Fal
     :param searchtype: (optional) The advanced search type, one of substructure, superstructure or similarity.
     :param as_dataframe: (optional) Automatically extract the :class:`~pubchempy.Compound` properties into a pandas
                          :class:`~pandas.DataFrame` and return that.
+    :param stream: (optional) Return an iterator that parses the response incrementally and yields each
+                   :class:`~pubchempy.Compound` as soon as its record has arrived, instead of a list.
     """
+    if stream:
+        compounds = (Compound(r) for r in _stream_records(identifier, namespace, "compound", searchtype, **kwargs))
+        return compounds_to_frame(list(compounds)) if as_dataframe else compounds
     results = get_json(identifier, namespace, searchtype=searchtype, **kwargs)
     compounds = [Compound(r) for r in results["PC_Compounds"]] if results else []
     if as_dataframe:
@@ -305,14 +361,19 @@ def get_compounds(identifier, namespace="cid", searchtype=None, as_dataframe=Fal
     return compounds
 
 
-def get_substances(identifier, namespace="sid", as_dataframe=False, **kwargs):
+def get_substances(identifier, namespace="sid", as_dataframe=False, stream=False, **kwargs):
     """Retrieve the specified substance records from PubChem.
 
     :param identifier: The substance identifier to use as a search query.
     :param namespace: (optional) The identifier type, one of sid, name or sourceid/<source name>.
     :param as_dataframe: (optional) Automatically extract the :class:`~pubchempy.Substance` properties into a pandas
                          :class:`~pandas.DataFrame` and return that.
+    :param stream: (optional) Return an iterator that parses the response incrementally and yields each
+                   :class:`~pubchempy.Substance` as soon as its record has arrived, instead of a list.
     """
+    if stream:
+        substances = (Substance(r) for r in _stream_records(identifier, namespace, "substance", **kwargs))
+        return substances_to_frame(list(substances)) if as_dataframe else substances
     results = get_json(identifier, namespace, "substance", **kwargs)
     substances = [Substance(r) for r in results["PC_Substances"]] if results else []
     if as_dataframe:
@@ -320,6 +381,42 @@ def get_substances(identifier, namespace="sid", as_dataframe=False, **kwargs):
     return substances
 
 
+#: Size in bytes of the chunks read from streamed JSON responses
+STREAM_CHUNK_SIZE = 64 * 1024
+
+#: Array holding the records in JSON responses, by domain
+RECORD_KEYS = {"compound": "PC_Compounds", "substance": "PC_Substances"}
+
+
+def _stream_records(identifier, namespace, domain, searchtype=None, **kwargs):
+    """Yield the JSON records of a search one by one, parsing each response incrementally as it arrives."""
+    return _stream(
+        identifier,
+        namespace,
+        domain,
+        "JSON",
+        searchtype,
+        lambda response: iter_json_array(response.iter_content(STREAM_CHUNK_SIZE), RECORD_KEYS[domain]),
+        **kwargs,
+    )
+
+
+def _stream(identifier, namespace, domain, output, searchtype, parse, **kwargs):
+    """Yield the items that ``parse`` reads incrementally from each streamed response of a search.
+
+    Long lists of CIDs or SIDs are requested in chunks, one after another, so only a single item is held at a time.
+    """
+    if _is_async_search(namespace, searchtype):
+        identifier, namespace, searchtype, kwargs = _listkey_request(identifier, namespace, domain, searchtype, kwargs)
+    for chunk in _chunk_identifier(identifier, namespace, None, searchtype):
+        apiurl, postdata = _build_request(chunk, namespace, domain, None, output, searchtype, **kwargs)
+        try:
+            with _request_stream(apiurl, postdata) as response:
+                yield from parse(response)
+        except NotFoundError as e:
+            log.info(e)
+
+
 def get_assays(identifier, namespace="aid", **kwargs):
     """Retrieve the specified assay records from PubChem.
 
@@ -375,6 +472,13 @@ PROPERTY_MAP = {
 }
 
 
+def _property_operation(properties):
+    """Construct the property operation from a list or comma-separated string of property names."""
+    if isinstance(properties, text_types):
+        properties = properties.split(",")
+    return "property/%s" % ",".join([PROPERTY_MAP.get(p, p) for p in properties])
+
+
 def get_properties(properties, identifier, namespace="cid", searchtype=None, as_dataframe=False, **kwargs):
     """Retrieve the specified properties from PubChem.
 
@@ -383,11 +487,8 @@ def get_properties(properties, identifier, namespace="cid", searchtype=None, as_
     :param searchtype: (optional) The advanced search type, one of substructure, superstructure or similarity.
     :param as_dataframe: (optional) Automatically extract the properties into a pandas :class:`~pandas.DataFrame`.
     """
-    if isinstance(properties, text_types):
-        properties = properties.split(",")
-    properties = ",".join([PROPERTY_MAP.get(p, p) for p in properties])
-    properties = "property/%s" % properties
-    results = get_json(identifier, namespace, "compound", properties, searchtype=searchtype, **kwargs)
+    operation = _property_operation(properties)
+    results = get_json(identifier, namespace, "compound", operation, searchtype=searchtype, **kwargs)
     results = results["PropertyTable"]["Properties"] if results else []
     if as_dataframe:
         import pandas as pd
@@ -431,12 +532,129 @@ def get_aids(identifier, namespace="cid", domain="compound", searchtype=None, **
         return results["InformationList"]["Information"]
 
 
+#: Operation returning the identifiers of the records found by a search, by domain
+IDENTIFIER_OPERATIONS = {"compound": "cids", "substance": "sids", "assay": "aids"}
+
+#: Options that only apply to running a search, and not to retrieving its results from the ListKey
+SEARCH_OPTIONS = frozenset(
+    [
+        "MatchIsotopes",
+        "MatchCharges",
+        "MatchTautomers",
+        "RingsNotEmbedded",
+        "SingleDoubleBondsMatch",
+        "ChainsMatchRings",
+        "StripHydrogen",
+        "Stereo",
+        "Threshold",
+        "MaxSeconds",
+        "MaxRecords",
+        "AllowOtherElements",
+        "identity_type",
+        "name_type",
+    ]
+)
+
+
+def _search_listkey(identifier, namespace, searchtype, domain="compound", **kwargs):
+    """Run a search and return the ListKey that the identifiers of the records it found are stored under."""
+    operation = IDENTIFIER_OPERATIONS[domain]
+    if _is_async_search(namespace, searchtype):
+        status = loads(request(identifier, namespace, domain, None, "JSON", searchtype, **kwargs).content)
+        if "Waiting" in status and "ListKey" in status["Waiting"]:
+            from .listkey import default_poller
+
+            listkey = status["Waiting"]["ListKey"]
+            # Only wait for the search to finish, without downloading its results
+            default_poller.submit(listkey, domain, operation, "JSON", listkey_count=1).result()
+            return listkey
+    results = request(identifier, namespace, domain, operation, "JSON", searchtype, list_return="listkey", **kwargs)
+    return loads(results.content)["IdentifierList"]["ListKey"]
+
+
+def _listkey_request(identifier, namespace, domain, searchtype, kwargs):
+    """Run an asynchronous search with the search options among ``kwargs``, and return the identifier, namespace,
+    search type and remaining options that retrieve its results from the ListKey."""
+    search_options = {k: v for k, v in kwargs.items() if k in SEARCH_OPTIONS}
+    options = {k: v for k, v in kwargs.items() if k not in SEARCH_OPTIONS}
+    return _search_listkey(identifier, namespace, searchtype, domain, **search_options), "listkey", None, options
+
+
+def _iter_listkey(listkey, operation, extract, page_size=None):
+    """Yield the results of an operation on a ListKey page by page, fetching the next page in the background."""
+    page_size = page_size or chunk_size(operation)
+
+    def fetch(start):
+        results = get_json(listkey, "listkey", "compound", operation, listkey_start=start, listkey_count=page_size)
+        return extract(results) if results else []
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        start = 0
+        future = executor.submit(fetch, start)
+        while True:
+            page = future.result()
+            if len(page) < page_size:
+                yield from page
+                return
+            start += page_size
+            future = executor.submit(fetch, start)
+            yield from page
+
+
+def iter_cids(identifier, namespace="name", searchtype=None, page_size=None, **kwargs):
+    """Iterate over the CIDs found by a compound search, in pages of ``page_size`` CIDs.
+
+    Memory use stays constant regardless of the number of results, as only the current and the next page are held.
+
+    :param identifier: The compound identifier to use as a search query.
+    :param namespace: (optional) The identifier type.
+    :param searchtype: (optional) The advanced search type, one of substructure, superstructure or similarity.
+    :param page_size: (optional) Number of results requested at once.
+    """
+    listkey = _search_listkey(identifier, namespace, searchtype, **kwargs)
+    yield from _iter_listkey(listkey, "cids", lambda r: r["IdentifierList"]["CID"], page_size)
+
+
+def iter_compounds(identifier, namespace="cid", searchtype=None, page_size=None, **kwargs):
+    """Iterate over the :class:`~pubchempy.Compound` records found by a search, in pages of ``page_size`` records.
+
+    Memory use stays constant regardless of the number of results, as only the current and the next page are held.
+
+    :param identifier: The compound identifier to use as a search query.
+    :param namespace: (optional) The identifier type.
+    :param searchtype: (optional) The advanced search type, one of substructure, superstructure or similarity.
+    :param page_size: (optional) Number of results requested at once.
+    """
+    listkey = _search_listkey(identifier, namespace, searchtype, **kwargs)
+    for record in _iter_listkey(listkey, "record", lambda r: r["PC_Compounds"], page_size):
+        yield Compound(record)
+
+
+def iter_properties(properties, identifier, namespace="cid", searchtype=None, page_size=None, **kwargs):
+    """Iterate over the properties of the compounds found by a search, in pages of ``page_size`` compounds.
+
+    Memory use stays constant regardless of the number of results, as only the current and the next page are held.
+
+    :param identifier: The compound identifier to use as a search query.
+    :param namespace: (optional) The identifier type.
+    :param searchtype: (optional) The advanced search type, one of substructure, superstructure or similarity.
+    :param page_size: (optional) Number of results requested at once.
+    """
+    listkey = _search_listkey(identifier, namespace, searchtype, **kwargs)
+    operation = _property_operation(properties)
+    yield from _iter_listkey(listkey, operation, lambda r: r["PropertyTable"]["Properties"], page_size)
+
+
 def get_all_sources(domain="substance"):
     """Return a list of all current depositors of substances or assays."""
-    results = get(domain, None, "sources").json()
+    results = loads(get(domain, None, "sources").content)
     return results["InformationList"]["SourceName"]
 
 
+#: Size in bytes of the chunks written to disk by :func:`download`
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
 def download(
     outformat,
     path,
@@ -446,33 +664,160 @@ def download(
     operation=None,
     searchtype=None,
     overwrite=False,
+    checksum=None,
+    progress=None,
     **kwargs,
 ):
-    """Format can be  XML, ASNT/B, JSON, SDF, CSV, PNG, TXT."""
-    response = get(identifier, namespace, domain, operation, outformat, searchtype, **kwargs)
+    """Format can be  XML, ASNT/B, JSON, SDF, CSV, PNG, TXT.
+
+    The response is streamed to a ``.part`` file next to ``path`` in chunks, which is renamed to ``path`` once complete,
+    so memory use stays constant and ``path`` never holds a partial file. When the connection drops, the download is
+    resumed from the end of the ``.part`` file if the server supports range requests, and started over otherwise.
+    Resumes count against the retry budget of the client's retry policy. A ``.part`` file left over by a different
+    request is discarded rather than resumed.
+
+    :param checksum: (optional) Expected SHA-256 hex digest of the file. The file is not kept if it doesn't match.
+    :param progress: (optional) Callable called as ``progress(path, downloaded, total)`` after every chunk, where
+                     ``total`` is ``None`` if the size is unknown.
+    :returns: The SHA-256 hex digest of the file.
+    """
     if not overwrite and os.path.isfile(path):
         raise IOError("%s already exists. Use 'overwrite=True' to overwrite it." % path)
-    with open(path, "wb") as f:
-        f.write(response.content)
+    if _is_async_search(namespace, searchtype):
+        # Wait for the search to finish, then stream its results from the ListKey
+        identifier, namespace, searchtype, kwargs = _listkey_request(identifier, namespace, domain, searchtype, kwargs)
+    apiurl, postdata = _build_request(identifier, namespace, domain, operation, outformat, searchtype, **kwargs)
+    part = "%s.part" % path
+    _claim_part(part, cache_key(apiurl, postdata))
+    client = get_client()
+    digest = None
+
+    def attempt():
+        nonlocal digest
+        offset = os.path.getsize(part) if os.path.isfile(part) else 0
+        headers = {"Range": "bytes=%d-" % offset} if offset else None
+        log.debug("Request URL: %s", apiurl)
+        log.debug("Request data: %s", postdata)
+        with client.post(apiurl, postdata, retry=False, headers=headers, stream=True) as response:
+            if response.ok:
+                digest = _stream_to_file(response, path, part, offset, progress)
+            else:
+                # Read the error details before the connection is released
+                response.content
+        return response
+
+    response = attempt() if client.retry_policy is None else client.retry_policy.call(attempt)
+    try:
+        response.raise_for_status()
+    except HTTPError as e:
+        raise PubChemHTTPError(e)
+    if checksum is not None and digest != checksum.lower():
+        _remove_part(part)
+        raise IOError("Checksum mismatch for %s: expected %s, got %s" % (path, checksum, digest))
+    os.replace(part, path)
+    _remove_part(part)
+    return digest
+
+
+def _claim_part(part, key):
+    """Record the request a ``.part`` file is downloaded from, discarding a partial file of a different request."""
+    try:
+        with open("%s.key" % part) as f:
+            stale = f.read() != key
+    except FileNotFoundError:
+        stale = True
+    if stale:
+        _remove_part(part)
+        with open("%s.key" % part, "w") as f:
+            f.write(key)
+
+
+def _remove_part(part):
+    """Remove a ``.part`` file and the record of its request."""
+    for filename in (part, "%s.key" % part):
+        if os.path.isfile(filename):
+            os.remove(filename)
+
+
+def _stream_to_file(response, path, part, offset, progress=None):
+    """Write a streamed response into ``part``, after its first ``offset`` bytes if the server answered the range
+    request, and return the SHA-256 of the whole file."""
+    sha256 = hashlib.sha256()
+    if offset and response.status_code == 206:
+        with open(part, "rb") as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+        mode = "ab"
+    else:
+        # Range not supported, start over
+        offset, mode = 0, "wb"
+    length = response.headers.get("Content-Length")
+    total = offset + int(length) if length and "Content-Encoding" not in response.headers else None
+    downloaded = offset
+    with open(part, mode) as f:
+        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+            f.write(chunk)
+            sha256.update(chunk)
+            downloaded += len(chunk)
+            if progress is not None:
+                progress(path, downloaded, total)
+    return sha256.hexdigest()
+
+
+def download_many(manifest, max_workers=4, progress=None):
+    """Run several downloads concurrently.
+
+    :param manifest: Iterable of mappings of keyword arguments for :func:`download`, each with at least ``outformat``,
+                     ``path`` and ``identifier``.
+    :param max_workers: Maximum number of downloads in progress at once. Requests still go through the shared rate
+                        limiter of the client.
+    :param progress: (optional) Callable called as ``progress(path, downloaded, total)``, passed to every download.
+    :returns: List of the SHA-256 hex digests of the files, in the order of the manifest.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pubchempy-download") as executor:
+        futures = [executor.submit(download, **dict({"progress": progress}, **entry)) for entry in manifest]
+        return [future.result() for future in futures]
 
 
 def memoized_property(fget):
     """Decorator to create memoized properties.
 
     Used to cache :class:`~pubchempy.Compound` and :class:`~pubchempy.Substance` properties that require an additional
-    request.
+    request. Results are also shared between instances for the same record through the process-wide memory cache, keyed
+    by the ``_memo_key()`` of the instance.
     """
     attr_name = "_{0}".format(fget.__name__)
 
     @functools.wraps(fget)
     def fget_memoized(self):
         if not hasattr(self, attr_name):
-            setattr(self, attr_name, fget(self))
+            setattr(self, attr_name, memory_cache.get_or_set(self._memo_key(fget.__name__), lambda: fget(self)))
         return getattr(self, attr_name)
 
     return property(fget_memoized)
 
 
+@functools.cache
+def _default_properties(cls):
+    """Names of the properties of a class included by ``to_dict()`` by default, found once per class.
+
+    Properties named in the ``_to_dict_skip`` attribute of the class are left out.
+    """
+    skip = getattr(cls, "_to_dict_skip", ())
+    return tuple(p for p in dir(cls) if isinstance(getattr(cls, p), property) and p not in skip)
+
+
+def _to_columns(records, properties):
+    """Extract properties from many records into one list of values per property, in order."""
+    columns = {}
+    for p in properties:
+        values = list(map(attrgetter(p), records))
+        if p in {"atoms", "bonds"}:
+            values = [[i.to_dict() for i in value] for value in values]
+        columns[p] = values
+    return columns
+
+
 def deprecated(message=None):
     """Decorator to mark functions as deprecated. A warning will be emitted when the function is used."""
 
@@ -494,6 +839,9 @@ def deprecated(message=None):
 class Atom(object):
     """Class to represent an atom in a :class:`~pubchempy.Compound`."""
 
+    # Large records hold many atoms, so they are kept compact without a per-instance __dict__
+    __slots__ = ("aid", "number", "x", "y", "z", "charge")
+
     def __init__(self, aid, number, x=None, y=None, z=None, charge=0):
         """Initialize with an atom ID, atomic number, coordinates and optional change.
 
@@ -521,10 +869,11 @@ class Atom(object):
         return "Atom(%s, %s)" % (self.aid, self.element)
 
     def __eq__(self, other):
+        # Compare atomic numbers rather than the element symbols derived from them
         return (
             isinstance(other, type(self))
             and self.aid == other.aid
-            and self.element == other.element
+            and self.number == other.number
             and self.x == other.x
             and self.y == other.y
             and self.z == other.z
@@ -540,7 +889,12 @@ class Atom(object):
 
     @deprecated("Dictionary style access to Atom attributes is deprecated")
     def __setitem__(self, prop, val):
-        """Allow dict-style setting of attributes to ease transition from when atoms were dicts."""
+        """Allow dict-style setting of attributes to ease transition from when atoms were dicts.
+
+        Only the attributes in ``__slots__`` can be set, other keys raise :class:`KeyError`.
+        """
+        if prop not in self.__slots__:
+            raise KeyError(prop)
         setattr(self, prop, val)
 
     @deprecated("Dictionary style access to Atom attributes is deprecated")
@@ -580,6 +934,8 @@ class Atom(object):
 class Bond(object):
     """Class to represent a bond between two atoms in a :class:`~pubchempy.Compound`."""
 
+    __slots__ = ("aid1", "aid2", "order", "style")
+
     def __init__(self, aid1, aid2, order=BondType.SINGLE, style=None):
         """Initialize with begin and end atom IDs, bond order and bond style.
 
@@ -617,7 +973,12 @@ class Bond(object):
 
     @deprecated("Dictionary style access to Bond attributes is deprecated")
     def __setitem__(self, prop, val):
-        """Allow dict-style setting of attributes to ease transition from when bonds were dicts."""
+        """Allow dict-style setting of attributes to ease transition from when bonds were dicts.
+
+        Only the attributes in ``__slots__`` can be set, other keys raise :class:`KeyError`.
+        """
+        if prop not in self.__slots__:
+            raise KeyError(prop)
         setattr(self, prop, val)
 
     @deprecated("Dictionary style access to Atom attributes is deprecated")
@@ -649,6 +1010,9 @@ class Compound(object):
     process. Each Compound is uniquely identified by a CID.
     """
 
+    #: Properties left out of ``to_dict()`` unless requested, as they need extra requests or aren't plain values
+    _to_dict_skip = frozenset({"aids", "sids", "synonyms", "atom_table", "bond_table", "binary_fingerprint"})
+
     def __init__(self, record):
         """Initialize with a record dict from the PubChem PUG REST service.
 
@@ -657,8 +1021,12 @@ class Compound(object):
         :param dict record: A compound record returned by the PubChem PUG REST service.
         """
         self._record = None
-        self._atoms = {}
-        self._bonds = {}
+        self._atoms = None
+        self._bonds = None
+        self._atom_table = None
+        self._bond_table = None
+        self._prop_indexes = {}
+        self._binary_fingerprint = None
         self.record = record
 
     @property
@@ -670,39 +1038,64 @@ class Compound(object):
     def record(self, record):
         self._record = record
         log.debug("Created %s" % self)
-        self._setup_atoms()
-        self._setup_bonds()
+        # Atoms and bonds are only derived from the record when first accessed
+        self._atoms = None
+        self._bonds = None
+        self._atom_table = None
+        self._bond_table = None
+        self._prop_indexes = {}
+        self._binary_fingerprint = None
+
+    def _prop(self, search, section="props"):
+        """Return the value of the first property matching a urn search filter, using an index of the section.
+
+        :param dict search: The urn filter, on any of the label, name and implementation fields.
+        :param section: The property list to search: ``props`` of the record, ``data`` of the first ``coords`` or
+                        ``data`` of its first conformer.
+        """
+        index = self._prop_indexes.get(section)
+        if index is None:
+            if section == "props":
+                proplist = self.record.get("props", [])
+            elif section == "coords":
+                proplist = self.record["coords"][0].get("data", [])
+            else:
+                proplist = self.record["coords"][0]["conformers"][0].get("data", [])
+            index = self._prop_indexes[section] = _index_props(proplist)
+        return index.get(frozenset(search.items()))
 
     def _setup_atoms(self):
         """Derive Atom objects from the record."""
-        # Delete existing atoms
-        self._atoms = {}
+        # Build into a new dict, so a record that fails to parse raises again on the next access
+        atoms = {}
         # Create atoms
         aids = self.record["atoms"]["aid"]
         elements = self.record["atoms"]["element"]
         if not len(aids) == len(elements):
             raise ResponseParseError("Error parsing atom elements")
         for aid, element in zip(aids, elements):
-            self._atoms[aid] = Atom(aid=aid, number=element)
+            atoms[aid] = Atom(aid=aid, number=element)
         # Add coordinates
         if "coords" in self.record:
             coord_ids = self.record["coords"][0]["aid"]
             xs = self.record["coords"][0]["conformers"][0]["x"]
             ys = self.record["coords"][0]["conformers"][0]["y"]
             zs = self.record["coords"][0]["conformers"][0].get("z", [])
-            if not len(coord_ids) == len(xs) == len(ys) == len(self._atoms) or (zs and not len(zs) == len(coord_ids)):
+            if not len(coord_ids) == len(xs) == len(ys) == len(atoms) or (zs and not len(zs) == len(coord_ids)):
                 raise ResponseParseError("Error parsing atom coordinates")
             for aid, x, y, z in zip_longest(coord_ids, xs, ys, zs):
-                self._atoms[aid].set_coordinates(x, y, z)
+                atoms[aid].set_coordinates(x, y, z)
         # Add charges
         if "charge" in self.record["atoms"]:
             for charge in self.record["atoms"]["charge"]:
-                self._atoms[charge["aid"]].charge = charge["value"]
+                atoms[charge["aid"]].charge = charge["value"]
+        self._atoms = atoms
 
     def _setup_bonds(self):
         """Derive Bond objects from the record."""
-        self._bonds = {}
+        bonds = {}
         if "bonds" not in self.record:
+            self._bonds = bonds
             return
         # Create bonds
         aid1s = self.record["bonds"]["aid1"]
@@ -711,14 +1104,15 @@ class Compound(object):
         if not len(aid1s) == len(aid2s) == len(orders):
             raise ResponseParseError("Error parsing bonds")
         for aid1, aid2, order in zip(aid1s, aid2s, orders):
-            self._bonds[frozenset((aid1, aid2))] = Bond(aid1=aid1, aid2=aid2, order=order)
+            bonds[frozenset((aid1, aid2))] = Bond(aid1=aid1, aid2=aid2, order=order)
         # Add styles
         if "coords" in self.record and "style" in self.record["coords"][0]["conformers"][0]:
             aid1s = self.record["coords"][0]["conformers"][0]["style"]["aid1"]
             aid2s = self.record["coords"][0]["conformers"][0]["style"]["aid2"]
             styles = self.record["coords"][0]["conformers"][0]["style"]["annotation"]
             for aid1, aid2, style in zip(aid1s, aid2s, styles):
-                self._bonds[frozenset((aid1, aid2))].style = style
+                bonds[frozenset((aid1, aid2))].style = style
+        self._bonds = bonds
 
     @classmethod
     def from_cid(cls, cid, **kwargs):
@@ -730,9 +1124,14 @@ class Compound(object):
 
         :param int cid: The PubChem Compound Identifier (CID).
         """
-        record = request(cid, **kwargs).json()["PC_Compounds"][0]
+        key = ("compound", cid, "record", *sorted((k, str(v)) for k, v in kwargs.items()))
+        record = memory_cache.get_or_set(key, lambda: loads(request(cid, **kwargs).content)["PC_Compounds"][0])
         return cls(record)
 
+    def _memo_key(self, operation):
+        """Key of the process-wide memory cache for an operation on this Compound."""
+        return ("compound", self.cid, operation) if self.cid else None
+
     def __repr__(self):
         return "Compound(%s)" % self.cid if self.cid else "Compound()"
 
@@ -746,8 +1145,7 @@ class Compound(object):
         because they each require an extra request.
         """
         if not properties:
-            skip = {"aids", "sids", "synonyms"}
-            properties = [p for p in dir(Compound) if isinstance(getattr(Compound, p), property) and p not in skip]
+            properties = _default_properties(Compound)
         return {
             p: [i.to_dict() for i in getattr(self, p)] if p in {"atoms", "bonds"} else getattr(self, p)
             for p in properties
@@ -780,18 +1178,52 @@ class Compound(object):
     @property
     def elements(self):
         """List of element symbols for atoms in this Compound."""
-        return [a.element for a in self.atoms]
+        if self._atoms is not None:
+            return [a.element for a in self.atoms]
+        # Read directly from the record, without creating the Atom objects
+        aids, elements = self.record["atoms"]["aid"], self.record["atoms"]["element"]
+        if not len(aids) == len(elements):
+            raise ResponseParseError("Error parsing atom elements")
+        return [ELEMENTS.get(element, None) for _, element in sorted(zip(aids, elements))]
 
     @property
     def atoms(self):
         """List of :class:`Atoms <pubchempy.Atom>` in this Compound."""
+        if self._atoms is None:
+            self._setup_atoms()
         return sorted(self._atoms.values(), key=lambda x: x.aid)
 
     @property
     def bonds(self):
         """List of :class:`Bonds <pubchempy.Bond>` between :class:`Atoms <pubchempy.Atom>` in this Compound."""
+        if self._bonds is None:
+            self._setup_bonds()
         return sorted(self._bonds.values(), key=lambda x: (x.aid1, x.aid2))
 
+    @property
+    def atom_table(self):
+        """Columnar :class:`~pubchempy2.tables.AtomTable` of the atoms in this Compound, as NumPy arrays.
+
+        Built directly from the record, without creating :class:`~pubchempy.Atom` objects. Requires numpy.
+        """
+        if self._atom_table is None:
+            from .tables import atom_table
+
+            self._atom_table = atom_table(self.record)
+        return self._atom_table
+
+    @property
+    def bond_table(self):
+        """Columnar :class:`~pubchempy2.tables.BondTable` of the bonds in this Compound, as NumPy arrays.
+
+        Built directly from the record, without creating :class:`~pubchempy.Bond` objects. Requires numpy.
+        """
+        if self._bond_table is None:
+            from .tables import bond_table
+
+            self._bond_table = bond_table(self.record)
+        return self._bond_table
+
     @memoized_property
     def synonyms(self):
         """A ranked list of all the names associated with this Compound.
@@ -831,83 +1263,83 @@ class Compound(object):
     @property
     def molecular_formula(self):
         """Molecular formula."""
-        return _parse_prop({"label": "Molecular Formula"}, self.record["props"])
+        return self._prop({"label": "Molecular Formula"})
 
     @property
     def molecular_weight(self):
         """Molecular Weight."""
-        return float(_parse_prop({"label": "Molecular Weight"}, self.record["props"]))
+        return float(self._prop({"label": "Molecular Weight"}))
 
     @property
     def canonical_smiles(self):
         """Canonical SMILES, with no stereochemistry information."""
-        return _parse_prop({"label": "SMILES", "name": "Canonical"}, self.record["props"])
+        return self._prop({"label": "SMILES", "name": "Canonical"})
 
     @property
     def isomeric_smiles(self):
         """Isomeric SMILES."""
-        return _parse_prop({"label": "SMILES", "name": "Isomeric"}, self.record["props"])
+        return self._prop({"label": "SMILES", "name": "Isomeric"})
 
     @property
     def inchi(self):
         """InChI string."""
-        return _parse_prop({"label": "InChI", "name": "Standard"}, self.record["props"])
+        return self._prop({"label": "InChI", "name": "Standard"})
 
     @property
     def inchikey(self):
         """InChIKey."""
-        return _parse_prop({"label": "InChIKey", "name": "Standard"}, self.record["props"])
+        return self._prop({"label": "InChIKey", "name": "Standard"})
 
     @property
     def iupac_name(self):
         """Preferred IUPAC name."""
         # Note: Allowed, CAS-like Style, Preferred, Systematic, Traditional are available in full record
-        return _parse_prop({"label": "IUPAC Name", "name": "Preferred"}, self.record["props"])
+        return self._prop({"label": "IUPAC Name", "name": "Preferred"})
 
     @property
     def xlogp(self):
         """XLogP."""
-        return _parse_prop({"label": "Log P"}, self.record["props"])
+        return self._prop({"label": "Log P"})
 
     @property
     def exact_mass(self):
         """Exact mass."""
-        return float(_parse_prop({"label": "Mass", "name": "Exact"}, self.record["props"]))
+        return float(self._prop({"label": "Mass", "name": "Exact"}))
 
     @property
     def monoisotopic_mass(self):
         """Monoisotopic mass."""
-        return float(_parse_prop({"label": "Weight", "name": "MonoIsotopic"}, self.record["props"]))
+        return float(self._prop({"label": "Weight", "name": "MonoIsotopic"}))
 
     @property
     def tpsa(self):
         """Topological Polar Surface Area."""
-        return _parse_prop({"implementation": "E_TPSA"}, self.record["props"])
+        return self._prop({"implementation": "E_TPSA"})
 
     @property
     def complexity(self):
         """Complexity."""
-        return _parse_prop({"implementation": "E_COMPLEXITY"}, self.record["props"])
+        return self._prop({"implementation": "E_COMPLEXITY"})
 
     @property
     def h_bond_donor_count(self):
         """Hydrogen bond donor count."""
-        return _parse_prop({"implementation": "E_NHDONORS"}, self.record["props"])
+        return self._prop({"implementation": "E_NHDONORS"})
 
     @property
     def h_bond_acceptor_count(self):
         """Hydrogen bond acceptor count."""
-        return _parse_prop({"implementation": "E_NHACCEPTORS"}, self.record["props"])
+        return self._prop({"implementation": "E_NHACCEPTORS"})
 
     @property
     def rotatable_bond_count(self):
         """Rotatable bond count."""
-        return _parse_prop({"implementation": "E_NROTBONDS"}, self.record["props"])
+        return self._prop({"implementation": "E_NROTBONDS"})
 
     @property
     def fingerprint(self):
         """Raw padded and hex-encoded fingerprint, as returned by the PUG REST API."""
-        return _parse_prop({"implementation": "E_SCREEN"}, self.record["props"])
+        return self._prop({"implementation": "E_SCREEN"})
 
     @property
     def cactvs_fingerprint(self):
@@ -917,8 +1349,15 @@ class Compound(object):
 
         More information at ftp://ftp.ncbi.nlm.nih.gov/pubchem/specifications/pubchem_fingerprints.txt
         """
-        # Skip first 4 bytes (contain length of fingerprint) and last 7 bits (padding) then re-pad to 881 bits
-        return "{0:020b}".format(int(self.fingerprint[8:], 16))[:-7].zfill(881)
+        return self.binary_fingerprint.to_bitstring()
+
+    @property
+    def binary_fingerprint(self):
+        """PubChem CACTVS fingerprint as a :class:`~pubchempy2.fingerprint.Fingerprint`, with bit operations and
+        similarity measures. Decoded once and cached."""
+        if self._binary_fingerprint is None:
+            self._binary_fingerprint = Fingerprint.from_hex(self.fingerprint)
+        return self._binary_fingerprint
 
     @property
     def heavy_atom_count(self):
@@ -976,70 +1415,67 @@ class Compound(object):
 
     @property
     def volume_3d(self):
-        conf = self.record["coords"][0]["conformers"][0]
-        if "data" in conf:
-            return _parse_prop({"label": "Shape", "name": "Volume"}, conf["data"])
+        return self._prop({"label": "Shape", "name": "Volume"}, "conformer")
 
     @property
     def multipoles_3d(self):
-        conf = self.record["coords"][0]["conformers"][0]
-        if "data" in conf:
-            return _parse_prop({"label": "Shape", "name": "Multipoles"}, conf["data"])
+        return self._prop({"label": "Shape", "name": "Multipoles"}, "conformer")
 
     @property
     def conformer_rmsd_3d(self):
-        coords = self.record["coords"][0]
-        if "data" in coords:
-            return _parse_prop({"label": "Conformer", "name": "RMSD"}, coords["data"])
+        return self._prop({"label": "Conformer", "name": "RMSD"}, "coords")
 
     @property
     def effective_rotor_count_3d(self):
-        return _parse_prop({"label": "Count", "name": "Effective Rotor"}, self.record["props"])
+        return self._prop({"label": "Count", "name": "Effective Rotor"})
 
     @property
     def pharmacophore_features_3d(self):
-        return _parse_prop({"label": "Features", "name": "Pharmacophore"}, self.record["props"])
+        return self._prop({"label": "Features", "name": "Pharmacophore"})
 
     @property
     def mmff94_partial_charges_3d(self):
-        return _parse_prop({"label": "Charge", "name": "MMFF94 Partial"}, self.record["props"])
+        return self._prop({"label": "Charge", "name": "MMFF94 Partial"})
 
     @property
     def mmff94_energy_3d(self):
-        conf = self.record["coords"][0]["conformers"][0]
-        if "data" in conf:
-            return _parse_prop({"label": "Energy", "name": "MMFF94 NoEstat"}, conf["data"])
+        return self._prop({"label": "Energy", "name": "MMFF94 NoEstat"}, "conformer")
 
     @property
     def conformer_id_3d(self):
-        conf = self.record["coords"][0]["conformers"][0]
-        if "data" in conf:
-            return _parse_prop({"label": "Conformer", "name": "ID"}, conf["data"])
+        return self._prop({"label": "Conformer", "name": "ID"}, "conformer")
 
     @property
     def shape_selfoverlap_3d(self):
-        conf = self.record["coords"][0]["conformers"][0]
-        if "data" in conf:
-            return _parse_prop({"label": "Shape", "name": "Self Overlap"}, conf["data"])
+        return self._prop({"label": "Shape", "name": "Self Overlap"}, "conformer")
 
     @property
     def feature_selfoverlap_3d(self):
-        conf = self.record["coords"][0]["conformers"][0]
-        if "data" in conf:
-            return _parse_prop({"label": "Feature", "name": "Self Overlap"}, conf["data"])
+        return self._prop({"label": "Feature", "name": "Self Overlap"}, "conformer")
 
     @property
     def shape_fingerprint_3d(self):
-        conf = self.record["coords"][0]["conformers"][0]
-        if "data" in conf:
-            return _parse_prop({"label": "Fingerprint", "name": "Shape"}, conf["data"])
+        return self._prop({"label": "Fingerprint", "name": "Shape"}, "conformer")
+
+
+#: urn fields that properties are indexed by
+INDEXED_URN_FIELDS = ("label", "name", "implementation")
 
 
-def _parse_prop(search, proplist):
-    """Extract property value from record using the given urn search filter."""
-    props = [i for i in proplist if all(item in i["urn"].items() for item in search.items())]
-    if len(props) > 0:
-        return props[0]["value"][list(props[0]["value"].keys())[0]]
+def _index_props(proplist):
+    """Index property values by every combination of the label, name and implementation fields of their urn.
+
+    When several properties match a combination of fields, the first one wins.
+    """
+    index = {}
+    for prop in proplist:
+        urn = prop["urn"]
+        items = [(field, urn[field]) for field in INDEXED_URN_FIELDS if field in urn]
+        value = next(iter(prop["value"].values()), None)
+        for size in range(1, len(items) + 1):
+            for combination in combinations(items, size):
+                index.setdefault(frozenset(combination), value)
+    return index
 
 
 class Substance(object):
@@ -1054,15 +1490,25 @@ class Substance(object):
     process. Hence each Compound may be derived from a number of different Substances.
     """
 
+    #: Properties left out of ``to_dict()`` unless requested, as they need extra requests
+    _to_dict_skip = frozenset({"deposited_compound", "standardized_compound", "cids", "aids"})
+
     @classmethod
     def from_sid(cls, sid):
         """Retrieve the Substance record for the specified SID.
 
         :param int sid: The PubChem Substance Identifier (SID).
         """
-        record = request(sid, "sid", "substance").json()["PC_Substances"][0]
+        key = ("substance", sid, "record")
+        record = memory_cache.get_or_set(
+            key, lambda: loads(request(sid, "sid", "substance").content)["PC_Substances"][0]
+        )
         return cls(record)
 
+    def _memo_key(self, operation):
+        """Key of the process-wide memory cache for an operation on this Substance."""
+        return ("substance", self.sid, operation)
+
     def __init__(self, record):
         self.record = record
         """A dictionary containing the full Substance record that all other properties are obtained from."""
@@ -1082,8 +1528,7 @@ class Substance(object):
         :param properties: (optional) A list of the desired properties.
         """
         if not properties:
-            skip = {"deposited_compound", "standardized_compound", "cids", "aids"}
-            properties = [p for p in dir(Substance) if isinstance(getattr(Substance, p), property) and p not in skip]
+            properties = _default_properties(Substance)
         return {p: getattr(self, p) for p in properties}
 
     def to_series(self, properties=None):
@@ -1174,7 +1619,10 @@ class Assay(object):
 
         :param int aid: The PubChem Assay Identifier (AID).
         """
-        record = request(aid, "aid", "assay", "description").json()["PC_AssayContainer"][0]
+        key = ("assay", aid, "description")
+        record = memory_cache.get_or_set(
+            key, lambda: loads(request(aid, "aid", "assay", "description").content)["PC_AssayContainer"][0]
+        )
         return cls(record)
 
     def __init__(self, record):
@@ -1195,7 +1643,7 @@ class Assay(object):
         :param properties: (optional) A list of the desired properties.
         """
         if not properties:
-            properties = [p for p in dir(Assay) if isinstance(getattr(Assay, p), property)]
+            properties = _default_properties(Assay)
         return {p: getattr(self, p) for p in properties}
 
     @property
@@ -1253,27 +1701,57 @@ class Assay(object):
 def compounds_to_frame(compounds, properties=None):
     """Construct a pandas :class:`~pandas.DataFrame` from a list of :class:`~pubchempy.Compound` objects.
 
-    Optionally specify a list of the desired :class:`~pubchempy.Compound` properties.
+    Optionally specify a list of the desired :class:`~pubchempy.Compound` properties. Each property is extracted for all
+    compounds at once, and the DataFrame is built from the resulting columns in one go.
     """
     import pandas as pd
 
-    if isinstance(compounds, Compound):
-        compounds = [compounds]
-    properties = set(properties) | set(["cid"]) if properties else None
-    return pd.DataFrame.from_records([c.to_dict(properties) for c in compounds], index="cid")
+    return pd.DataFrame(_compound_columns(compounds, properties)).set_index("cid")
 
 
 def substances_to_frame(substances, properties=None):
     """Construct a pandas :class:`~pandas.DataFrame` from a list of :class:`~pubchempy.Substance` objects.
 
-    Optionally specify a list of the desired :class:`~pubchempy.Substance` properties.
+    Optionally specify a list of the desired :class:`~pubchempy.Substance` properties. Each property is extracted for
+    all substances at once, and the DataFrame is built from the resulting columns in one go.
     """
     import pandas as pd
 
+    return pd.DataFrame(_substance_columns(substances, properties)).set_index("sid")
+
+
+def compounds_to_arrow(compounds, properties=None):
+    """Construct a :class:`pyarrow.Table` from a list of :class:`~pubchempy.Compound` objects. Requires pyarrow.
+
+    Optionally specify a list of the desired :class:`~pubchempy.Compound` properties.
+    """
+    import pyarrow as pa
+
+    return pa.table(_compound_columns(compounds, properties))
+
+
+def substances_to_arrow(substances, properties=None):
+    """Construct a :class:`pyarrow.Table` from a list of :class:`~pubchempy.Substance` objects. Requires pyarrow.
+
+    Optionally specify a list of the desired :class:`~pubchempy.Substance` properties.
+    """
+    import pyarrow as pa
+
+    return pa.table(_substance_columns(substances, properties))
+
+
+def _compound_columns(compounds, properties=None):
+    if isinstance(compounds, Compound):
+        compounds = [compounds]
+    properties = dict.fromkeys(["cid", *properties]) if properties else _default_properties(Compound)
+    return _to_columns(list(compounds), properties)
+
+
+def _substance_columns(substances, properties=None):
     if isinstance(substances, Substance):
         substances = [substances]
-    properties = set(properties) | set(["sid"]) if properties else None
-    return pd.DataFrame.from_records([s.to_dict(properties) for s in substances], index="sid")
+    properties = dict.fromkeys(["sid", *properties]) if properties else _default_properties(Substance)
+    return _to_columns(list(substances), properties)
 
 
 # def add_columns_to_frame(dataframe, id_col, id_namespace, add_cols):
@@ -1289,10 +1767,7 @@ class PubChemPyDeprecationWarning(Warning):
     pass
 
 
-class PubChemPyError(Exception):
-    """Base class for all PubChemPy exceptions."""
-
-    pass
+# PubChemPyError is imported from errors, so that it is also the base class of the NetworkError raised by the clients
 
 
 class ResponseParseError(PubChemPyError):
@@ -1306,7 +1781,8 @@ class PubChemHTTPError(PubChemPyError):
 
     def __init__(self, e):
         self.code = e.response.status_code
-        self.msg = e.response.reason
+        # requests exposes the status text as ``reason``, httpx as ``reason_phrase``
+        self.msg = getattr(e.response, "reason", None) or getattr(e.response, "reason_phrase", "")
         try:
             self.msg += ": %s" % e.response.json()["Fault"]["Details"][0]
         except (ValueError, IndexError, KeyError):
@@ -0,0 +1,178 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Mapping, Optional
+
+import requests
+from tenacity import AsyncRetrying, RetryCallState, Retrying
+
+from .errors import NetworkError, PubChemPyError, ServerError, SeverBusyError, TimeoutError, error_for_status
+
+log = logging.getLogger("pubchempy")
+
+#: Maximum number of retries for each class of error
+DEFAULT_BUDGETS = {SeverBusyError: 5, TimeoutError: 2, ServerError: 2, NetworkError: 3}
+
+
+def classify(retry_state: RetryCallState) -> Optional[type[PubChemPyError]]:
+    """Return the error class from :mod:`~pubchempy2.errors` that the outcome of an attempt corresponds to."""
+    if retry_state.outcome.failed:
+        exc = retry_state.outcome.exception()
+        if isinstance(exc, requests.Timeout):
+            return TimeoutError
+        if isinstance(exc, (requests.ConnectionError, requests.exceptions.ChunkedEncodingError)):
+            # Includes connections dropped while a streamed body is read
+            return NetworkError
+        try:
+            import httpx
+        except ImportError:
+            return None
+        if isinstance(exc, httpx.TimeoutException):
+            return TimeoutError
+        if isinstance(exc, httpx.TransportError):
+            return NetworkError
+        return None
+
+    response = retry_state.outcome.result()
+    if 200 <= response.status_code < 300:
+        return None
+    return error_for_status(response.status_code)
+
+
+def _transport_errors() -> tuple[type[Exception], ...]:
+    """Return the exception classes raised by the HTTP libraries when a connection fails or times out."""
+    errors = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+    try:
+        import httpx
+    except ImportError:
+        return errors
+    return errors + (httpx.TransportError,)
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Return the number of seconds requested by a ``Retry-After`` header, given either as seconds or as a date."""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Retry policy applied by the HTTP clients to every request sent to PubChem.
+
+    Failed attempts are classified by the error class from :mod:`~pubchempy2.errors` they correspond to, and each class
+    has its own retry budget. Waits grow exponentially with full jitter, but are never shorter than a ``Retry-After``
+    header sent by the server (up to ``maximum``). No attempt is started after the overall deadline has passed.
+
+    When the budget for an HTTP error is used up, the last response is returned to the caller, which raises the usual
+    error for it. Connection failures and timeouts of the HTTP library that are not retried any more are raised as
+    :class:`~pubchempy2.errors.NetworkError`.
+
+    :param budgets: Maximum number of retries for each error class. Classes missing from the mapping are not retried.
+    :param deadline: Total number of seconds after the first attempt during which retries may be made.
+    :param initial: Base wait in seconds before the first retry.
+    :param maximum: Maximum wait in seconds between two attempts.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Mapping[type[PubChemPyError], int]] = None,
+        deadline: float = 120.0,
+        initial: float = 0.5,
+        maximum: float = 30.0,
+    ):
+        self.budgets = dict(DEFAULT_BUDGETS if budgets is None else budgets)
+        self.deadline = deadline
+        self.initial = initial
+        self.maximum = maximum
+        self._stats = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Number of retries made so far for each error class, and of requests that ran out of retries."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        """Reset the retry counters."""
+        with self._lock:
+            self._stats.clear()
+
+    def _record(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _kwargs(self) -> dict[str, Any]:
+        """Build the tenacity arguments for a single call, keeping track of the retries made for each error class."""
+        attempts = Counter()
+
+        def should_retry(retry_state: RetryCallState) -> bool:
+            error = classify(retry_state)
+            return error is not None and error in self.budgets
+
+        def should_stop(retry_state: RetryCallState) -> bool:
+            error = classify(retry_state)
+            if attempts[error] >= self.budgets[error] or retry_state.seconds_since_start >= self.deadline:
+                self._record("gave_up")
+                return True
+            return False
+
+        def wait(retry_state: RetryCallState) -> float:
+            exponential = min(self.maximum, self.initial * 2 ** (retry_state.attempt_number - 1))
+            delay = random.uniform(0, exponential)
+            if not retry_state.outcome.failed:
+                retry_after = parse_retry_after(retry_state.outcome.result().headers)
+                if retry_after is not None:
+                    delay = max(delay, min(retry_after, self.maximum))
+            return max(0.0, min(delay, self.deadline - retry_state.seconds_since_start))
+
+        def before_sleep(retry_state: RetryCallState) -> None:
+            if not retry_state.outcome.failed and isinstance(retry_state.outcome.result(), requests.Response):
+                # Release the connection of a streamed response that is discarded
+                retry_state.outcome.result().close()
+            error = classify(retry_state)
+            attempts[error] += 1
+            self._record(error.__name__)
+            log.warning(
+                "Retrying request after %s (attempt %s), waiting %.2fs",
+                error.__name__,
+                retry_state.attempt_number,
+                retry_state.next_action.sleep,
+            )
+
+        return {
+            "retry": should_retry,
+            "stop": should_stop,
+            "wait": wait,
+            "before_sleep": before_sleep,
+            "retry_error_callback": lambda retry_state: retry_state.outcome.result(),
+        }
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call ``fn`` with retries."""
+        try:
+            return Retrying(**self._kwargs())(fn, *args, **kwargs)
+        except _transport_errors() as e:
+            raise NetworkError(str(e)) from e
+
+    async def acall(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await ``fn`` with retries, sleeping without blocking the event loop."""
+        try:
+            return await AsyncRetrying(**self._kwargs())(fn, *args, **kwargs)
+        except _transport_errors() as e:
+            raise NetworkError(str(e)) from e
+
+
+#: Policy shared by all clients unless they are given their own
+default_retry_policy = RetryPolicy()
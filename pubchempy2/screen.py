@@ -0,0 +1,106 @@
+"""Substructure searches restricted to a known set of candidate compounds, screened locally by fingerprint.
+
+Requires the optional numpy dependency.
+"""
+
+import logging
+from typing import Iterable, Optional
+
+from .fingerprint import Fingerprint
+from .index import FingerprintIndex
+from .matrix import FingerprintMatrix
+from .pubchempy import NotFoundError, get_properties, iter_cids
+
+log = logging.getLogger("pubchempy")
+
+
+def _normalize_query(query: str | int, namespace: str) -> str | int:
+    """Add the ``InChI=`` prefix that PubChem requires to InChI queries that lack it."""
+    if namespace == "inchi" and not str(query).startswith("InChI="):
+        return f"InChI={query}"
+    return query
+
+
+def query_fingerprint(query: str | int, namespace: str = "smiles") -> Fingerprint:
+    """Retrieve the CACTVS fingerprint that PubChem computes for a query structure.
+
+    :param query: The query structure, e.g. a SMILES string or a CID.
+    :param namespace: (optional) The type of query: smiles, inchi, sdf or cid. SMARTS queries have no fingerprint.
+    """
+    if namespace == "smarts":
+        raise ValueError("PubChem can't compute the fingerprint of a SMARTS query, pass a fingerprint instead")
+    properties = get_properties("Fingerprint2D", _normalize_query(query, namespace), namespace)
+    return Fingerprint.from_base64(properties[0]["Fingerprint2D"])
+
+
+def screen_substructure(
+    fingerprint: Fingerprint, candidates: FingerprintMatrix | FingerprintIndex | Iterable
+) -> list[int]:
+    """Return the CIDs of the candidates whose fingerprint contains every bit set in the query fingerprint.
+
+    Compounds that are ruled out can't contain the query as a substructure, so only the returned CIDs need to be
+    confirmed by an exact substructure search.
+
+    :param fingerprint: Fingerprint of the query structure.
+    :param candidates: A :class:`~pubchempy2.matrix.FingerprintMatrix` whose ids are CIDs, a
+                       :class:`~pubchempy2.index.FingerprintIndex`, or :class:`~pubchempy2.pubchempy.Compound` objects.
+    """
+    if isinstance(candidates, FingerprintIndex):
+        return candidates.containing(fingerprint)
+    if not isinstance(candidates, FingerprintMatrix):
+        candidates = FingerprintMatrix.from_compounds(candidates)
+    return candidates.ids[candidates.containing(fingerprint)].tolist()
+
+
+def substructure_search(
+    query: str | int,
+    candidates: FingerprintMatrix | FingerprintIndex | Iterable,
+    namespace: str = "smiles",
+    fingerprint: Optional[Fingerprint] = None,
+    fast: bool = True,
+    page_size: Optional[int] = None,
+    **kwargs,
+) -> list[int]:
+    """Return the CIDs of the candidates that contain a query structure.
+
+    Candidates are first screened locally with :func:`screen_substructure`, and only if some pass the screen is the
+    query sent to PubChem for an exact substructure search. PUG REST can't restrict a substructure search to a list of
+    CIDs, so the search results are paged through a ListKey until every candidate that passed the screen is found or
+    the results run out. PubChem stops a search after ``MaxRecords`` results, which can be raised with ``kwargs``.
+
+    Usage::
+
+        index = FingerprintIndex("library.fpidx")
+        cids = substructure_search("c1ccccc1C(=O)O", index)
+
+    :param query: The query structure.
+    :param candidates: A :class:`~pubchempy2.matrix.FingerprintMatrix` whose ids are CIDs, a
+                       :class:`~pubchempy2.index.FingerprintIndex`, or :class:`~pubchempy2.pubchempy.Compound` objects.
+    :param namespace: (optional) The type of query: smiles, smarts, inchi, sdf or cid.
+    :param fingerprint: (optional) Fingerprint of the query. Retrieved with :func:`query_fingerprint` by default, which
+                        sends one request. Required for SMARTS queries.
+    :param fast: (optional) Confirm with the synchronous ``fastsubstructure`` search, or else with the asynchronous
+                 ``substructure`` search.
+    :param page_size: (optional) Number of CIDs fetched from the ListKey at once.
+    :param kwargs: Extra options for the search, such as ``MatchIsotopes`` or ``MaxRecords``.
+    """
+    query = _normalize_query(query, namespace)
+    if fingerprint is None:
+        fingerprint = query_fingerprint(query, namespace)
+    survivors = screen_substructure(fingerprint, candidates)
+    log.debug("%s candidates passed the fingerprint screen", len(survivors))
+    if not survivors:
+        return []
+    searchtype = "fastsubstructure" if fast else "substructure"
+    pending = set(survivors)
+    matches = set()
+    try:
+        for cid in iter_cids(query, namespace, searchtype, page_size, **kwargs):
+            if cid in pending:
+                pending.discard(cid)
+                matches.add(cid)
+                if not pending:
+                    break
+    except NotFoundError:
+        pass
+    return [cid for cid in survivors if cid in matches]
@@ -0,0 +1,178 @@
+import base64
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from .fingerprint import Fingerprint
+from .pubchempy import ELEMENTS, STREAM_CHUNK_SIZE, Atom, Bond, ResponseParseError, _stream
+
+#: Atomic numbers by element symbol
+ATOMIC_NUMBERS = {symbol: number for number, symbol in ELEMENTS.items()}
+
+#: Formal charges by the charge code of the molfile atom block
+CHARGE_CODES = {0: 0, 1: 3, 2: 2, 3: 1, 4: 0, 5: -1, 6: -2, 7: -3}
+
+#: Compound attributes read from PubChem SDF data fields, as (field names, converter)
+FIELDS: dict[str, tuple[tuple[str, ...], Callable[[str], Any]]] = {
+    "cid": (("PUBCHEM_COMPOUND_CID",), int),
+    "molecular_formula": (("PUBCHEM_MOLECULAR_FORMULA",), str),
+    "molecular_weight": (("PUBCHEM_MOLECULAR_WEIGHT",), float),
+    # PUBCHEM_SMILES holds the isomeric SMILES, the connectivity SMILES has no stereochemistry information
+    "canonical_smiles": (("PUBCHEM_OPENEYE_CAN_SMILES", "PUBCHEM_CONNECTIVITY_SMILES"), str),
+    "isomeric_smiles": (("PUBCHEM_OPENEYE_ISO_SMILES", "PUBCHEM_SMILES"), str),
+    "inchi": (("PUBCHEM_IUPAC_INCHI",), str),
+    "inchikey": (("PUBCHEM_IUPAC_INCHIKEY",), str),
+    "iupac_name": (("PUBCHEM_IUPAC_NAME",), str),
+    "xlogp": (("PUBCHEM_XLOGP3", "PUBCHEM_XLOGP3_AA"), float),
+    "exact_mass": (("PUBCHEM_EXACT_MASS",), float),
+    "monoisotopic_mass": (("PUBCHEM_MONOISOTOPIC_WEIGHT",), float),
+    "tpsa": (("PUBCHEM_CACTVS_TPSA",), float),
+    "complexity": (("PUBCHEM_CACTVS_COMPLEXITY",), float),
+    "charge": (("PUBCHEM_TOTAL_CHARGE",), int),
+    "h_bond_donor_count": (("PUBCHEM_CACTVS_HBOND_DONOR",), int),
+    "h_bond_acceptor_count": (("PUBCHEM_CACTVS_HBOND_ACCEPTOR",), int),
+    "rotatable_bond_count": (("PUBCHEM_CACTVS_ROTATABLE_BOND",), int),
+    "heavy_atom_count": (("PUBCHEM_HEAVY_ATOM_COUNT",), int),
+    "isotope_atom_count": (("PUBCHEM_ISOTOPIC_ATOM_COUNT",), int),
+    "defined_atom_stereo_count": (("PUBCHEM_ATOM_DEF_STEREO_COUNT",), int),
+    "undefined_atom_stereo_count": (("PUBCHEM_ATOM_UDEF_STEREO_COUNT",), int),
+    "defined_bond_stereo_count": (("PUBCHEM_BOND_DEF_STEREO_COUNT",), int),
+    "undefined_bond_stereo_count": (("PUBCHEM_BOND_UDEF_STEREO_COUNT",), int),
+    "covalent_unit_count": (("PUBCHEM_COMPONENT_COUNT",), int),
+    # Hex-encoded like the fingerprint of JSON records, where the SDF field is base64-encoded
+    "fingerprint": (("PUBCHEM_CACTVS_SUBSKEYS",), lambda value: base64.b64decode(value).hex().upper()),
+}
+
+
+class SdfCompound:
+    """Lightweight compound parsed from an SDF record, with the attributes of :class:`~pubchempy2.pubchempy.Compound`
+    that can be read from the molfile and the PubChem data fields.
+
+    Attributes listed in :data:`FIELDS` are ``None`` when the SDF doesn't include their data field.
+    """
+
+    __slots__ = ("name", "atoms", "bonds", "data", "is_3d")
+
+    def __init__(self, name: str, atoms: list[Atom], bonds: list[Bond], data: dict[str, str], is_3d: bool = False):
+        self.name = name
+        """The title line of the molfile, which holds the CID in PubChem SDF files."""
+        self.atoms = atoms
+        self.bonds = bonds
+        self.data = data
+        """Raw data fields, by field name."""
+        self.is_3d = is_3d
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in FIELDS:
+            raise AttributeError("%r object has no attribute %r" % (type(self).__name__, name))
+        fields, convert = FIELDS[name]
+        for field in fields:
+            if field in self.data:
+                return convert(self.data[field])
+        if name == "cid" and self.name.isdigit():
+            return int(self.name)
+        return None
+
+    def __repr__(self):
+        return "SdfCompound(%s)" % (self.cid or self.name)
+
+    @property
+    def elements(self) -> list[str]:
+        """List of element symbols for atoms in this Compound."""
+        return [a.element for a in self.atoms]
+
+    @property
+    def binary_fingerprint(self) -> Optional[Fingerprint]:
+        """PubChem CACTVS fingerprint as a :class:`~pubchempy2.fingerprint.Fingerprint`, if the SDF includes it."""
+        value = self.data.get("PUBCHEM_CACTVS_SUBSKEYS")
+        return Fingerprint.from_base64(value) if value else None
+
+    @property
+    def coordinate_type(self) -> str:
+        return "3d" if self.is_3d else "2d"
+
+    def to_dict(self, properties: Optional[Iterable[str]] = None) -> dict[str, Any]:
+        """Return a dictionary of the atoms, bonds and data field attributes of this compound."""
+        properties = FIELDS if properties is None else properties
+        data = {p: getattr(self, p) for p in properties if p not in ("atoms", "bonds")}
+        if properties is FIELDS or "atoms" in properties:
+            data["atoms"] = [a.to_dict() for a in self.atoms]
+        if properties is FIELDS or "bonds" in properties:
+            data["bonds"] = [b.to_dict() for b in self.bonds]
+        return data
+
+
+def _parse_molfile(lines: list[str]) -> SdfCompound:
+    """Parse the lines of one SDF record, from the title line to the line before ``$$$$``."""
+    try:
+        name, program = lines[0].strip(), lines[1]
+        atom_count, bond_count = int(lines[3][0:3]), int(lines[3][3:6])
+        is_3d = program[20:22] == "3D"
+        atoms, bonds = [], []
+        for aid, line in enumerate(lines[4 : 4 + atom_count], start=1):
+            symbol = line[31:34].strip()
+            atom = Atom(aid, ATOMIC_NUMBERS.get(symbol), float(line[0:10]), float(line[10:20]))
+            if is_3d:
+                atom.z = float(line[20:30])
+            atom.charge = CHARGE_CODES.get(int(line[36:39] or 0), 0)
+            atoms.append(atom)
+        offset = 4 + atom_count
+        for line in lines[offset : offset + bond_count]:
+            bonds.append(Bond(int(line[0:3]), int(line[3:6]), int(line[6:9])))
+        data, field, charges_reset = {}, None, False
+        for line in lines[offset + bond_count :]:
+            if line.startswith("M  CHG"):
+                # A charge property block replaces all charges of the atom block
+                if not charges_reset:
+                    for atom in atoms:
+                        atom.charge = 0
+                    charges_reset = True
+                values = line.split()[3:]
+                for aid, charge in zip(values[::2], values[1::2]):
+                    atoms[int(aid) - 1].charge = int(charge)
+            elif line.startswith(">"):
+                field = line[line.index("<") + 1 : line.rindex(">")]
+                data[field] = None
+            elif field is not None:
+                if not line.strip():
+                    field = None
+                else:
+                    data[field] = line if data[field] is None else data[field] + "\n" + line
+    except (IndexError, ValueError) as e:
+        raise ResponseParseError("Error parsing SDF record: %s" % e)
+    return SdfCompound(name, atoms, bonds, {k: v or "" for k, v in data.items()}, is_3d)
+
+
+def iter_sdf(lines: Iterable[str | bytes]) -> Iterator[SdfCompound]:
+    """Parse SDF records one at a time from an iterable of lines, such as an open file or ``response.iter_lines()``.
+
+    Only the record being parsed is held in memory, so files of any size can be read.
+    """
+    record = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode()
+        line = line.rstrip("\r\n")
+        if line == "$$$$":
+            yield _parse_molfile(record)
+            record = []
+        else:
+            record.append(line)
+    if any(line.strip() for line in record):
+        yield _parse_molfile(record)
+
+
+def iter_sdf_compounds(identifier, namespace="cid", searchtype=None, **kwargs) -> Iterator[SdfCompound]:
+    """Retrieve compound records as SDF and yield an :class:`SdfCompound` for each as soon as it has arrived.
+
+    :param identifier: The compound identifier to use as a search query.
+    :param namespace: (optional) The identifier type, one of cid, name, smiles, sdf, inchi, inchikey or formula.
+    :param searchtype: (optional) The advanced search type, one of substructure, superstructure or similarity.
+    """
+    return _stream(
+        identifier,
+        namespace,
+        "compound",
+        "SDF",
+        searchtype,
+        lambda response: iter_sdf(response.iter_lines(STREAM_CHUNK_SIZE)),
+        **kwargs,
+    )
@@ -1,4 +1,4 @@
-from typing import Literal, Optional
+from typing import ClassVar, Literal, Optional
 from urllib.parse import quote
 
 from pydantic import model_validator
@@ -10,6 +10,7 @@ from .validators import XrefValidators
 
 class SubstanceSearch(AbstractSearch, XrefValidators):
     domain: Literal["substance"] = "substance"
+    chunkable_namespaces: ClassVar[tuple[str, ...]] = ("sid",)
     namespace: Literal["sid", "sourceid", "sourceall", "name", "xref", "listkey"]
     sourceid: str = None
     xref: Optional[xref_types] = None
@@ -62,6 +63,7 @@ class SubstanceSearch(AbstractSearch, XrefValidators):
 
 class CompoundSearch(AbstractSearch, XrefValidators):
     domain: Literal["compound"] = "compound"
+    chunkable_namespaces: ClassVar[tuple[str, ...]] = ("cid",)
     namespace: (
         Literal["cid", "name", "smiles", "inchi", "inchikey", "fastformula", "xref", "listkey"] | fast_search_types
     )
@@ -143,6 +145,7 @@ class CompoundSearch(AbstractSearch, XrefValidators):
 
 class AssaySearch(AbstractSearch):
     domain: Literal["assay"] = "assay"
+    chunkable_namespaces: ClassVar[tuple[str, ...]] = ("aid",)
     namespace: Literal["aid", "listkey", "type", "sourceall", "target", "activity"]
     target: Optional[Literal["gi", "proteinname", "geneid", "genesymbol", "accession"]] = None
     operation: Literal[
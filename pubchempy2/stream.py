@@ -0,0 +1,74 @@
+import re
+from typing import Any, Iterable, Iterator
+
+from .jsonlib import loads
+
+#: Characters that change the nesting depth or start a string
+_SPECIAL = re.compile(rb'[{}\[\]"]')
+#: A complete JSON string, including its quotes
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SEPARATORS = b" \t\r\n,"
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """Incrementally parse the array stored under ``key`` in a JSON document and yield its items as they complete.
+
+    Only the item being parsed is held in memory, however large the whole document is, and each item is decoded with
+    :func:`~pubchempy2.jsonlib.loads` as soon as its closing brace arrives. Items must be objects or arrays, as in the
+    ``PC_Compounds`` and ``PC_Substances`` arrays of PubChem records.
+
+    :param chunks: The JSON document as an iterable of byte strings, such as ``response.iter_content(...)``.
+    :param key: Name of the member holding the array. The first occurrence is used.
+    :raises ValueError: If the document ends before the array is closed.
+    """
+    start = re.compile(rb'"%s"\s*:\s*\[' % re.escape(key.encode()))
+    chunks = iter(chunks)
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        match = start.search(buffer)
+        if match:
+            del buffer[: match.end()]
+            break
+        # Only keep enough to match a key split across two chunks
+        del buffer[: max(0, len(buffer) - len(key) - 64)]
+    else:
+        return
+
+    # The item being parsed always starts at the beginning of the buffer, and pos is where scanning resumes
+    pos, depth = 0, 0
+    while True:
+        if depth == 0:
+            while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+                pos += 1
+            if pos < len(buffer):
+                if buffer[pos] == ord("]"):
+                    return
+                if buffer[pos] not in b"{[":
+                    raise ValueError("Items of the JSON array %s must be objects or arrays" % key)
+                del buffer[:pos]
+                pos, depth = 1, 1
+                continue
+        else:
+            match = _SPECIAL.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+            elif match[0] == b'"':
+                string = _STRING.match(buffer, match.start())
+                if string is not None:
+                    pos = string.end()
+                    continue
+                # Wait for the rest of the string
+                pos = match.start()
+            else:
+                pos = match.end()
+                depth += 1 if match[0] in b"{[" else -1
+                if depth == 0:
+                    yield loads(buffer[:pos])
+                    del buffer[:pos]
+                    pos = 0
+                continue
+        chunk = next(chunks, None)
+        if chunk is None:
+            raise ValueError("JSON document ended before the end of the array %s" % key)
+        buffer += chunk
@@ -0,0 +1,105 @@
+"""Columnar views of the atoms and bonds of compound records, as NumPy arrays.
+
+Requires the optional numpy dependency.
+"""
+
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class AtomTable(NamedTuple):
+    """Atoms of a compound as columns, sorted by atom ID."""
+
+    aid: "np.ndarray"
+    """Atom IDs."""
+    number: "np.ndarray"
+    """Atomic numbers."""
+    charge: "np.ndarray"
+    """Formal charges."""
+    coords: "np.ndarray"
+    """(N, 3) array of coordinates. z is 0 in 2D records, and all coordinates are NaN in records without any."""
+
+    def __len__(self) -> int:
+        return len(self.aid)
+
+
+class BondTable(NamedTuple):
+    """Bonds of a compound as columns, sorted by begin and end atom IDs."""
+
+    aid1: "np.ndarray"
+    """Begin atom IDs."""
+    aid2: "np.ndarray"
+    """End atom IDs."""
+    order: "np.ndarray"
+    """Bond orders."""
+    style: "np.ndarray"
+    """Bond style annotations, 0 for bonds without one."""
+
+    def __len__(self) -> int:
+        return len(self.aid1)
+
+
+def atom_table(record: dict) -> AtomTable:
+    """Build the :class:`AtomTable` of a compound record from its ``atoms`` and ``coords`` sections."""
+    import numpy as np
+
+    from .pubchempy import ResponseParseError
+
+    atoms = record["atoms"]
+    aid = np.asarray(atoms["aid"], dtype=np.int64)
+    number = np.asarray(atoms["element"], dtype=np.int64)
+    if not len(aid) == len(number):
+        raise ResponseParseError("Error parsing atom elements")
+    order = np.argsort(aid, kind="stable")
+    aid, number = aid[order], number[order]
+
+    charge = np.zeros(len(aid), dtype=np.int64)
+    if "charge" in atoms:
+        charged = np.fromiter((c["aid"] for c in atoms["charge"]), dtype=np.int64, count=len(atoms["charge"]))
+        values = np.fromiter((c["value"] for c in atoms["charge"]), dtype=np.int64, count=len(atoms["charge"]))
+        charge[np.searchsorted(aid, charged)] = values
+
+    coords = np.full((len(aid), 3), np.nan)
+    if "coords" in record:
+        conformer = record["coords"][0]["conformers"][0]
+        coord_ids = np.asarray(record["coords"][0]["aid"], dtype=np.int64)
+        xs, ys, zs = conformer["x"], conformer["y"], conformer.get("z")
+        if not len(coord_ids) == len(xs) == len(ys) == len(aid) or (zs and not len(zs) == len(coord_ids)):
+            raise ResponseParseError("Error parsing atom coordinates")
+        rows = np.searchsorted(aid, coord_ids)
+        coords[rows, 0] = xs
+        coords[rows, 1] = ys
+        coords[rows, 2] = zs if zs else 0.0
+    return AtomTable(aid, number, charge, coords)
+
+
+def bond_table(record: dict) -> BondTable:
+    """Build the :class:`BondTable` of a compound record from its ``bonds`` and ``coords`` sections."""
+    import numpy as np
+
+    from .pubchempy import ResponseParseError
+
+    bonds = record.get("bonds", {"aid1": [], "aid2": [], "order": []})
+    aid1 = np.asarray(bonds["aid1"], dtype=np.int64)
+    aid2 = np.asarray(bonds["aid2"], dtype=np.int64)
+    order = np.asarray(bonds["order"], dtype=np.int64)
+    if not len(aid1) == len(aid2) == len(order):
+        raise ResponseParseError("Error parsing bonds")
+    sort = np.lexsort((aid2, aid1))
+    aid1, aid2, order = aid1[sort], aid2[sort], order[sort]
+
+    style = np.zeros(len(aid1), dtype=np.int64)
+    if len(aid1) and "coords" in record and "style" in record["coords"][0]["conformers"][0]:
+        styles = record["coords"][0]["conformers"][0]["style"]
+        styled1 = np.asarray(styles["aid1"], dtype=np.int64)
+        styled2 = np.asarray(styles["aid2"], dtype=np.int64)
+        annotation = np.asarray(styles["annotation"], dtype=np.int64)
+        # Find styled bonds among the sorted (aid1, aid2) keys, given in either direction
+        keys = (aid1 << 32) + aid2
+        for begin, end in ((styled1, styled2), (styled2, styled1)):
+            rows = np.minimum(np.searchsorted(keys, (begin << 32) + end), len(keys) - 1)
+            found = keys[rows] == (begin << 32) + end
+            style[rows[found]] = annotation[found]
+    return BondTable(aid1, aid2, order, style)
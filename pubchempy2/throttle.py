@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import Mapping
+
+log = logging.getLogger("pubchempy")
+
+#: Fraction of the maximum request rate used for each PubChem throttling status
+STATUS_FACTORS = {"green": 1.0, "yellow": 0.5, "red": 0.25, "black": 0.05}
+
+_status_pattern = re.compile(r"(?P<name>[\w ]+?) status: (?P<status>\w+)(?: \((?P<percent>\d+)%\))?")
+
+
+def parse_throttling_control(header: str) -> dict[str, str]:
+    """Parse an ``X-Throttling-Control`` header into a mapping of status name to lowercase status colour.
+
+    Example header: ``Request Count status: Green (0%), Request Time status: Yellow (55%), Service status: Green (20%)``
+    """
+    return {m["name"].strip(): m["status"].lower() for m in _status_pattern.finditer(header)}
+
+
+class RateLimiter:
+    """Token bucket limiting the rate of requests to PubChem, shared by threads and asyncio tasks.
+
+    The request rate is lowered automatically when the ``X-Throttling-Control`` header of a response reports a yellow,
+    red or black status and goes back up once the status is green again.
+
+    :param rate: Maximum number of requests per second. PubChem allows 5.
+    :param burst: Maximum number of requests that may be sent back to back after a quiet period.
+    """
+
+    def __init__(self, rate: float = 5.0, burst: int = 1):
+        self.max_rate = rate
+        self.burst = burst
+        self.rate = rate
+        """Current number of requests per second allowed, lowered when PubChem reports load."""
+        self.status = "green"
+        """Worst status reported by the latest ``X-Throttling-Control`` header."""
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return how many seconds the caller has to wait before it may be used."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # A negative balance queues callers behind each other in the order they arrived
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        """Wait without blocking the event loop until a request may be sent."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Adjust the request rate to the throttling status reported in response headers."""
+        header = headers.get("X-Throttling-Control")
+        if not header:
+            return
+        statuses = parse_throttling_control(header).values()
+        factors = [STATUS_FACTORS[s] for s in statuses if s in STATUS_FACTORS]
+        if not factors:
+            return
+        factor = min(factors)
+        status = next(s for s, f in STATUS_FACTORS.items() if f == factor)
+        with self._lock:
+            self.rate = self.max_rate * factor
+            if status != self.status:
+                log.info("PubChem throttling status changed to %s, rate set to %s requests/s", status, self.rate)
+            self.status = status
+
+
+#: Limiter shared by all clients unless they are given their own
+default_rate_limiter = RateLimiter()
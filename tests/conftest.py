@@ -0,0 +1,82 @@
+"""
+conftest
+~~~~~~~~
+
+Fixtures shared by the offline tests, which answer requests with a fake transport adapter instead of PubChem.
+
+"""
+
+import io
+import json
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from pubchempy2.client import Client, set_client
+
+
+def make_response(request, body=b"", status_code=200, headers=None):
+    """Build a response to a request.
+
+    Bodies other than bytes are encoded as JSON. The body is served from ``raw``, so the response can be read either
+    at once or streamed.
+    """
+    response = requests.Response()
+    response.request = request
+    response.url = request.url
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(body if isinstance(body, bytes) else json.dumps(body).encode())
+    return response
+
+
+def form(request):
+    """Return the fields of the POST body of a request."""
+    return {k: v[0] for k, v in parse_qs(request.body or "").items()}
+
+
+class FakeAdapter(BaseAdapter):
+    """Transport adapter that records requests and answers them with :meth:`respond`.
+
+    :meth:`respond` returns a JSON payload, bytes, or a ready :class:`requests.Response`, or raises to simulate a
+    connection error. It can be overridden, or given to the constructor as a callable.
+    """
+
+    def __init__(self, respond=None):
+        super().__init__()
+        if respond is not None:
+            self.respond = respond
+        self.requests = []
+
+    @property
+    def urls(self):
+        return [r.url for r in self.requests]
+
+    def respond(self, request):
+        raise NotImplementedError
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        result = self.respond(request)
+        return result if isinstance(result, requests.Response) else make_response(request, result)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def use_adapter():
+    """Install a default client that sends requests through a fake adapter, as ``use_adapter(adapter, **options)``.
+
+    The client has no rate limiter unless one is given, and the default client is restored after the test.
+    """
+
+    def install(adapter, **options):
+        options.setdefault("rate_limiter", None)
+        set_client(Client(adapters={"https://": adapter}, **options))
+        return adapter
+
+    yield install
+    set_client(None)
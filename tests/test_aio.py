@@ -0,0 +1,178 @@
+"""
+test_aio
+~~~~~~~~
+
+Test optional asyncio functionality.
+
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from pubchempy2 import aio
+from pubchempy2.cache import ResponseCache
+from pubchempy2.listkey import ListKeyPoller
+from pubchempy2.pubchempy import BadRequestError
+from pubchempy2.retry import RetryPolicy
+from pubchempy2.search import CompoundSearch
+
+# Import httpx, skipping tests in this module if httpx is not installed
+httpx = pytest.importorskip("httpx")
+
+
+def run(coro, handler, **kwargs):
+    """Run a coroutine with a default async client that answers every request with ``handler``."""
+
+    async def main():
+        async with aio.AsyncClient(transport=httpx.MockTransport(handler), rate_limiter=None, **kwargs) as client:
+            aio.set_async_client(client)
+            return await coro
+
+    return asyncio.run(main())
+
+
+def json_response(payload, status_code=200):
+    return httpx.Response(status_code, content=json.dumps(payload), headers={"Content-Type": "application/json"})
+
+
+def test_get_cids():
+    def handler(request):
+        assert request.url.path == "/rest/pug/compound/name/cids/JSON"
+        assert request.content == b"name=aspirin"
+        return json_response({"IdentifierList": {"CID": [2244]}})
+
+    assert run(aio.get_cids("aspirin"), handler) == [2244]
+
+
+def test_get_properties():
+    def handler(request):
+        assert request.url.path == "/rest/pug/compound/cid/property/IsomericSMILES,MolecularWeight/JSON"
+        return json_response({"PropertyTable": {"Properties": [{"CID": 1, "IsomericSMILES": "C"}]}})
+
+    results = run(aio.get_properties(["isomeric_smiles", "MolecularWeight"], 1), handler)
+    assert results == [{"CID": 1, "IsomericSMILES": "C"}]
+
+
+def test_many_in_flight():
+    def handler(request):
+        name = request.content.decode().split("=")[1]
+        return json_response({"IdentifierList": {"CID": [len(name)]}})
+
+    async def gather():
+        return await asyncio.gather(*[aio.get_cids("x" * i) for i in range(1, 101)])
+
+    results = run(gather(), handler)
+    assert results == [[i] for i in range(1, 101)]
+
+
+def test_chunked():
+    def handler(request):
+        cids = request.content.decode().split("=")[1].split("%2C")
+        return json_response({"IdentifierList": {"CID": [int(cid) for cid in cids]}})
+
+    cids = list(range(1, 2501))
+    assert run(aio.get_cids(cids, "cid"), handler) == cids
+
+
+def test_cache(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return json_response({"IdentifierList": {"CID": [2244]}})
+
+    async def twice():
+        return [await aio.get_cids("aspirin"), await aio.get_cids("aspirin")]
+
+    assert run(twice(), handler, cache=ResponseCache(tmp_path / "cache.sqlite")) == [[2244], [2244]]
+    assert len(calls) == 1
+
+
+def test_coalesce():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.1)
+        return json_response({"IdentifierList": {"CID": [2244]}})
+
+    async def gather():
+        return await asyncio.gather(*[aio.get_cids("aspirin") for _ in range(10)])
+
+    assert run(gather(), handler) == [[2244]] * 10
+    assert len(calls) == 1
+
+
+def test_coalesce_leader_cancelled():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.1)
+        return json_response({"IdentifierList": {"CID": [2244]}})
+
+    async def cancel_leader():
+        leader = asyncio.ensure_future(aio.get_cids("aspirin"))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.ensure_future(aio.get_cids("aspirin")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert run(cancel_leader(), handler) == [[2244]] * 3
+    assert len(calls) == 1
+
+
+def test_poll_listkey():
+    polls = []
+
+    def handler(request):
+        polls.append(request)
+        if len(polls) < 3:
+            return json_response({"Waiting": {"ListKey": "42"}}, 202)
+        return json_response({"IdentifierList": {"CID": [2244]}})
+
+    poller = ListKeyPoller(initial_interval=0.01)
+    response = run(aio.poll_listkey("42", operation="cids", poller=poller), handler)
+    assert response.json() == {"IdentifierList": {"CID": [2244]}}
+    assert str(polls[0].url).endswith("/compound/listkey/42/cids/JSON")
+    assert len(polls) == 3
+
+
+def test_errors():
+    def handler(request):
+        return json_response({"Fault": {"Code": "PUGREST.BadRequest", "Details": ["Bad"]}}, 400)
+
+    with pytest.raises(BadRequestError):
+        run(aio.get_cids("aspirin"), handler)
+
+
+def test_not_found():
+    def handler(request):
+        return json_response({"Fault": {"Code": "PUGREST.NotFound"}}, 404)
+
+    assert run(aio.get_synonyms(999999999), handler) == []
+
+
+def test_retry():
+    statuses = [503, 504, 200]
+
+    def handler(request):
+        return json_response({"IdentifierList": {"CID": [2244]}}, statuses.pop(0))
+
+    policy = RetryPolicy(initial=0.001)
+    assert run(aio.get_cids("aspirin"), handler, retry_policy=policy) == [2244]
+    assert policy.stats == {"SeverBusyError": 1, "TimeoutError": 1}
+
+
+def test_asearch():
+    def handler(request):
+        return json_response({"IdentifierList": {"CID": [2244]}})
+
+    search = CompoundSearch(namespace="name", identifiers=["aspirin"], operation="cids", output="JSON")
+    response = run(search.asearch(), handler)
+    assert response.json()["IdentifierList"]["CID"] == [2244]
@@ -0,0 +1,72 @@
+"""
+test_batch
+~~~~~~~~~~
+
+Test chunking of long identifier lists.
+
+"""
+
+import pytest
+from conftest import FakeAdapter, form
+
+from pubchempy2.batch import chunk_identifiers, merge_results
+from pubchempy2.pubchempy import get_cids, get_properties
+from pubchempy2.search import CompoundSearch
+
+
+class EchoAdapter(FakeAdapter):
+    """Transport adapter that answers property and cids requests for the CIDs in the POST body."""
+
+    def respond(self, request):
+        cids = [int(cid) for cid in form(request)["cid"].split(",")]
+        if "/property/" in request.url:
+            return {"PropertyTable": {"Properties": [{"CID": cid, "MolecularWeight": str(cid)} for cid in cids]}}
+        return {"IdentifierList": {"CID": cids}}
+
+
+@pytest.fixture
+def adapter(use_adapter):
+    return use_adapter(EchoAdapter())
+
+
+def test_chunk_by_count():
+    chunks = chunk_identifiers(list(range(2500)), "property/MolecularWeight")
+    assert [len(c) for c in chunks] == [1000, 1000, 500]
+    assert sum(chunks, []) == list(range(2500))
+
+
+def test_chunk_by_bytes():
+    chunks = chunk_identifiers(["x" * 99] * 10, max_bytes=300)
+    assert [len(c) for c in chunks] == [3, 3, 3, 1]
+
+
+def test_merge_results():
+    merged = merge_results(
+        [
+            {"PropertyTable": {"Properties": [{"CID": 1}]}},
+            None,
+            {"PropertyTable": {"Properties": [{"CID": 2}]}},
+        ]
+    )
+    assert merged == {"PropertyTable": {"Properties": [{"CID": 1}, {"CID": 2}]}}
+    assert merge_results([{"PC_Compounds": [1]}, {"PC_Compounds": [2, 3]}]) == {"PC_Compounds": [1, 2, 3]}
+    assert merge_results([None]) is None
+
+
+def test_get_properties_chunked(adapter):
+    cids = list(range(1, 2501))
+    results = get_properties("MolecularWeight", cids)
+    assert [r["CID"] for r in results] == cids
+    assert len(adapter.requests) == 3
+
+
+def test_comma_string_chunked(adapter):
+    cids = list(range(1, 1501))
+    assert get_cids(",".join(str(c) for c in cids), "cid") == cids
+    assert len(adapter.requests) == 2
+
+
+def test_search_json_chunked(adapter):
+    search = CompoundSearch(namespace="cid", identifiers=list(range(1, 2001)), operation="cids", output="JSON")
+    assert len(search.chunks()) == 2
+    assert search.search_json()["IdentifierList"]["CID"] == list(range(1, 2001))
@@ -0,0 +1,69 @@
+"""
+test_bulk
+~~~~~~~~~
+
+Test bulk downloads of many identifiers in several formats.
+
+"""
+
+import os
+
+import pytest
+from conftest import FakeAdapter, form
+
+from pubchempy2.bulk import bulk_download, plan_bulk_download
+
+
+class ExportAdapter(FakeAdapter):
+    """Transport adapter answering every request with the requested CIDs and output format."""
+
+    def __init__(self):
+        super().__init__()
+        self.exports = []
+
+    def respond(self, request):
+        cids = form(request)["cid"]
+        self.exports.append((request.url.rsplit("/", 1)[1], cids))
+        return ("%s %s" % (request.url.rsplit("/", 1)[1], cids)).encode()
+
+
+@pytest.fixture
+def adapter(use_adapter):
+    return use_adapter(ExportAdapter())
+
+
+def test_plan(tmp_path):
+    manifest = plan_bulk_download(range(1, 251), ["SDF", "PNG"], tmp_path)
+    sdf = [entry for entry in manifest if entry["outformat"] == "SDF"]
+    png = [entry for entry in manifest if entry["outformat"] == "PNG"]
+    assert [entry["identifier"] for entry in sdf] == [list(range(1, 101)), list(range(101, 201)), list(range(201, 251))]
+    assert sdf[0]["path"] == os.path.join(tmp_path, "cid_1-100.sdf")
+    assert len(png) == 250
+    assert png[0]["path"] == os.path.join(tmp_path, "1.png")
+
+
+def test_plan_operation_per_format(tmp_path):
+    operation = {"CSV": "property/MolecularWeight"}
+    manifest = plan_bulk_download(range(1, 3), ["CSV", "SDF"], tmp_path, operation=operation)
+    assert [entry["operation"] for entry in manifest] == ["property/MolecularWeight", None]
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError):
+        plan_bulk_download([1], ["GIF"], tmp_path)
+
+
+def test_bulk_download(tmp_path, adapter):
+    paths = bulk_download(range(1, 6), ["SDF", "PNG"], tmp_path / "out", max_count=2)
+    assert len(paths) == 3 + 5
+    assert sorted(os.listdir(tmp_path / "out")) == sorted(os.path.basename(p) for p in paths)
+    with open(tmp_path / "out" / "cid_3-4.sdf") as f:
+        assert f.read() == "SDF 3,4"
+
+
+def test_skip_existing(tmp_path, adapter):
+    (tmp_path / "1.png").write_bytes(b"existing")
+    paths = bulk_download([1, 2], ["PNG"], tmp_path)
+    assert paths == [os.path.join(tmp_path, "2.png")]
+    assert adapter.exports == [("PNG", "2")]
+    assert (tmp_path / "1.png").read_bytes() == b"existing"
@@ -0,0 +1,114 @@
+"""
+test_cache
+~~~~~~~~~~
+
+Test the persistent response cache.
+
+"""
+
+import time
+
+import pytest
+from conftest import FakeAdapter, make_response
+
+from pubchempy2.cache import ResponseCache, cache_key
+from pubchempy2.pubchempy import get_cids, get_properties
+
+API = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
+
+
+def json_adapter(payload, status_code=200):
+    """Adapter that answers every request with a JSON payload."""
+    return FakeAdapter(
+        lambda request: make_response(request, payload, status_code, {"Content-Type": "application/json"})
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(tmp_path / "cache.sqlite")
+
+
+@pytest.fixture
+def use(use_adapter):
+    return lambda adapter, cache: use_adapter(adapter, cache=cache)
+
+
+def test_cache_key():
+    assert cache_key(f"{API}/compound/cid/JSON", {"cid": "1", "a": "b"}) == cache_key(
+        f"{API}/compound/cid/JSON", {"a": "b", "cid": "1"}
+    )
+    assert cache_key(f"{API}/compound/cid/JSON", {"cid": "1"}) != cache_key(f"{API}/compound/cid/JSON", {"cid": "2"})
+
+
+def test_ttl(cache):
+    assert cache.ttl(f"{API}/compound/cid/property/MolecularWeight/JSON") == cache.ttls["property"]
+    assert cache.ttl(f"{API}/compound/cid/assaysummary/JSON") == cache.ttls["assaysummary"]
+    assert cache.ttl(f"{API}/compound/cid/2244/JSON") == cache.ttls["record"]
+    assert cache.ttl(f"{API}/compound/cid/JSON") == cache.ttls["record"]
+    assert cache.ttl(f"{API}/substance/sid/1/SDF") == cache.ttls["record"]
+    assert cache.ttl(f"{API}/compound/name/aspirin/JSON") == cache.default_ttl
+    assert cache.ttl(f"{API}/compound/fastsubstructure/smiles/CCO/JSON") == cache.default_ttl
+    assert cache.ttl(f"{API}/compound/listkey/123/cids/JSON") == 0
+
+
+def test_responses_cached(cache, use):
+    adapter = json_adapter({"IdentifierList": {"CID": [2244]}})
+    use(adapter, cache)
+    assert get_cids("aspirin") == [2244]
+    assert get_cids("aspirin") == [2244]
+    assert len(adapter.requests) == 1
+    assert len(cache) == 1
+    # The cache is persistent
+    use(adapter, ResponseCache(cache.path))
+    assert get_cids("aspirin") == [2244]
+    assert len(adapter.requests) == 1
+
+
+def test_errors_not_cached(cache, use):
+    adapter = json_adapter({"Fault": {}}, 400)
+    use(adapter, cache)
+    for _ in range(2):
+        with pytest.raises(Exception):
+            get_properties("MolecularWeight", "aspirin", "name")
+    assert len(adapter.requests) == 2
+    assert len(cache) == 0
+
+
+def test_waiting_not_cached(cache):
+    assert not cache.set("key", f"{API}/compound/smiles/cids/JSON", 200, {}, b'{"Waiting": {"ListKey": "1"}}')
+
+
+def test_expiry(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttls={"cids": 0.05})
+    cache.set("key", f"{API}/compound/name/cids/JSON", 200, {}, b"{}")
+    assert cache.get("key").content == b"{}"
+    time.sleep(0.1)
+    assert cache.get("key") is None
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_size=160)
+    for i in range(3):
+        cache.set(f"key{i}", f"{API}/compound/cid/JSON", 200, {}, bytes(range(40 + i)))
+        time.sleep(0.01)
+    cache.get("key0")
+    cache.set("key3", f"{API}/compound/cid/JSON", 200, {}, bytes(range(43)))
+    assert cache.get("key0") is not None
+    assert cache.get("key1") is None
+
+
+def test_size_tracked(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    cache.set("key0", f"{API}/compound/cid/JSON", 200, {}, bytes(range(40)))
+    cache.set("key1", f"{API}/compound/cid/JSON", 200, {}, bytes(range(50)))
+    cache.set("key0", f"{API}/compound/cid/JSON", 200, {}, bytes(range(60)))
+
+    def total():
+        return cache._connection().execute("SELECT SUM(size) FROM responses").fetchone()[0]
+
+    assert cache.size() == total()
+    # The size is shared with other connections to the same file
+    assert ResponseCache(cache.path).size() == total()
+    cache.clear()
+    assert cache.size() == 0
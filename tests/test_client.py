@@ -0,0 +1,50 @@
+"""
+test_client
+~~~~~~~~~~~
+
+Test the pooled HTTP client.
+
+"""
+
+import pytest
+from conftest import FakeAdapter, make_response
+
+from pubchempy2.client import Client, get_client
+from pubchempy2.pubchempy import get_cids
+from pubchempy2.search import CompoundSearch
+
+
+def recording_adapter(payload):
+    """Adapter that records requests and answers them with a JSON payload."""
+    return FakeAdapter(lambda request: make_response(request, payload, headers={"Content-Type": "application/json"}))
+
+
+@pytest.fixture
+def adapter(use_adapter):
+    return use_adapter(recording_adapter({"IdentifierList": {"CID": [2244]}}))
+
+
+def test_default_client_is_shared():
+    assert get_client() is get_client()
+
+
+def test_legacy_request_uses_client(adapter):
+    assert get_cids("aspirin") == [2244]
+    assert len(adapter.requests) == 1
+    assert adapter.requests[0].body == "name=aspirin"
+
+
+def test_search_uses_client(adapter):
+    response = CompoundSearch(namespace="name", identifiers=["aspirin"], operation="cids", output="JSON").search()
+    assert response.json()["IdentifierList"]["CID"] == [2244]
+    assert adapter.requests[0].url.endswith("/compound/name/cids/JSON")
+
+
+def test_search_explicit_client():
+    adapter = recording_adapter({"IdentifierList": {"CID": [702]}})
+    with Client(adapters={"https://": adapter}) as client:
+        response = CompoundSearch(namespace="name", identifiers=["ethanol"], operation="cids", output="JSON").search(
+            client
+        )
+    assert response.json()["IdentifierList"]["CID"] == [702]
+    assert len(adapter.requests) == 1
@@ -0,0 +1,62 @@
+"""
+test_coalesce
+~~~~~~~~~~~~~
+
+Test coalescing of concurrent identical requests.
+
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from conftest import FakeAdapter, make_response
+
+from pubchempy2.pubchempy import BadRequestError, get_cids
+
+
+class SlowAdapter(FakeAdapter):
+    """Transport adapter that takes a while to answer, echoing the length of the POST body."""
+
+    def __init__(self, status_code=200):
+        super().__init__()
+        self.status_code = status_code
+
+    def respond(self, request):
+        time.sleep(0.2)
+        return make_response(request, {"IdentifierList": {"CID": [len(request.body)]}}, self.status_code)
+
+
+def test_identical_requests_coalesced(use_adapter):
+    adapter = use_adapter(SlowAdapter())
+    with ThreadPoolExecutor(10) as executor:
+        results = list(executor.map(lambda _: get_cids("aspirin"), range(10)))
+    assert results == [[12]] * 10
+    assert len(adapter.requests) == 1
+
+
+def test_different_requests_not_coalesced(use_adapter):
+    adapter = use_adapter(SlowAdapter())
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda n: get_cids("x" * n), range(1, 5)))
+    assert results == [[6], [7], [8], [9]]
+    assert len(adapter.requests) == 4
+
+
+def test_errors_shared(use_adapter):
+    adapter = use_adapter(SlowAdapter(400), retry_policy=None)
+
+    def fetch(_):
+        with pytest.raises(BadRequestError):
+            get_cids("aspirin")
+
+    with ThreadPoolExecutor(5) as executor:
+        list(executor.map(fetch, range(5)))
+    assert len(adapter.requests) == 1
+
+
+def test_coalesce_disabled(use_adapter):
+    adapter = use_adapter(SlowAdapter(), coalesce=False)
+    with ThreadPoolExecutor(3) as executor:
+        list(executor.map(lambda _: get_cids("aspirin"), range(3)))
+    assert len(adapter.requests) == 3
@@ -0,0 +1,79 @@
+"""
+test_compound_lazy
+~~~~~~~~~~~~~~~~~~
+
+Test that atoms and bonds are only created from the record when needed.
+
+"""
+
+import pytest
+
+from pubchempy2.pubchempy import Atom, Bond, Compound, PubChemPyDeprecationWarning, ResponseParseError
+
+RECORD = {
+    "id": {"id": {"cid": 702}},
+    "atoms": {"aid": [3, 1, 2], "element": [8, 6, 6], "charge": [{"aid": 3, "value": -1}]},
+    "bonds": {"aid1": [1, 2], "aid2": [2, 3], "order": [1, 1]},
+    "coords": [
+        {
+            "aid": [1, 2, 3],
+            "conformers": [
+                {"x": [0.0, 1.0, 2.0], "y": [0.5, 0.5, 0.5], "style": {"aid1": [1], "aid2": [2], "annotation": [8]}}
+            ],
+        }
+    ],
+}
+
+
+def test_lazy_atoms_and_bonds():
+    compound = Compound(RECORD)
+    assert compound.cid == 702
+    assert compound.elements == ["C", "C", "O"]
+    assert compound._atoms is None and compound._bonds is None
+    assert [(a.aid, a.element, a.x, a.charge) for a in compound.atoms] == [
+        (1, "C", 0.0, 0),
+        (2, "C", 1.0, 0),
+        (3, "O", 2.0, -1),
+    ]
+    assert compound._bonds is None
+    assert [(b.aid1, b.aid2, b.style) for b in compound.bonds] == [(1, 2, 8), (2, 3, None)]
+
+
+def test_record_reset():
+    compound = Compound(RECORD)
+    assert len(compound.atoms) == 3
+    compound.record = {"atoms": {"aid": [1], "element": [1]}}
+    assert compound.elements == ["H"]
+    assert [a.element for a in compound.atoms] == ["H"]
+    assert compound.bonds == []
+
+
+def test_parse_error_on_access():
+    compound = Compound({"atoms": {"aid": [1, 2], "element": [6]}})
+    with pytest.raises(ResponseParseError):
+        compound.atoms
+    with pytest.raises(ResponseParseError):
+        compound.atoms
+    with pytest.raises(ResponseParseError):
+        compound.elements
+
+
+def test_compact_atoms_and_bonds():
+    atom, bond = Atom(1, 6, 0.5, 1.5), Bond(1, 2, 2)
+    assert not hasattr(atom, "__dict__") and not hasattr(bond, "__dict__")
+    assert atom == Atom(1, 6, 0.5, 1.5) and atom != Atom(1, 7, 0.5, 1.5)
+    assert bond == Bond(1, 2, 2) and bond != Bond(1, 2, 1)
+    atom.set_coordinates(1.0, 2.0, 3.0)
+    assert atom.to_dict() == {"aid": 1, "number": 6, "element": "C", "x": 1.0, "y": 2.0, "z": 3.0}
+
+
+def test_set_unknown_key():
+    atom, bond = Atom(1, 6), Bond(1, 2)
+    with pytest.warns(PubChemPyDeprecationWarning):
+        atom["charge"] = 1
+        bond["order"] = 2
+    assert atom.charge == 1 and bond.order == 2
+    with pytest.raises(KeyError), pytest.warns(PubChemPyDeprecationWarning):
+        atom["mass"] = 12
+    with pytest.raises(KeyError), pytest.warns(PubChemPyDeprecationWarning):
+        bond["length"] = 1.5
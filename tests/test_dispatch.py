@@ -0,0 +1,81 @@
+"""
+test_dispatch
+~~~~~~~~~~~~~
+
+Test combining single-CID calls into multi-CID requests.
+
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from conftest import FakeAdapter, form
+
+from pubchempy2.dispatch import CidDispatcher
+
+
+class PropertyAdapter(FakeAdapter):
+    """Transport adapter that answers property and record requests for the CIDs in the POST body."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def respond(self, request):
+        cids = [int(cid) for cid in form(request)["cid"].split(",")]
+        self.batches.append(cids)
+        found = [cid for cid in cids if cid < 1000]
+        if "/property/" in request.url:
+            return {"PropertyTable": {"Properties": [{"CID": cid, "MolecularWeight": str(cid)} for cid in found]}}
+        return {"PC_Compounds": [{"id": {"id": {"cid": cid}}, "atoms": {"aid": [], "element": []}} for cid in found]}
+
+
+@pytest.fixture
+def adapter(use_adapter):
+    return use_adapter(PropertyAdapter())
+
+
+def test_properties_combined(adapter):
+    with CidDispatcher(window=0.1) as dispatcher:
+        with ThreadPoolExecutor(20) as executor:
+            results = list(executor.map(lambda cid: dispatcher.get_properties("molecular_weight", cid), range(1, 21)))
+    assert [r["CID"] for r in results] == list(range(1, 21))
+    assert len(adapter.batches) == 1
+    assert sorted(adapter.batches[0]) == list(range(1, 21))
+
+
+def test_max_batch(adapter):
+    with CidDispatcher(window=10, max_batch=5) as dispatcher:
+        with ThreadPoolExecutor(10) as executor:
+            results = list(executor.map(lambda cid: dispatcher.get_properties("MolecularWeight", cid), range(1, 11)))
+    assert len(results) == 10
+    assert [len(batch) for batch in adapter.batches] == [5, 5]
+
+
+def test_stale_timer():
+    batches = []
+
+    def fetch(cids):
+        batches.append(cids)
+        return {cid: cid for cid in cids}
+
+    with CidDispatcher(window=10, max_batch=2) as dispatcher:
+        first = dispatcher.submit("key", 1, fetch)
+        stale = dispatcher._groups["key"]
+        dispatcher.submit("key", 2, fetch)
+        assert first.result() == 1
+        third = dispatcher.submit("key", 3, fetch)
+        # The timer of the first group fires late, once the next group has started
+        stale.timer.function(*stale.timer.args)
+        assert "key" in dispatcher._groups and not third.done()
+    assert third.result() == 3
+    assert batches == [[1, 2], [3]]
+
+
+def test_compounds_combined(adapter):
+    with CidDispatcher() as dispatcher:
+        with ThreadPoolExecutor(5) as executor:
+            compounds = list(executor.map(dispatcher.from_cid, [1, 2, 2, 3, 1001]))
+    assert [c.cid if c else None for c in compounds] == [1, 2, 2, 3, None]
+    assert len(adapter.batches) == 1
+    assert sorted(adapter.batches[0]) == [1, 2, 3, 1001]
@@ -7,13 +7,20 @@ Test downloading.
 """
 
 import csv
+import hashlib
+import io
 import os
 import shutil
 import tempfile
 
 import pytest
+from conftest import FakeAdapter, form, make_response
+from requests.exceptions import ChunkedEncodingError
 
-from pubchempy2.pubchempy import download
+from pubchempy2.errors import NetworkError
+from pubchempy2.listkey import default_poller
+from pubchempy2.pubchempy import download, download_many
+from pubchempy2.retry import RetryPolicy
 
 
 @pytest.fixture(scope="module")
@@ -38,3 +45,143 @@ def test_csv_download(tmp_dir):
         assert rows[1][0] == "1"
         assert rows[2][0] == "2"
         assert rows[3][0] == "3"
+
+
+CONTENT = bytes(range(256)) * 64
+
+
+class DroppingStream(io.BytesIO):
+    """Response body whose connection drops after ``limit`` bytes."""
+
+    def __init__(self, content, limit=None):
+        super().__init__(content)
+        self.limit = limit
+
+    def read(self, size=-1):
+        if self.limit is not None and self.tell() >= self.limit:
+            raise ChunkedEncodingError("Connection broken")
+        return super().read(size)
+
+
+class StreamingAdapter(FakeAdapter):
+    """Transport adapter serving ``CONTENT`` with support for range requests, optionally dropping the connection."""
+
+    def __init__(self, ranges=True, drops=()):
+        super().__init__()
+        self.ranges = ranges
+        self.drops = list(drops)
+
+    def respond(self, request):
+        start = 0
+        if self.ranges and "Range" in request.headers:
+            start = int(request.headers["Range"].split("=")[1].rstrip("-"))
+        response = make_response(request, status_code=206 if start else 200)
+        response.headers["Content-Length"] = str(len(CONTENT) - start)
+        response.raw = DroppingStream(CONTENT[start:], self.drops.pop(0) if self.drops else None)
+        return response
+
+
+@pytest.fixture
+def adapter(use_adapter):
+    return use_adapter(StreamingAdapter())
+
+
+def test_streaming_download(tmp_path, adapter):
+    path = str(tmp_path / "out.sdf")
+    calls = []
+    digest = download("SDF", path, 2244, progress=lambda *args: calls.append(args))
+    with open(path, "rb") as f:
+        assert f.read() == CONTENT
+    assert digest == hashlib.sha256(CONTENT).hexdigest()
+    assert calls[-1] == (path, len(CONTENT), len(CONTENT))
+    assert not os.path.exists(path + ".part")
+
+
+def test_resume_after_drop(tmp_path, adapter, monkeypatch):
+    monkeypatch.setattr("pubchempy2.pubchempy.DOWNLOAD_CHUNK_SIZE", 1024)
+    adapter.drops = [4096]
+    path = str(tmp_path / "out.sdf")
+    assert download("SDF", path, 2244) == hashlib.sha256(CONTENT).hexdigest()
+    assert adapter.requests[1].headers["Range"] == "bytes=4096-"
+    with open(path, "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_restart_without_range_support(tmp_path, adapter):
+    adapter.ranges = False
+    path = str(tmp_path / "out.sdf")
+    with open(path + ".part", "wb") as f:
+        f.write(b"stale")
+    download("SDF", path, 2244)
+    with open(path, "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_checksum_mismatch(tmp_path, adapter):
+    path = str(tmp_path / "out.sdf")
+    with pytest.raises(IOError):
+        download("SDF", path, 2244, checksum="0" * 64)
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + ".part")
+    download("SDF", path, 2244, checksum=hashlib.sha256(CONTENT).hexdigest())
+    assert os.path.exists(path)
+
+
+def test_download_many(tmp_path, adapter):
+    manifest = [
+        {"outformat": "SDF", "path": str(tmp_path / ("%s.sdf" % cid)), "identifier": cid} for cid in range(1, 6)
+    ]
+    done = set()
+    digests = download_many(manifest, progress=lambda path, downloaded, total: done.add(path))
+    assert digests == [hashlib.sha256(CONTENT).hexdigest()] * 5
+    assert done == {entry["path"] for entry in manifest}
+
+
+def test_resume_counts_against_retry_budget(tmp_path, use_adapter, monkeypatch):
+    monkeypatch.setattr("pubchempy2.pubchempy.DOWNLOAD_CHUNK_SIZE", 1024)
+    adapter = use_adapter(StreamingAdapter(drops=[1024, 2048]), retry_policy=RetryPolicy({NetworkError: 1}, initial=0))
+    with pytest.raises(NetworkError):
+        download("SDF", str(tmp_path / "out.sdf"), 2244)
+    assert len(adapter.requests) == 2
+
+
+def test_resume_leftover_part(tmp_path, use_adapter, monkeypatch):
+    monkeypatch.setattr("pubchempy2.pubchempy.DOWNLOAD_CHUNK_SIZE", 1024)
+    path = str(tmp_path / "out.sdf")
+    adapter = use_adapter(StreamingAdapter(drops=[2048]), retry_policy=None)
+    with pytest.raises(ChunkedEncodingError):
+        download("SDF", path, 2244)
+    assert os.path.getsize(path + ".part") == 2048
+    # A leftover partial file of a different request is discarded
+    with pytest.raises(ChunkedEncodingError):
+        adapter.drops = [1024]
+        download("SDF", path, 2245)
+    assert "Range" not in adapter.requests[1].headers
+    # The partial file of the same request is resumed
+    download("SDF", path, 2245)
+    assert adapter.requests[2].headers["Range"] == "bytes=1024-"
+    with open(path, "rb") as f:
+        assert f.read() == CONTENT
+    assert os.listdir(tmp_path) == ["out.sdf"]
+
+
+class AsyncExportAdapter(StreamingAdapter):
+    """Streaming adapter for a search that finishes at once and is then downloaded from its ListKey."""
+
+    def respond(self, request):
+        if "/listkey/" not in request.url:
+            return {"Waiting": {"ListKey": "42"}}
+        if form(request).get("listkey_count") == "1":
+            return {"IdentifierList": {"CID": [1]}}
+        return super().respond(request)
+
+
+def test_download_async_search(tmp_path, use_adapter, monkeypatch):
+    monkeypatch.setattr(default_poller, "initial_interval", 0.01)
+    adapter = use_adapter(AsyncExportAdapter())
+    path = str(tmp_path / "out.png")
+    download("PNG", path, "CCO", "smiles", searchtype="substructure", MaxRecords=1, image_size="large")
+    search, _, fetch = adapter.requests
+    assert form(search) == {"smiles": "CCO", "MaxRecords": "1"}
+    assert fetch.url.endswith("/compound/listkey/42/PNG")
+    assert form(fetch) == {"image_size": "large"}
@@ -0,0 +1,94 @@
+"""
+test_fingerprint
+~~~~~~~~~~~~~~~~
+
+Test binary fingerprints.
+
+"""
+
+import base64
+import random
+
+import pytest
+
+from pubchempy2.fingerprint import CACTVS_BITS, Fingerprint
+from pubchempy2.pubchempy import Compound
+
+
+def random_hex(seed, density=0.2):
+    rng = random.Random(seed)
+    bits = "".join("1" if rng.random() < density else "0" for _ in range(CACTVS_BITS)) + "0" * 7
+    return "00000371" + bytes(int(bits[i : i + 8], 2) for i in range(0, len(bits), 8)).hex().upper()
+
+
+def compound(hex_fingerprint):
+    props = [{"urn": {"label": "Fingerprint", "implementation": "E_SCREEN"}, "value": {"binary": hex_fingerprint}}]
+    return Compound({"atoms": {"aid": [], "element": []}, "props": props})
+
+
+def legacy_bitstring(hex_fingerprint):
+    return "{0:020b}".format(int(hex_fingerprint[8:], 16))[:-7].zfill(881)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_decoding_matches_bitstring(seed):
+    value = random_hex(seed)
+    fp = Fingerprint.from_hex(value)
+    assert len(fp) == CACTVS_BITS
+    assert fp.to_bitstring() == legacy_bitstring(value)
+    assert fp.on_bits() == [i for i, bit in enumerate(legacy_bitstring(value)) if bit == "1"]
+    assert Fingerprint.from_bitstring(fp.to_bitstring()) == fp
+    assert Fingerprint.from_bytes(fp.to_bytes()) == fp
+    assert Fingerprint.from_base64(base64.b64encode(bytes.fromhex(value)).decode()) == fp
+
+
+def test_bits():
+    fp = Fingerprint.from_bitstring("1010")
+    assert list(fp) == [True, False, True, False]
+    assert fp[0] and not fp[1] and fp[-2]
+    assert fp.popcount() == 2
+    assert fp.to_bytes() == b"\xa0"
+    with pytest.raises(IndexError):
+        fp[4]
+    assert Fingerprint.from_bytes(b"\xa0", 4) == fp
+    with pytest.raises(ValueError):
+        Fingerprint.from_bytes(b"\xa0", 12)
+    with pytest.raises(ValueError):
+        Fingerprint.from_pubchem(b"\0\0\x03\x71" + b"\0" * 10)
+
+
+def test_operations():
+    a, b = Fingerprint.from_bitstring("1100"), Fingerprint.from_bitstring("1010")
+    assert (a & b).to_bitstring() == "1000"
+    assert (a | b).to_bitstring() == "1110"
+    assert (a ^ b).to_bitstring() == "0110"
+    assert (~a).to_bitstring() == "0011"
+    assert (a | b).contains(a) and not a.contains(b)
+    with pytest.raises(ValueError):
+        a & Fingerprint.from_bitstring("10")
+
+
+def test_similarity():
+    a, b = Fingerprint.from_bitstring("1110"), Fingerprint.from_bitstring("0111")
+    assert a.tanimoto(b) == 0.5
+    assert a.tversky(b) == a.tanimoto(b)
+    assert a.tversky(b, 0.5, 0.5) == pytest.approx(2 / 3)
+    assert a.tversky(b, 1, 0) == pytest.approx(2 / 3)
+    empty = Fingerprint(0, 4)
+    assert empty.tanimoto(empty) == 0.0
+
+
+def test_to_numpy():
+    np = pytest.importorskip("numpy")
+    fp = Fingerprint.from_hex(random_hex(1))
+    assert np.unpackbits(fp.to_numpy())[:CACTVS_BITS].sum() == fp.popcount()
+
+
+def test_compound_fingerprint():
+    value = random_hex(2)
+    c = compound(value)
+    fp = c.binary_fingerprint
+    assert c.binary_fingerprint is fp
+    assert c.cactvs_fingerprint == legacy_bitstring(value)
+    c.record = compound(random_hex(3)).record
+    assert c.binary_fingerprint != fp
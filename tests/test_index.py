@@ -0,0 +1,92 @@
+"""
+test_index
+~~~~~~~~~~
+
+Test the local memory-mapped fingerprint index.
+
+"""
+
+import random
+
+import pytest
+
+from pubchempy2.fingerprint import CACTVS_BITS, Fingerprint
+
+np = pytest.importorskip("numpy")
+
+from pubchempy2.index import FingerprintIndex  # noqa: E402
+from pubchempy2.matrix import FingerprintMatrix  # noqa: E402
+
+
+@pytest.fixture
+def matrix():
+    rng = random.Random(0)
+    fingerprints = [Fingerprint(rng.getrandbits(CACTVS_BITS) & rng.getrandbits(CACTVS_BITS)) for _ in range(200)]
+    # Near duplicates of the first fingerprint, so that searches have hits above high thresholds
+    fingerprints += [fingerprints[0] ^ Fingerprint(1 << i) for i in range(10)]
+    return FingerprintMatrix.from_fingerprints(fingerprints, ids=range(5000, 5210))
+
+
+@pytest.fixture
+def index(tmp_path, matrix):
+    return FingerprintIndex.build(tmp_path / "test.fpidx", matrix)
+
+
+def test_build(index, matrix):
+    assert len(index) == 210
+    assert isinstance(index.words, np.memmap)
+    assert list(index.counts) == sorted(matrix.counts)
+    assert sorted(index.cids) == list(range(5000, 5210))
+
+
+def test_search_threshold(index, matrix):
+    query = matrix.fingerprint(0)
+    hits = index.search(query, threshold=0.9)
+    scores = matrix.tanimoto(query)
+    expected = matrix.ids[scores >= 0.9]
+    assert sorted(hits.cids) == sorted(expected.tolist())
+    assert hits.cids[0] == 5000 and hits.scores[0] == 1.0
+    assert hits.scores == sorted(hits.scores, reverse=True)
+    assert all(type(cid) is int for cid in hits.cids)
+
+
+def test_search_low_threshold(index, matrix):
+    query = matrix.fingerprint(7)
+    hits = index.search(query, threshold=0.3)
+    assert sorted(hits.cids) == sorted(matrix.ids[matrix.tanimoto(query) >= 0.3].tolist())
+
+
+def test_search_top_k(index, matrix):
+    query = matrix.fingerprint(3)
+    hits = index.search(query, threshold=0.0, k=5)
+    indices, scores = matrix.top_k(query, 5)
+    assert hits.scores == pytest.approx(scores.tolist())
+    assert hits.cids[0] == 5003
+
+
+def test_search_top_k_threshold(index, matrix):
+    hits = index.search(matrix.fingerprint(0), threshold=0.95, k=100)
+    assert len(hits.cids) == len(index.search(matrix.fingerprint(0), threshold=0.95).cids) < 100
+
+
+def test_search_compound(index, matrix):
+    class FakeCompound:
+        binary_fingerprint = matrix.fingerprint(0)
+
+    assert index.search(FakeCompound(), threshold=1.0).cids[0] == 5000
+
+
+def test_invalid(tmp_path, index):
+    with pytest.raises(ValueError):
+        index.search(Fingerprint(1, 16))
+    path = tmp_path / "other"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        FingerprintIndex(path)
+
+
+def test_empty(tmp_path):
+    index = FingerprintIndex.build(tmp_path / "empty.fpidx", FingerprintMatrix(np.empty((0, 14), np.uint64), []))
+    assert len(index) == 0
+    assert index.search(Fingerprint(1), threshold=0.5).cids == []
+    assert index.search(Fingerprint(1), k=3).cids == []
@@ -0,0 +1,50 @@
+"""
+test_jsonlib
+~~~~~~~~~~~~
+
+Test the pluggable JSON decoder.
+
+"""
+
+import builtins
+
+import pytest
+
+from pubchempy2 import jsonlib
+
+DATA = b'{"PC_Compounds": [{"id": {"id": {"cid": 2244}}, "coords": [{"conformers": [{"x": [1.5, -0.25]}]}]}]}'
+EXPECTED = {"PC_Compounds": [{"id": {"id": {"cid": 2244}}, "coords": [{"conformers": [{"x": [1.5, -0.25]}]}]}]}
+
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    yield
+    jsonlib.set_backend()
+
+
+@pytest.mark.parametrize("backend", jsonlib.BACKENDS)
+def test_backends(backend):
+    pytest.importorskip(backend)
+    assert jsonlib.set_backend(backend) == backend
+    assert jsonlib.loads(DATA) == EXPECTED
+    assert jsonlib.loads(DATA.decode()) == EXPECTED
+    with pytest.raises(ValueError):
+        jsonlib.loads(b'{"PC_Compounds": [')
+
+
+def test_fallback(monkeypatch):
+    real_import = builtins.__import__
+
+    def fake_import(name, *args, **kwargs):
+        if name in ("orjson", "msgspec"):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+    assert jsonlib.set_backend() == "json"
+    assert jsonlib.loads(DATA) == EXPECTED
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        jsonlib.set_backend("simplejson")
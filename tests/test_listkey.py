@@ -0,0 +1,88 @@
+"""
+test_listkey
+~~~~~~~~~~~~
+
+Test polling of asynchronous searches.
+
+"""
+
+import time
+from collections import Counter
+from concurrent.futures import CancelledError
+
+import pytest
+from conftest import FakeAdapter, make_response
+
+from pubchempy2.listkey import ListKeyPoller, default_poller, wait_all
+from pubchempy2.pubchempy import TimeoutError, get
+
+SDF = b"2244\n  -OEChem-\n\n$$$$\n"
+
+
+class AsyncSearchAdapter(FakeAdapter):
+    """Transport adapter for searches that finish after a number of polls of their ListKey."""
+
+    def __init__(self, polls_needed=2):
+        super().__init__()
+        self.polls_needed = polls_needed
+        self.polls = Counter()
+
+    def respond(self, request):
+        if "/listkey/" not in request.url:
+            return make_response(request, {"Waiting": {"ListKey": "42", "Message": "Running"}}, 202)
+        listkey = request.url.split("/listkey/")[1].split("/")[0]
+        self.polls[listkey] += 1
+        if self.polls[listkey] <= self.polls_needed:
+            return make_response(request, {"Waiting": {"ListKey": listkey}}, 202)
+        if request.url.endswith("/SDF"):
+            return SDF
+        return {"IdentifierList": {"CID": [int(listkey)]}}
+
+
+@pytest.fixture
+def adapter(use_adapter):
+    return use_adapter(AsyncSearchAdapter(), coalesce=False)
+
+
+@pytest.fixture
+def poller():
+    return ListKeyPoller(initial_interval=0.01, max_interval=0.05)
+
+
+def test_poll(adapter, poller):
+    job = poller.submit("7", operation="cids")
+    assert job.result(5).json() == {"IdentifierList": {"CID": [7]}}
+    assert job.polls == 3
+
+
+def test_many_concurrent(adapter, poller):
+    jobs = [poller.submit(str(i), operation="cids") for i in range(50)]
+    results = wait_all(jobs, timeout=10)
+    assert [r.json()["IdentifierList"]["CID"] for r in results] == [[i] for i in range(50)]
+
+
+def test_timeout(adapter):
+    poller = ListKeyPoller(initial_interval=0.01, timeout=0.05)
+    adapter.polls_needed = 100
+    with pytest.raises(TimeoutError):
+        poller.submit("1", operation="cids").result(5)
+
+
+def test_cancel(adapter):
+    poller = ListKeyPoller(initial_interval=0.05)
+    adapter.polls_needed = 100
+    job = poller.submit("1", operation="cids")
+    assert job.cancel()
+    with pytest.raises(CancelledError):
+        job.result()
+    time.sleep(0.1)
+    assert adapter.polls["1"] == 0
+
+
+def test_get_polls_final_output(adapter, monkeypatch):
+    monkeypatch.setattr(default_poller, "initial_interval", 0.01)
+    response = get("CC", "smiles", operation="record", output="SDF", searchtype="substructure")
+    assert response.content == SDF
+    # One search request and three polls, without an extra request for the SDF output
+    assert len(adapter.urls) == 4
+    assert all(url.endswith("/listkey/42/record/SDF") for url in adapter.urls[1:])
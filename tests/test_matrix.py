@@ -0,0 +1,81 @@
+"""
+test_matrix
+~~~~~~~~~~~
+
+Test vectorized similarity searches over fingerprint matrices.
+
+"""
+
+import base64
+import random
+
+import pytest
+
+from pubchempy2.fingerprint import CACTVS_BITS, Fingerprint
+
+np = pytest.importorskip("numpy")
+
+from pubchempy2 import matrix as matrix_module  # noqa: E402
+from pubchempy2.matrix import FingerprintMatrix  # noqa: E402
+
+
+def random_fingerprints(count, seed=0):
+    rng = random.Random(seed)
+    return [Fingerprint(rng.getrandbits(CACTVS_BITS) & rng.getrandbits(CACTVS_BITS)) for _ in range(count)]
+
+
+@pytest.fixture
+def fingerprints():
+    return random_fingerprints(50)
+
+
+@pytest.fixture
+def matrix(fingerprints):
+    return FingerprintMatrix.from_fingerprints(fingerprints, ids=range(1000, 1050))
+
+
+def test_construction(fingerprints, matrix):
+    assert len(matrix) == 50
+    assert matrix.fingerprint(3) == fingerprints[3]
+    assert matrix.counts.tolist() == [fp.popcount() for fp in fingerprints]
+    properties = [{"CID": 1, "Fingerprint2D": base64.b64encode(b"\0\0\x03\x71" + fingerprints[0].to_bytes()).decode()}]
+    assert FingerprintMatrix.from_properties(properties).fingerprint(0) == fingerprints[0]
+
+
+def test_popcount_fallback(matrix, monkeypatch):
+    expected = matrix.counts.copy()
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    assert matrix_module.popcount(matrix.words).tolist() == expected.tolist()
+
+
+def test_one_vs_all(fingerprints, matrix):
+    query = fingerprints[7]
+    expected = [query.tanimoto(fp) for fp in fingerprints]
+    assert matrix.tanimoto(query, block_size=8) == pytest.approx(expected)
+    indices, scores = matrix.top_k(query, 5, block_size=8)
+    assert indices.tolist() == sorted(range(50), key=lambda i: -expected[i])[:5]
+    assert indices[0] == 7 and scores[0] == 1.0
+    assert matrix.ids[indices[0]] == 1007
+    indices, scores = matrix.threshold(query, 0.2, block_size=8)
+    assert sorted(indices.tolist()) == [i for i in range(50) if expected[i] >= 0.2]
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_all_vs_all(fingerprints, matrix):
+    expected = np.array([[a.tanimoto(b) for b in fingerprints] for a in fingerprints])
+    assert matrix.tanimoto_matrix(block_size=16) == pytest.approx(expected.astype(np.float32))
+    indices, scores = matrix.nearest_neighbours(3, block_size=16)
+    np.fill_diagonal(expected, -1)
+    assert scores == pytest.approx(np.sort(expected, axis=1)[:, ::-1][:, :3])
+    assert (indices != np.arange(50)[:, None]).all()
+    rows, columns, scores = matrix.threshold_pairs(0.25, block_size=16)
+    expected_pairs = {(i, j) for i in range(50) for j in range(i + 1, 50) if expected[i, j] >= 0.25}
+    assert set(zip(rows.tolist(), columns.tolist())) == expected_pairs
+
+
+def test_against_other(fingerprints, matrix):
+    other = FingerprintMatrix.from_fingerprints(fingerprints[:3])
+    indices, scores = matrix.nearest_neighbours(5, other)
+    assert indices.shape == (50, 5)
+    assert (indices[:, 3:] == -1).all() and np.isnan(scores[:, 3:]).all()
+    assert indices[:3, 0].tolist() == [0, 1, 2]
@@ -0,0 +1,79 @@
+"""
+test_memo
+~~~~~~~~~
+
+Test the process-wide memory cache.
+
+"""
+
+import time
+
+import pytest
+from conftest import FakeAdapter
+
+from pubchempy2.cache import MemoryCache, memory_cache
+from pubchempy2.pubchempy import Compound
+
+RECORD = {"id": {"id": {"cid": 702}}, "atoms": {"aid": [1], "element": [8]}, "props": []}
+
+
+class RecordAdapter(FakeAdapter):
+    """Transport adapter that answers record and synonyms requests for a single compound."""
+
+    def respond(self, request):
+        if request.url.endswith("/synonyms/JSON"):
+            return {"InformationList": {"Information": [{"CID": 702, "Synonym": ["ethanol"]}]}}
+        return {"PC_Compounds": [RECORD]}
+
+
+@pytest.fixture
+def adapter(use_adapter):
+    memory_cache.clear()
+    yield use_adapter(RecordAdapter())
+    memory_cache.clear()
+
+
+def test_lru():
+    cache = MemoryCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats == {"hits": 2, "misses": 1, "size": 2}
+
+
+def test_ttl():
+    cache = MemoryCache(ttl=0.05)
+    cache.set("a", 1)
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+
+def test_get_or_set():
+    cache = MemoryCache()
+    calls = []
+    assert cache.get_or_set("a", lambda: calls.append(1) or "value") == "value"
+    assert cache.get_or_set("a", lambda: calls.append(1) or "value") == "value"
+    assert cache.get_or_set(None, lambda: calls.append(1) or "value") == "value"
+    assert len(calls) == 2
+
+
+def test_shared_between_instances(adapter):
+    c1 = Compound.from_cid(702)
+    c2 = Compound.from_cid(702)
+    assert c1 == c2
+    assert c1.synonyms == c2.synonyms == ["ethanol"]
+    assert len(adapter.urls) == 2
+    assert memory_cache.stats["hits"] == 2
+
+
+def test_cached_values_copied(adapter):
+    c1 = Compound.from_cid(702)
+    c1.record["atoms"]["element"].append(6)
+    c1.synonyms.append("alcohol")
+    c2 = Compound.from_cid(702)
+    assert c2.record == RECORD
+    assert c2.synonyms == ["ethanol"]
+    assert len(adapter.urls) == 2
@@ -0,0 +1,68 @@
+"""
+test_pagination
+~~~~~~~~~~~~~~~
+
+Test streaming of large search results page by page.
+
+"""
+
+import pytest
+from conftest import FakeAdapter, form
+
+from pubchempy2.pubchempy import iter_cids, iter_compounds, iter_properties
+
+
+class ListKeyAdapter(FakeAdapter):
+    """Transport adapter storing search results under a ListKey and serving them by listkey_start/listkey_count."""
+
+    def __init__(self, size=25):
+        super().__init__()
+        self.size = size
+        self.pages = []
+
+    def respond(self, request):
+        data = form(request)
+        if data.get("list_return") == "listkey":
+            return {"IdentifierList": {"ListKey": "123", "Size": self.size}}
+        start, count = int(data["listkey_start"]), int(data["listkey_count"])
+        self.pages.append((start, count))
+        cids = list(range(1, self.size + 1))[start : start + count]
+        if "/cids/" in request.url:
+            return {"IdentifierList": {"CID": cids}}
+        if "/property/" in request.url:
+            return {"PropertyTable": {"Properties": [{"CID": cid, "MolecularWeight": "1.0"} for cid in cids]}}
+        record = {"atoms": {"aid": [], "element": []}}
+        return {"PC_Compounds": [{"id": {"id": {"cid": cid}}, **record} for cid in cids]}
+
+
+@pytest.fixture
+def adapter(use_adapter):
+    return use_adapter(ListKeyAdapter())
+
+
+def test_iter_cids(adapter):
+    assert list(iter_cids("aspirin", page_size=10)) == list(range(1, 26))
+    assert adapter.pages == [(0, 10), (10, 10), (20, 10)]
+
+
+def test_iter_exact_pages(adapter):
+    adapter.size = 20
+    assert list(iter_cids("aspirin", page_size=10)) == list(range(1, 21))
+    assert adapter.pages == [(0, 10), (10, 10), (20, 10)]
+
+
+def test_iter_compounds(adapter):
+    compounds = iter_compounds(list(range(1, 26)), page_size=10)
+    assert next(compounds).cid == 1
+    assert [c.cid for c in compounds] == list(range(2, 26))
+
+
+def test_iter_properties(adapter):
+    properties = list(iter_properties("MolecularWeight", "CC", "smiles", page_size=7))
+    assert len(properties) == 25
+    assert properties[-1] == {"CID": 25, "MolecularWeight": "1.0"}
+
+
+def test_iter_empty(adapter):
+    adapter.size = 0
+    assert list(iter_cids("aspirin", page_size=10)) == []
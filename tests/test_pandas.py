@@ -13,6 +13,8 @@ import pytest
 from pubchempy2.pubchempy import (
     Compound,
     Substance,
+    _default_properties,
+    compounds_to_arrow,
     compounds_to_frame,
     get_compounds,
     get_properties,
@@ -74,3 +76,38 @@ def test_compound_to_frame():
 def test_substance_to_frame():
     s = substances_to_frame(Substance.from_sid(1234))
     assert isinstance(s, pd.DataFrame)
+
+
+def local_compound(cid):
+    props = [
+        {"urn": {"label": "Molecular Formula"}, "value": {"sval": "C%sH4" % cid}},
+        {"urn": {"label": "Molecular Weight"}, "value": {"sval": "%s.5" % cid}},
+    ]
+    record = {"id": {"id": {"cid": cid}}, "atoms": {"aid": [1], "element": [6]}, "props": props, "count": {}}
+    return Compound(record)
+
+
+def test_default_properties():
+    properties = _default_properties(Compound)
+    assert _default_properties(Compound) is properties
+    assert "molecular_formula" in properties and "atoms" in properties
+    assert not {"synonyms", "sids", "aids", "atom_table"} & set(properties)
+
+
+def test_local_compounds_to_frame():
+    compounds = [local_compound(cid) for cid in range(1, 4)]
+    df = compounds_to_frame(compounds, ["molecular_formula", "molecular_weight", "heavy_atom_count", "atoms"])
+    assert df.index.tolist() == [1, 2, 3]
+    assert df.columns.tolist() == ["molecular_formula", "molecular_weight", "heavy_atom_count", "atoms"]
+    assert df["molecular_weight"].dtype == "float64"
+    assert df["molecular_formula"].tolist() == ["C1H4", "C2H4", "C3H4"]
+    assert df["atoms"].iloc[0] == [{"aid": 1, "number": 6, "element": "C"}]
+    expected = pd.DataFrame.from_records([c.to_dict(df.columns.tolist() + ["cid"]) for c in compounds], index="cid")
+    pd.testing.assert_frame_equal(df, expected[df.columns])
+
+
+def test_compounds_to_arrow():
+    pytest.importorskip("pyarrow")
+    table = compounds_to_arrow([local_compound(1), local_compound(2)], ["molecular_weight"])
+    assert table.column_names == ["cid", "molecular_weight"]
+    assert table.column("molecular_weight").to_pylist() == [1.5, 2.5]
@@ -0,0 +1,76 @@
+"""
+test_prop_index
+~~~~~~~~~~~~~~~
+
+Test the index of record properties used by Compound.
+
+"""
+
+import pytest
+
+from pubchempy2.pubchempy import Compound, _index_props
+
+
+def prop(value, **urn):
+    return {"urn": urn, "value": value}
+
+
+PROPS = [
+    prop({"sval": "Ethanol"}, label="IUPAC Name", name="Allowed"),
+    prop({"sval": "ethanol"}, label="IUPAC Name", name="Preferred"),
+    prop({"sval": "CCO"}, label="SMILES", name="Canonical"),
+    prop({"sval": "CCO-iso"}, label="SMILES", name="Isomeric"),
+    prop({"sval": "C2H6O"}, label="Molecular Formula"),
+    prop({"sval": "46.07"}, label="Molecular Weight"),
+    prop({"fval": 20.2}, label="Topological", name="Polar Surface Area", implementation="E_TPSA"),
+    prop({"fval": -0.1}, label="Log P", name="XLogP3", implementation="E_XLOGP3"),
+]
+
+RECORD = {
+    "atoms": {"aid": [1], "element": [6]},
+    "props": PROPS,
+    "coords": [
+        {
+            "aid": [1],
+            "data": [prop({"fval": 0.4}, label="Conformer", name="RMSD")],
+            "conformers": [{"x": [0.0], "y": [0.0], "data": [prop({"fval": 33.3}, label="Shape", name="Volume")]}],
+        }
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    "search, expected",
+    [
+        ({"label": "IUPAC Name"}, "Ethanol"),
+        ({"label": "IUPAC Name", "name": "Preferred"}, "ethanol"),
+        ({"label": "SMILES"}, "CCO"),
+        ({"label": "SMILES", "name": "Isomeric"}, "CCO-iso"),
+        ({"implementation": "E_TPSA"}, 20.2),
+        ({"name": "XLogP3", "implementation": "E_XLOGP3"}, -0.1),
+        ({"label": "Missing"}, None),
+    ],
+)
+def test_index_first_match(search, expected):
+    assert _index_props(PROPS).get(frozenset(search.items())) == expected
+
+
+def test_compound_properties():
+    compound = Compound(RECORD)
+    assert compound.iupac_name == "ethanol"
+    assert compound.canonical_smiles == "CCO"
+    assert compound.isomeric_smiles == "CCO-iso"
+    assert compound.molecular_weight == 46.07
+    assert compound.tpsa == 20.2
+    assert compound.xlogp == -0.1
+    assert compound.inchi is None
+    assert compound.volume_3d == 33.3
+    assert compound.conformer_rmsd_3d == 0.4
+    assert compound.mmff94_energy_3d is None
+
+
+def test_index_reset_on_record_change():
+    compound = Compound(RECORD)
+    assert compound.molecular_formula == "C2H6O"
+    compound.record = dict(RECORD, props=[prop({"sval": "CH4"}, label="Molecular Formula")])
+    assert compound.molecular_formula == "CH4"
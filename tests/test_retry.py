@@ -0,0 +1,121 @@
+"""
+test_retry
+~~~~~~~~~~
+
+Test retrying failed requests.
+
+"""
+
+import time
+
+import pytest
+import requests
+from conftest import FakeAdapter, make_response
+
+from pubchempy2.client import Client
+from pubchempy2.errors import NetworkError, SeverBusyError, TimeoutError
+from pubchempy2.pubchempy import PubChemPyError, get_cids
+from pubchempy2.retry import RetryPolicy, parse_retry_after
+from pubchempy2.search import CompoundSearch
+
+
+class SequenceAdapter(FakeAdapter):
+    """Transport adapter that replies with the given status codes (or raises the given exceptions) in turn."""
+
+    def __init__(self, *outcomes, headers=None):
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.headers = headers or {}
+
+    def respond(self, request):
+        outcome = self.outcomes[min(len(self.requests) - 1, len(self.outcomes) - 1)]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return make_response(request, {"IdentifierList": {"CID": [2244]}}, outcome, self.headers)
+
+
+def search(adapter, policy):
+    client = Client(adapters={"https://": adapter}, rate_limiter=None, retry_policy=policy)
+    return CompoundSearch(namespace="name", identifiers=["aspirin"], operation="cids", output="JSON").search(client)
+
+
+def test_retry_until_success():
+    policy = RetryPolicy(initial=0.001)
+    adapter = SequenceAdapter(503, 504, 200)
+    assert search(adapter, policy).json()["IdentifierList"]["CID"] == [2244]
+    assert len(adapter.requests) == 3
+    assert policy.stats == {"SeverBusyError": 1, "TimeoutError": 1}
+
+
+def test_budget_per_error_class():
+    policy = RetryPolicy(budgets={SeverBusyError: 2}, initial=0.001)
+    adapter = SequenceAdapter(503)
+    with pytest.raises(SeverBusyError):
+        search(adapter, policy)
+    assert len(adapter.requests) == 3
+    assert policy.stats == {"SeverBusyError": 2, "gave_up": 1}
+
+
+def test_not_retried():
+    policy = RetryPolicy(budgets={TimeoutError: 2}, initial=0.001)
+    adapter = SequenceAdapter(503)
+    with pytest.raises(SeverBusyError):
+        search(adapter, policy)
+    assert len(adapter.requests) == 1
+
+
+def test_connection_reset():
+    policy = RetryPolicy(budgets={NetworkError: 1}, initial=0.001)
+    adapter = SequenceAdapter(requests.ConnectionError("reset"), 200)
+    assert search(adapter, policy).ok
+    with pytest.raises(NetworkError) as e:
+        search(SequenceAdapter(requests.ConnectionError("reset")), policy)
+    assert isinstance(e.value.__cause__, requests.ConnectionError)
+
+
+def test_network_error_from_legacy_api(use_adapter):
+    use_adapter(SequenceAdapter(requests.ConnectionError("reset")), retry_policy=RetryPolicy(budgets={}))
+    with pytest.raises(PubChemPyError):
+        get_cids("aspirin")
+
+
+def test_timeout_not_retried():
+    policy = RetryPolicy(budgets={}, initial=0.001)
+    adapter = SequenceAdapter(requests.ReadTimeout("read timed out"))
+    with pytest.raises(NetworkError):
+        search(adapter, policy)
+    assert len(adapter.requests) == 1
+
+
+def test_discarded_response_closed():
+    closed = []
+
+    def respond(request):
+        response = make_response(request, {}, 503 if len(adapter.requests) == 1 else 200)
+        response.close = lambda: closed.append(response.status_code)
+        return response
+
+    adapter = FakeAdapter(respond)
+    assert search(adapter, RetryPolicy(initial=0.001)).ok
+    assert closed == [503]
+
+
+def test_deadline():
+    policy = RetryPolicy(deadline=0, initial=0.001)
+    adapter = SequenceAdapter(503)
+    with pytest.raises(SeverBusyError):
+        search(adapter, policy)
+    assert len(adapter.requests) == 1
+
+
+def test_retry_after():
+    assert parse_retry_after({"Retry-After": "3"}) == 3
+    assert parse_retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert parse_retry_after({}) is None
+    policy = RetryPolicy(budgets={SeverBusyError: 1}, initial=0.001, maximum=0.2)
+    adapter = SequenceAdapter(503, 200, headers={"Retry-After": "1"})
+    client = Client(adapters={"https://": adapter}, rate_limiter=None, retry_policy=policy)
+    start = time.monotonic()
+    assert client.post("https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/1/cids/JSON").ok
+    # Retry-After is honoured, but capped at the maximum wait
+    assert 0.19 <= time.monotonic() - start < 1
@@ -0,0 +1,138 @@
+"""
+test_screen
+~~~~~~~~~~~
+
+Test substructure searches screened locally by fingerprint.
+
+"""
+
+import base64
+
+import pytest
+from conftest import FakeAdapter, form, make_response
+
+from pubchempy2.fingerprint import Fingerprint
+
+np = pytest.importorskip("numpy")
+
+from pubchempy2.index import FingerprintIndex  # noqa: E402
+from pubchempy2.matrix import FingerprintMatrix  # noqa: E402
+from pubchempy2.screen import query_fingerprint, screen_substructure, substructure_search  # noqa: E402
+
+QUERY = Fingerprint(0b10110)
+CANDIDATES = {
+    1: Fingerprint(0b10010),
+    2: Fingerprint(0b10110),
+    3: Fingerprint(0b11110 | 1 << 800),
+    4: Fingerprint(0b10111),
+    5: Fingerprint(0b00110),
+    6: Fingerprint(1 << 880),
+}
+
+
+class SearchAdapter(FakeAdapter):
+    """Transport adapter that answers fingerprint requests and substructure searches, whose results are served by
+    listkey_start/listkey_count."""
+
+    def __init__(self, matches):
+        super().__init__()
+        self.matches = matches
+        self.page_not_found = False
+        self.pages = []
+
+    def respond(self, request):
+        data = form(request)
+        if "/property/Fingerprint2D/" in request.url:
+            encoded = base64.b64encode(b"\0\0\x03\x71" + QUERY.to_bytes()).decode()
+            return {"PropertyTable": {"Properties": [{"CID": 1, "Fingerprint2D": encoded}]}}
+        if self.matches is None:
+            return make_response(request, {"Fault": {"Code": "PUGREST.NotFound"}}, 404)
+        if "/compound/substructure/" in request.url and "/cids/" not in request.url:
+            return {"Waiting": {"ListKey": "123"}}
+        if data.get("list_return") == "listkey":
+            return {"IdentifierList": {"ListKey": "123"}}
+        start, count = int(data.get("listkey_start", 0)), int(data["listkey_count"])
+        self.pages.append((start, count))
+        if self.page_not_found:
+            return make_response(request, {"Fault": {"Code": "PUGREST.NotFound"}}, 404)
+        return {"IdentifierList": {"CID": self.matches[start : start + count]}}
+
+
+@pytest.fixture
+def adapter(use_adapter):
+    return use_adapter(SearchAdapter([4, 99, 2, 98, 97]))
+
+
+@pytest.fixture
+def matrix():
+    return FingerprintMatrix.from_fingerprints(CANDIDATES.values(), ids=list(CANDIDATES))
+
+
+def test_matrix_containing(matrix):
+    assert matrix.containing(QUERY).tolist() == [1, 2, 3]
+    assert matrix.containing(QUERY, block_size=2).tolist() == [1, 2, 3]
+    assert matrix.containing(Fingerprint(0)).tolist() == list(range(6))
+
+
+def test_index_containing(tmp_path, matrix):
+    index = FingerprintIndex.build(tmp_path / "test.fpidx", matrix)
+    assert sorted(index.containing(QUERY)) == [2, 3, 4]
+
+
+def test_screen_substructure(tmp_path, matrix):
+    assert screen_substructure(QUERY, matrix) == [2, 3, 4]
+    index = FingerprintIndex.build(tmp_path / "test.fpidx", matrix)
+    assert sorted(screen_substructure(QUERY, index)) == [2, 3, 4]
+
+
+def test_query_fingerprint(adapter):
+    assert query_fingerprint("CCO") == QUERY
+    with pytest.raises(ValueError):
+        query_fingerprint("[#6]", "smarts")
+
+
+def test_fast_substructure_search(adapter, matrix):
+    assert substructure_search("CCO", matrix, MatchIsotopes="true") == [2, 4]
+    assert len(adapter.urls) == 3
+    assert adapter.urls[1].endswith("/compound/fastsubstructure/smiles/cids/JSON")
+    assert form(adapter.requests[1]) == {"smiles": "CCO", "list_return": "listkey", "MatchIsotopes": "true"}
+
+
+def test_substructure_search(adapter, matrix):
+    assert substructure_search("CCO", matrix, fingerprint=QUERY, fast=False) == [2, 4]
+    assert adapter.urls[0].endswith("/compound/substructure/smiles/JSON")
+    assert "/compound/listkey/123/cids/JSON" in adapter.urls[-1]
+
+
+def test_stops_when_survivors_found(adapter, matrix):
+    adapter.matches = [4, 99, 2, 3] + list(range(1000, 1100))
+    assert substructure_search("CCO", matrix, fingerprint=QUERY, page_size=2) == [2, 3, 4]
+    assert adapter.pages[:2] == [(0, 2), (2, 2)]
+    assert len(adapter.pages) <= 3
+
+
+def test_inchi_and_sdf_queries(adapter, matrix):
+    substructure_search("1S/C2H6O/c1-2-3/h3H,2H2,1H3", matrix, "inchi")
+    assert (
+        form(adapter.requests[0])["inchi"] == form(adapter.requests[1])["inchi"] == "InChI=1S/C2H6O/c1-2-3/h3H,2H2,1H3"
+    )
+    adapter.requests.clear()
+    substructure_search("InChI=1S/C2H6O/c1-2-3/h3H,2H2,1H3", matrix, "inchi")
+    assert form(adapter.requests[1])["inchi"] == "InChI=1S/C2H6O/c1-2-3/h3H,2H2,1H3"
+    adapter.requests.clear()
+    substructure_search("ethanol\n  mol\n", matrix, "sdf")
+    assert adapter.urls[1].endswith("/compound/fastsubstructure/sdf/cids/JSON")
+
+
+def test_no_matches(adapter, matrix):
+    adapter.matches = None
+    assert substructure_search("CCO", matrix, fingerprint=QUERY) == []
+    assert len(adapter.urls) == 1
+    adapter.matches, adapter.page_not_found = [4, 2], True
+    assert substructure_search("CCO", matrix, fingerprint=QUERY) == []
+    assert substructure_search("CCO", matrix, fingerprint=QUERY, fast=False) == []
+
+
+def test_screened_out(adapter, matrix):
+    assert substructure_search("CCO", matrix, fingerprint=Fingerprint(1 << 700)) == []
+    assert adapter.urls == []
@@ -0,0 +1,170 @@
+"""
+test_sdf
+~~~~~~~~
+
+Test parsing of SDF records.
+
+"""
+
+import base64
+import io
+
+import pytest
+from conftest import FakeAdapter, make_response
+
+from pubchempy2.errors import NotFoundError
+from pubchempy2.fingerprint import Fingerprint
+from pubchempy2.pubchempy import ResponseParseError, get_sdf
+from pubchempy2.sdf import SdfCompound, iter_sdf, iter_sdf_compounds
+from pubchempy2.search import CompoundSearch
+
+SDF = """702
+  -OEChem-03012400003D
+
+  3  2  0     0  0  0  0  0  0999 V2000
+    0.2430   -0.5573    0.0000 O   0  0  0  0  0  0  0  0  0  0  0  0
+   -1.0051    0.2648    0.0000 C   0  0  0  0  0  0  0  0  0  0  0  0
+    1.2453    0.2063    0.0000 N   0  3  0  0  0  0  0  0  0  0  0  0
+  1  2  1  0  0  0  0
+  1  3  2  0  0  0  0
+M  CHG  1   3   1
+M  END
+> <PUBCHEM_COMPOUND_CID>
+702
+
+> <PUBCHEM_MOLECULAR_FORMULA>
+C2H6O
+
+> <PUBCHEM_MOLECULAR_WEIGHT>
+46.07
+
+> <PUBCHEM_COORDINATE_TYPE>
+2
+5
+10
+
+$$$$
+2244
+  -OEChem-03012400002D
+
+  1  0  0     0  0  0  0  0  0999 V2000
+    2.0000    1.0000    0.0000 Cl  0  5  0  0  0  0  0  0  0  0  0  0
+M  END
+> <PUBCHEM_OPENEYE_ISO_SMILES>
+[Cl-]
+
+$$$$
+"""
+
+
+def test_iter_sdf():
+    first, second = iter_sdf(io.StringIO(SDF))
+    assert first.cid == 702
+    assert first.molecular_formula == "C2H6O"
+    assert first.molecular_weight == 46.07
+    assert first.elements == ["O", "C", "N"]
+    assert first.coordinate_type == "3d"
+    assert (first.atoms[1].x, first.atoms[1].y, first.atoms[1].z) == (-1.0051, 0.2648, 0.0)
+    assert first.atoms[2].charge == 1
+    assert [(b.aid1, b.aid2, b.order) for b in first.bonds] == [(1, 2, 1), (1, 3, 2)]
+    assert first.data["PUBCHEM_COORDINATE_TYPE"] == "2\n5\n10"
+    assert second.cid == 2244
+    assert second.atoms[0].z is None
+    assert second.atoms[0].charge == -1
+    assert second.isomeric_smiles == "[Cl-]"
+    assert second.inchikey is None
+
+
+def test_charge_block_overrides_atom_block():
+    record = """charged
+  -OEChem-03012400002D
+
+  3  0  0     0  0  0  0  0  0999 V2000
+    0.0000    0.0000    0.0000 N   0  3  0  0  0  0  0  0  0  0  0  0
+    1.0000    0.0000    0.0000 O   0  5  0  0  0  0  0  0  0  0  0  0
+    2.0000    0.0000    0.0000 O   0  0  0  0  0  0  0  0  0  0  0  0
+M  CHG  1   2  -1
+M  CHG  1   3  -1
+M  END
+$$$$
+"""
+    (compound,) = iter_sdf(io.StringIO(record))
+    assert [a.charge for a in compound.atoms] == [0, -1, -1]
+
+
+def test_iter_sdf_bytes():
+    assert [c.cid for c in iter_sdf(SDF.encode().splitlines())] == [702, 2244]
+
+
+def test_iter_sdf_is_lazy():
+    lines = iter(SDF.splitlines())
+    compounds = iter_sdf(lines)
+    assert next(compounds).cid == 702
+    assert next(lines).startswith("2244")
+
+
+def test_invalid_sdf():
+    with pytest.raises(ResponseParseError):
+        list(iter_sdf(["702", "", "", "  x  y"]))
+
+
+def test_to_dict():
+    compound = next(iter_sdf(io.StringIO(SDF)))
+    assert compound.to_dict(["cid", "molecular_formula"]) == {"cid": 702, "molecular_formula": "C2H6O"}
+    assert len(compound.to_dict()["atoms"]) == 3
+
+
+@pytest.fixture
+def adapter(use_adapter):
+    return use_adapter(FakeAdapter(lambda request: SDF.encode()))
+
+
+def test_get_sdf(adapter):
+    assert get_sdf([702, 2244]) == SDF
+
+
+def test_iter_sdf_compounds(adapter):
+    assert [c.cid for c in iter_sdf_compounds([702, 2244])] == [702, 2244]
+
+
+def test_search_sdf(adapter):
+    search = CompoundSearch(namespace="cid", identifiers=[702, 2244], operation="record", output="SDF")
+    assert [c.cid for c in search.search_sdf()] == [702, 2244]
+
+
+def test_data_fields():
+    fingerprint = Fingerprint(0b1011)
+    encoded = base64.b64encode(b"\0\0\x03\x71" + fingerprint.to_bytes()).decode()
+    compound = SdfCompound(
+        "1",
+        [],
+        [],
+        {
+            "PUBCHEM_SMILES": "C[C@H](N)O",
+            "PUBCHEM_CONNECTIVITY_SMILES": "CC(N)O",
+            "PUBCHEM_ATOM_DEF_STEREO_COUNT": "1",
+            "PUBCHEM_ATOM_UDEF_STEREO_COUNT": "2",
+            "PUBCHEM_CACTVS_SUBSKEYS": encoded,
+        },
+    )
+    assert compound.canonical_smiles == "CC(N)O"
+    assert compound.isomeric_smiles == "C[C@H](N)O"
+    assert (compound.defined_atom_stereo_count, compound.undefined_atom_stereo_count) == (1, 2)
+    assert compound.fingerprint == "00000371" + fingerprint.to_bytes().hex().upper()
+    assert Fingerprint.from_hex(compound.fingerprint) == compound.binary_fingerprint == fingerprint
+    assert SdfCompound("1", [], [], {"PUBCHEM_SMILES": "C[C@H](N)O"}).canonical_smiles is None
+
+
+def test_search_sdf_error_closes_response(use_adapter):
+    closed = []
+
+    def respond(request):
+        response = make_response(request, b"Not found", 404)
+        response.close = lambda: closed.append(response)
+        return response
+
+    use_adapter(FakeAdapter(respond))
+    search = CompoundSearch(namespace="cid", identifiers=[1], operation="record", output="SDF")
+    with pytest.raises(NotFoundError):
+        list(search.search_sdf())
+    assert len(closed) == 1
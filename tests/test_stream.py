@@ -0,0 +1,108 @@
+"""
+test_stream
+~~~~~~~~~~~
+
+Test incremental parsing of streamed JSON responses.
+
+"""
+
+import json
+
+import pytest
+from conftest import FakeAdapter, form
+
+from pubchempy2.listkey import default_poller
+from pubchempy2.pubchempy import get_compounds, get_substances
+from pubchempy2.stream import iter_json_array
+
+RECORDS = [
+    {"id": {"id": {"cid": cid}}, "atoms": {"aid": [1], "element": [6]}, "note": 'braces } { [ ] and "quotes" \\'}
+    for cid in range(1, 6)
+]
+DOCUMENT = json.dumps({"PC_Compounds": RECORDS}, indent=1).encode()
+
+
+def split(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, len(DOCUMENT)])
+def test_iter_json_array(size):
+    assert list(iter_json_array(split(DOCUMENT, size), "PC_Compounds")) == RECORDS
+
+
+def test_missing_key():
+    assert list(iter_json_array([DOCUMENT], "PC_Substances")) == []
+
+
+def test_truncated():
+    items = iter_json_array([DOCUMENT[:-20]], "PC_Compounds")
+    with pytest.raises(ValueError):
+        list(items)
+
+
+def test_incremental():
+    """Each item is yielded before the rest of the document is read."""
+    read = []
+
+    def chunks():
+        for chunk in split(DOCUMENT, 16):
+            read.append(chunk)
+            yield chunk
+
+    items = iter_json_array(chunks(), "PC_Compounds")
+    assert next(items) == RECORDS[0]
+    assert sum(len(chunk) for chunk in read) < len(DOCUMENT) / 2
+
+
+@pytest.fixture
+def serve(use_adapter):
+    """Serve a fixed document for every request."""
+    return lambda document: use_adapter(FakeAdapter(lambda request: document))
+
+
+def test_get_compounds_stream(serve):
+    serve(DOCUMENT)
+    compounds = get_compounds([1, 2, 3, 4, 5], stream=True)
+    assert not isinstance(compounds, list)
+    assert [c.cid for c in compounds] == [1, 2, 3, 4, 5]
+
+
+def test_get_substances_stream(serve):
+    serve(json.dumps({"PC_Substances": [{"sid": {"id": 7}}]}).encode())
+    assert [s.sid for s in get_substances(7, stream=True)] == [7]
+
+
+class AsyncSearchAdapter(FakeAdapter):
+    """Transport adapter for a search that finishes at once, then streams its results from the ListKey."""
+
+    def __init__(self, document):
+        super().__init__()
+        self.document = document
+
+    def respond(self, request):
+        if "/listkey/" not in request.url:
+            return {"Waiting": {"ListKey": "42"}}
+        if form(request).get("listkey_count") == "1":
+            return {"IdentifierList": {"CID": [1]}}
+        return self.document
+
+
+def test_stream_async_search(use_adapter, monkeypatch):
+    monkeypatch.setattr(default_poller, "initial_interval", 0.01)
+    adapter = use_adapter(AsyncSearchAdapter(DOCUMENT))
+    compounds = get_compounds("CCO", "smiles", searchtype="substructure", stream=True, MaxRecords=5, record_type="3d")
+    assert [c.cid for c in compounds] == [1, 2, 3, 4, 5]
+    search, _, fetch = adapter.requests
+    assert "/compound/substructure/smiles/JSON" in search.url
+    assert form(search) == {"smiles": "CCO", "MaxRecords": "5"}
+    assert fetch.url.endswith("/compound/listkey/42/JSON")
+    assert form(fetch) == {"record_type": "3d"}
+
+
+def test_stream_async_search_domain(use_adapter, monkeypatch):
+    monkeypatch.setattr(default_poller, "initial_interval", 0.01)
+    adapter = use_adapter(AsyncSearchAdapter(json.dumps({"PC_Substances": [{"sid": {"id": 7}}]}).encode()))
+    assert [s.sid for s in get_substances("C", "formula", stream=True)] == [7]
+    assert all("/substance/" in url for url in adapter.urls)
+    assert "/substance/listkey/42/sids/JSON" in adapter.urls[1]
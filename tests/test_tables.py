@@ -0,0 +1,76 @@
+"""
+test_tables
+~~~~~~~~~~~
+
+Test columnar atom and bond tables.
+
+"""
+
+import pytest
+
+from pubchempy2.pubchempy import Compound, ResponseParseError
+
+np = pytest.importorskip("numpy")
+
+RECORD = {
+    "id": {"id": {"cid": 702}},
+    "atoms": {"aid": [3, 1, 2], "element": [8, 6, 6], "charge": [{"aid": 3, "value": -1}]},
+    "bonds": {"aid1": [2, 1], "aid2": [3, 2], "order": [2, 1]},
+    "coords": [
+        {
+            "aid": [1, 2, 3],
+            "conformers": [
+                {
+                    "x": [0.0, 1.0, 2.0],
+                    "y": [0.5, 0.5, 0.5],
+                    "z": [1.0, 2.0, 3.0],
+                    "style": {"aid1": [3], "aid2": [2], "annotation": [6]},
+                }
+            ],
+        }
+    ],
+}
+
+
+def test_atom_table():
+    compound = Compound(RECORD)
+    table = compound.atom_table
+    assert len(table) == 3
+    assert table.aid.tolist() == [1, 2, 3]
+    assert table.number.tolist() == [6, 6, 8]
+    assert table.charge.tolist() == [0, 0, -1]
+    assert table.coords.tolist() == [[0.0, 0.5, 1.0], [1.0, 0.5, 2.0], [2.0, 0.5, 3.0]]
+    assert compound._atoms is None
+    assert compound.atom_table is table
+
+
+def test_atom_table_matches_atoms():
+    compound = Compound(RECORD)
+    assert compound.atom_table.coords.tolist() == [[a.x, a.y, a.z] for a in compound.atoms]
+
+
+def test_atom_table_2d():
+    record = {"atoms": {"aid": [1], "element": [6]}, "coords": [{"aid": [1], "conformers": [{"x": [1.0], "y": [2.0]}]}]}
+    assert Compound(record).atom_table.coords.tolist() == [[1.0, 2.0, 0.0]]
+    assert np.isnan(Compound({"atoms": {"aid": [1], "element": [6]}}).atom_table.coords).all()
+
+
+def test_bond_table():
+    table = Compound(RECORD).bond_table
+    assert table.aid1.tolist() == [1, 2]
+    assert table.aid2.tolist() == [2, 3]
+    assert table.order.tolist() == [1, 2]
+    assert table.style.tolist() == [0, 6]
+    assert len(Compound({"atoms": {"aid": [1], "element": [6]}}).bond_table) == 0
+
+
+def test_invalid_record():
+    with pytest.raises(ResponseParseError):
+        Compound({"atoms": {"aid": [1, 2], "element": [6]}}).atom_table
+
+
+def test_reset_on_record_change():
+    compound = Compound(RECORD)
+    assert len(compound.atom_table) == 3
+    compound.record = {"atoms": {"aid": [1], "element": [1]}}
+    assert compound.atom_table.number.tolist() == [1]
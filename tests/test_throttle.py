@@ -0,0 +1,57 @@
+"""
+test_throttle
+~~~~~~~~~~~~~
+
+Test client-side rate limiting.
+
+"""
+
+import asyncio
+import threading
+import time
+
+from pubchempy2.throttle import RateLimiter, parse_throttling_control
+
+HEADER = "Request Count status: {} (0%), Request Time status: {} (55%), Service status: Green (20%)"
+
+
+def test_parse_throttling_control():
+    statuses = parse_throttling_control(HEADER.format("Green", "Yellow"))
+    assert statuses == {"Request Count": "green", "Request Time": "yellow", "Service": "green"}
+
+
+def test_rate_follows_status():
+    limiter = RateLimiter(rate=5)
+    limiter.update({"X-Throttling-Control": HEADER.format("Green", "Yellow")})
+    assert limiter.status == "yellow"
+    assert limiter.rate == 2.5
+    limiter.update({"X-Throttling-Control": HEADER.format("Red", "Yellow")})
+    assert limiter.status == "red"
+    assert limiter.rate == 1.25
+    limiter.update({"Content-Type": "application/json"})
+    assert limiter.rate == 1.25
+    limiter.update({"X-Throttling-Control": HEADER.format("Green", "Green")})
+    assert limiter.status == "green"
+    assert limiter.rate == 5
+
+
+def test_threads_are_spaced():
+    limiter = RateLimiter(rate=50)
+    start = time.monotonic()
+    threads = [threading.Thread(target=limiter.acquire) for _ in range(11)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - start >= 0.19
+
+
+def test_tasks_are_spaced():
+    limiter = RateLimiter(rate=50)
+
+    async def main():
+        await asyncio.gather(*[limiter.aacquire() for _ in range(11)])
+
+    start = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - start >= 0.19